@@ -0,0 +1,358 @@
+"""
+渲染基准测试脚本 - 无窗口运行固定场景，输出每帧耗时统计（JSON）
+
+使用方法：
+    python benchmark_render.py
+    python benchmark_render.py --frames 300 --output result.json
+    python benchmark_render.py --scenes panel,theme_neon_city
+    python benchmark_render.py --renderer software
+    python benchmark_render.py --resolution base --filter nearest
+    python benchmark_render.py --render-thread
+    python benchmark_render.py --list
+
+说明：
+    1. 使用 SDL 的 dummy 视频/音频驱动，不打开窗口
+    2. 固定随机种子 + 虚拟时钟（每帧固定推进 1/60 秒），结果可跨提交对比
+    3. 在临时目录中运行，不会读写玩家的设置、统计和排行榜文件
+    4. 每个场景记录最后一帧画面的校验和（frame_crc），--render-thread 的结果应与主线程绘制一致
+"""
+
+import os
+
+# 必须在导入 pygame 之前设置
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import sys
+import json
+import time
+import random
+import shutil
+import zlib
+import platform
+import argparse
+import tempfile
+
+import pygame
+import tetris_enhanced as te
+
+# 设置控制台编码为 UTF-8
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# ==================== 配置 ====================
+
+SEED = 20250114
+FRAME_MS = 1000 / 60  # 虚拟时钟每帧推进量
+START_MS = 10000  # 虚拟时钟起点（避开“刚启动”的特殊分支）
+DEFAULT_FRAMES = 240
+DEFAULT_WARMUP = 30
+DEFAULT_SIZE = (530, 685)
+PERCENTILES = (50, 90, 95, 99)
+
+# ==================== 场景 ====================
+
+
+def fill_stack(game, height):
+    """从底部堆叠 height 行方块，每行留一个空位（不会触发消除）"""
+    rng = random.Random(height)
+    for y in range(te.GRID_HEIGHT - height, te.GRID_HEIGHT):
+        gap = rng.randrange(te.GRID_WIDTH)
+        game.grid[y] = [0 if x == gap else 1 + (x + y) % 7 for x in range(te.GRID_WIDTH)]
+
+
+def trigger_tetris(game, combo=11):
+    """在底部制造一次四行消除，并让连击数进入传奇级别"""
+    for y in range(te.GRID_HEIGHT - 4, te.GRID_HEIGHT):
+        game.grid[y] = [1 + x % 7 if x < te.GRID_WIDTH - 1 else 0 for x in range(te.GRID_WIDTH)]
+    game.current_piece = [[1], [1], [1], [1]]
+    game.current_x = te.GRID_WIDTH - 1
+    game.current_y = te.GRID_HEIGHT - 4
+    game.combo_count = combo
+    game.last_clear_time = te.GameClock.get_ticks()
+    # 与 update_game 中方块落地的处理顺序一致
+    game.merge_piece()
+    game.clear_lines()
+    game.new_piece()
+
+
+def setup_stack(height):
+    def setup(game):
+        fill_stack(game, height)
+    return setup
+
+
+def setup_tetris(game):
+    fill_stack(game, 6)
+
+
+def tick_tetris(game, frame_index):
+    # 每秒触发一次，保证测量期间特效持续存在
+    if frame_index % 60 == 0:
+        trigger_tetris(game)
+
+
+def setup_panel(panel, dropdown=False):
+    def setup(game):
+        fill_stack(game, 8)
+        game.paused = True
+        if panel == 'statistics':
+            game.show_statistics = True
+        elif panel == 'achievements':
+            game.show_achievements = True
+        else:
+            game.show_settings = True
+            game.theme_dropdown_opened = dropdown
+            if panel == 'keybind':
+                game.key_binding_mode = 'panel'
+    return setup
+
+
+def build_scenes():
+    """场景列表：名称、窗口尺寸、主题、初始化函数、每帧回调"""
+    scenes = [
+        {'name': 'empty_board', 'setup': setup_stack(0)},
+        {'name': 'full_stack', 'setup': setup_stack(17)},
+        {'name': 'tetris_legendary_combo', 'setup': setup_tetris, 'tick': tick_tetris},
+        {'name': 'panel_statistics', 'setup': setup_panel('statistics')},
+        {'name': 'panel_achievements', 'setup': setup_panel('achievements')},
+        {'name': 'panel_settings', 'setup': setup_panel('settings')},
+        {'name': 'panel_settings_dropdown', 'setup': setup_panel('settings', dropdown=True)},
+        {'name': 'panel_keybind', 'setup': setup_panel('keybind')},
+    ]
+    for theme in te.THEMES:
+        scenes.append({'name': f'theme_{theme.name}', 'theme': theme, 'setup': setup_stack(8)})
+    for size in [(318, 411), (530, 685), (795, 1028), (1280, 720), (1920, 1080)]:
+        scenes.append({'name': f'size_{size[0]}x{size[1]}', 'size': size, 'setup': setup_stack(8)})
+    return scenes
+
+
+# ==================== 运行 ====================
+
+
+def reset_game(game, theme, size):
+    """把游戏恢复到“正在游戏、无特效”的确定状态"""
+    game.resize_window(*size)
+    game.current_theme = theme
+    game.update_layout()
+
+    game.grid = [[0 for _ in range(te.GRID_WIDTH)] for _ in range(te.GRID_HEIGHT)]
+    game.score = 0
+    game.level = 1
+    game.lines_cleared = 0
+    game.game_over = False
+    game.paused = False
+    game.waiting_to_start = False
+    game.countdown_active = False
+    game.reset_piece_queue()
+    game.fall_time = te.GameClock.get_ticks()
+    game.fall_speed = 10 ** 9  # 冻结重力，只测渲染
+    game.combo_count = 0
+    game.last_clear_time = 0
+
+    game.show_statistics = False
+    game.show_achievements = False
+    game.show_settings = False
+    game.key_binding_mode = None
+    game.theme_dropdown_opened = False
+    game.dragging_slider = None
+    game.neon_mode = True
+    game.show_ghost = True
+    game.sound_manager.enabled = False
+    # 使用渲染线程时绘制缓存归它所有
+    caches = game.render_thread.caches if game.render_thread is not None else vars(game)
+    caches['_panel_cache'].clear()
+    caches['_overlay_cache'].clear()
+    caches['_hud_cache'].clear()
+
+    game.animation_manager = te.AnimationManager(theme=theme)
+    game.piece_animation = te.PieceAnimation()
+    game.achievement.unlocked = []
+    game.achievement.notification_queue = []
+    game.achievement.current_notification = None
+
+
+def percentile(sorted_values, p):
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """帧耗时样本（秒） -> 毫秒统计"""
+    values = sorted(v * 1000 for v in samples)
+    result = {'mean': round(sum(values) / len(values), 4) if values else 0.0}
+    for p in PERCENTILES:
+        result[f'p{p}'] = round(percentile(values, p), 4)
+    result['max'] = round(values[-1], 4) if values else 0.0
+    return result
+
+
+def frame_checksum():
+    """窗口当前画面的 CRC32（纹理后端没有窗口表面时为 None）"""
+    display = pygame.display.get_surface()
+    if display is None:
+        return None
+    return zlib.crc32(pygame.image.tobytes(display, 'RGB'))
+
+
+def render(game):
+    """绘制并显示一帧（使用渲染线程时走它的绘制路径：快照 + 渲染线程持有的缓存，快照耗时计入绘制）"""
+    if game.render_thread is not None:
+        game.render_thread.draw(game.take_snapshot())
+    else:
+        game.render_frame()
+        game.render_backend.present()
+
+
+def run_scene(game, scene, frames, warmup):
+    """运行单个场景，返回统计结果"""
+    # 每个场景独立播种，单独运行某个场景时结果不变
+    random.seed(SEED ^ zlib.crc32(scene['name'].encode('utf-8')))
+    te.GameClock.use_virtual(START_MS)
+    reset_game(game, scene.get('theme', te.THEMES[0]), scene.get('size', DEFAULT_SIZE))
+    scene['setup'](game)
+    tick = scene.get('tick')
+
+    update_samples = []
+    render_samples = []
+    effects_peak = 0
+    for i in range(warmup + frames):
+        te.GameClock.advance(FRAME_MS)
+        pygame.event.pump()
+        if tick:
+            tick(game, i)
+
+        t0 = time.perf_counter()
+        game.update_game()
+        t1 = time.perf_counter()
+        render(game)
+        t2 = time.perf_counter()
+
+        if i >= warmup:
+            update_samples.append(t1 - t0)
+            render_samples.append(t2 - t1)
+            effects_peak = max(effects_peak, sum(game.animation_manager.get_effect_counts().values()))
+
+    # 校验和取自等后台背景画完后补画的一帧，不受线程调度影响
+    if game.background_worker is not None:
+        game.background_worker.wait()
+    render(game)
+
+    return {
+        'frames': frames,
+        'window': list(scene.get('size', DEFAULT_SIZE)),
+        'theme': scene.get('theme', te.THEMES[0]).name,
+        'render_ms': summarize(render_samples),
+        'update_ms': summarize(update_samples),
+        'effects_peak': effects_peak,
+        'frame_crc': frame_checksum(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块渲染基准测试")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="每个场景测量的帧数")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="每个场景的预热帧数（不计入统计）")
+    parser.add_argument('--scenes', default='', help="只运行名称包含这些关键字的场景（逗号分隔）")
+    parser.add_argument('--output', default='', help="结果写入的 JSON 文件（默认输出到控制台）")
+    parser.add_argument('--renderer', default='surface', choices=te.RENDER_BACKENDS,
+                        help="渲染后端（software 为使用 SDL 软件渲染器的纹理后端）")
+    parser.add_argument('--resolution', default='native', choices=te.Tetris.RESOLUTION_MODES,
+                        help="画布分辨率模式（base/integer 为按基准分辨率绘制后整体缩放）")
+    parser.add_argument('--filter', default='smooth', choices=('smooth', 'nearest'),
+                        help="画布缩放到窗口时的过滤方式")
+    parser.add_argument('--render-thread', action='store_true',
+                        help="按渲染线程的方式绘制（每帧发布快照后绘制快照；仅 Surface 后端）")
+    parser.add_argument('--list', action='store_true', help="列出所有场景后退出")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scenes = build_scenes()
+
+    if args.list:
+        for scene in scenes:
+            print(scene['name'])
+        return 0
+
+    if args.scenes:
+        keywords = [k.strip() for k in args.scenes.split(',') if k.strip()]
+        scenes = [s for s in scenes if any(k in s['name'] for k in keywords)]
+        if not scenes:
+            print("❌ 没有匹配的场景", file=sys.stderr)
+            return 1
+
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    # 在临时目录中运行，游戏的存档文件都写到这里
+    work_dir = tempfile.mkdtemp(prefix='tetris_bench_')
+    old_cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        random.seed(SEED)
+        te.GameClock.use_virtual(0)
+        game = te.Tetris(renderer=args.renderer, resolution=args.resolution, scale_filter=args.filter,
+                         render_thread=args.render_thread)
+        if game.render_thread is not None:
+            # 线程本身停掉，每帧在主线程上同步走它的绘制路径，结果可重复
+            game.render_thread.stop()
+        # 背景音乐在后台线程合成，等它结束再测量，避免与渲染争抢 CPU
+        game.sound_manager.wait_for_music()
+        # 纹理后端不可用时会退回 surface，按实际使用的后端记录
+        renderer = args.renderer if game.render_backend.name != 'surface' else 'surface'
+
+        results = {}
+        for scene in scenes:
+            results[scene['name']] = run_scene(game, scene, args.frames, args.warmup)
+            print(f"  {scene['name']:<28} p50 {results[scene['name']]['render_ms']['p50']:7.3f} ms"
+                  f"  p95 {results[scene['name']]['render_ms']['p95']:7.3f} ms", file=sys.stderr)
+
+        # 停止统计数据的后台保存线程
+        game.statistics._stop_thread = True
+        if game.statistics._save_thread:
+            game.statistics._save_thread.join(timeout=1.0)
+    finally:
+        te.GameClock.use_real()
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'frame_ms': round(FRAME_MS, 4),
+            'seed': SEED,
+            'renderer': renderer,
+            'resolution': args.resolution,
+            'filter': args.filter,
+            'render_thread': game.render_thread is not None,
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'sdl': '.'.join(str(v) for v in pygame.get_sdl_version()),
+            'platform': platform.platform(),
+        },
+        'scenes': results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"✅ 结果已写入 {output_path}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n⚠️  用户中断", file=sys.stderr)
+        sys.exit(1)
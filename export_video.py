@@ -0,0 +1,334 @@
+"""
+视频导出脚本 - 离线渲染一局自动演示游戏并导出为视频或 PNG 序列
+
+使用方法：
+    python export_video.py
+    python export_video.py --output clip.mp4 --seconds 90
+    python export_video.py --format png --output frames --fps 30
+
+说明：
+    1. 使用 SDL 的 dummy 驱动在后台渲染，不打开窗口，也不按实时速度等待
+    2. 游戏由内置的自动玩家操作，固定随机种子 + 虚拟时钟，同样的参数得到同样的画面
+    3. 渲染和编码通过有界队列交给后台写入线程，两者并行进行：
+       - 找到 ffmpeg 时，原始帧通过管道交给 ffmpeg 编码为视频
+       - 否则输出 PNG 序列（压缩在写入线程中进行）
+    4. 在临时目录中运行，不会读写玩家的设置、统计和排行榜文件
+"""
+
+import os
+
+# 必须在导入 pygame 之前设置
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import sys
+import time
+import zlib
+import queue
+import random
+import shutil
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import pygame
+import tetris_enhanced as te
+
+# 设置控制台编码为 UTF-8
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# ==================== 配置 ====================
+
+DEFAULT_FPS = 60
+DEFAULT_SECONDS = 60
+DEFAULT_SIZE = (530, 685)
+DEFAULT_SEED = 20250114
+QUEUE_SIZE = 32  # 待写入帧的上限（渲染过快时阻塞，限制内存占用）
+INPUT_INTERVAL_MS = 70  # 自动玩家两次按键之间的间隔
+GAME_OVER_TAIL_SECONDS = 2  # 游戏结束后继续录制的时长
+
+# ==================== 帧写入 ====================
+
+
+class PngSequenceWriter:
+    """PNG 序列写入器 - 在写入线程中用 zlib 压缩（压缩期间释放 GIL）"""
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.width, self.height = size
+        os.makedirs(directory, exist_ok=True)
+
+    def _chunk(self, tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    def write(self, index, frame):
+        """frame: RGB 原始字节"""
+        stride = self.width * 3
+        # 每行前加过滤类型 0（None）
+        raw = b''.join(b'\x00' + frame[y * stride:(y + 1) * stride] for y in range(self.height))
+        png = (b'\x89PNG\r\n\x1a\n' +
+               self._chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0)) +
+               self._chunk(b'IDAT', zlib.compress(raw, 6)) +
+               self._chunk(b'IEND', b''))
+        with open(os.path.join(self.directory, f'frame_{index:06d}.png'), 'wb') as f:
+            f.write(png)
+
+    def close(self):
+        pass
+
+    def describe(self):
+        return f"PNG 序列 -> {self.directory}"
+
+
+class FfmpegWriter:
+    """ffmpeg 写入器 - 原始 RGB 帧通过管道交给外部 ffmpeg 进程编码"""
+
+    def __init__(self, ffmpeg, path, size, fps):
+        self.path = path
+        command = [
+            ffmpeg, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f'{size[0]}x{size[1]}', '-r', str(fps),
+            '-i', '-',
+            '-pix_fmt', 'yuv420p',
+            path,
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, index, frame):
+        self.process.stdin.write(frame)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg 退出码 {self.process.returncode}")
+
+    def describe(self):
+        return f"ffmpeg -> {self.path}"
+
+
+class FrameEncoderThread:
+    """后台写入线程 - 从有界队列取帧交给写入器，和主线程的渲染并行"""
+
+    def __init__(self, writer, queue_size=QUEUE_SIZE):
+        self.writer = writer
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.written = 0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def _worker(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue  # 出错后丢弃剩余帧，让主线程尽快结束
+            try:
+                self.writer.write(*item)
+                self.written += 1
+            except Exception as e:
+                self.error = e
+
+    def submit(self, index, frame):
+        """提交一帧（队列满时阻塞）"""
+        if self.error is not None:
+            raise self.error
+        self.frames.put((index, frame))
+
+    def finish(self):
+        """等待所有帧写完并关闭写入器"""
+        self.frames.put(None)
+        self.thread.join()
+        if self.error is None:
+            self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+
+# ==================== 自动玩家 ====================
+
+
+class AutoPlayer:
+    """自动玩家 - 为每个新方块选择落点，再以固定间隔发送按键"""
+
+    def __init__(self, game):
+        self.game = game
+        self.actions = []
+        self.planned_for = None  # 已规划的方块（以 next_piece 的对象标识区分）
+        self.last_input_time = 0
+
+    def step(self, current_time):
+        game = self.game
+        if game.waiting_to_start:
+            self._press(pygame.K_SPACE)
+            return
+        if game.game_over or game.countdown_active or game.paused:
+            return
+
+        if self.planned_for != id(game.next_piece):
+            self.planned_for = id(game.next_piece)
+            self.actions = self._plan()
+            self.last_input_time = current_time
+
+        if self.actions and current_time - self.last_input_time >= INPUT_INTERVAL_MS:
+            self.last_input_time = current_time
+            self._press(game.keybind_manager.get_key(self.actions.pop(0)))
+
+    def _press(self, key):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+
+    def _plan(self):
+        """枚举旋转和横向位置，按经典启发式评分选出最佳落点"""
+        game = self.game
+        best = None
+        shape = game.current_piece
+        for rotation in range(4):
+            for x in range(-3, te.GRID_WIDTH):
+                if not game.valid_move(shape, x, game.current_y):
+                    continue
+                y = game.current_y
+                while game.valid_move(shape, x, y + 1):
+                    y += 1
+                score = self._evaluate(shape, x, y)
+                if best is None or score > best[0]:
+                    best = (score, rotation, x)
+            shape = game.rotate_piece(shape)
+
+        if best is None:
+            return ['hard_drop']
+        _, rotation, target_x = best
+        dx = target_x - game.current_x
+        return ['rotate'] * rotation + ['right' if dx > 0 else 'left'] * abs(dx) + ['hard_drop']
+
+    def _evaluate(self, shape, offset_x, offset_y):
+        grid = [row[:] for row in self.game.grid]
+        for y, row in enumerate(shape):
+            for x, cell in enumerate(row):
+                if cell and 0 <= offset_y + y < te.GRID_HEIGHT:
+                    grid[offset_y + y][offset_x + x] = cell
+
+        cleared = sum(1 for row in grid if all(row))
+        grid = [row for row in grid if not all(row)]
+        grid = [[0] * te.GRID_WIDTH for _ in range(cleared)] + grid
+
+        heights = []
+        holes = 0
+        for x in range(te.GRID_WIDTH):
+            column = [grid[y][x] for y in range(te.GRID_HEIGHT)]
+            top = next((y for y, cell in enumerate(column) if cell), te.GRID_HEIGHT)
+            heights.append(te.GRID_HEIGHT - top)
+            holes += sum(1 for cell in column[top:] if not cell)
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        return -0.51 * sum(heights) + 0.76 * cleared - 0.36 * holes - 0.18 * bumpiness
+
+
+# ==================== 导出 ====================
+
+
+def create_writer(args, size):
+    ffmpeg = shutil.which('ffmpeg')
+    use_ffmpeg = args.format == 'ffmpeg' or (args.format == 'auto' and ffmpeg)
+    if use_ffmpeg:
+        if not ffmpeg:
+            raise RuntimeError("未找到 ffmpeg，请安装后重试或使用 --format png")
+        return FfmpegWriter(ffmpeg, os.path.abspath(args.output or 'tetris_export.mp4'), size, args.fps)
+    return PngSequenceWriter(os.path.abspath(args.output or 'tetris_export_frames'), size)
+
+
+def export(args):
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+    writer = create_writer(args, size)
+    encoder = FrameEncoderThread(writer, args.queue)
+    print(f"🎬 导出 {writer.describe()} ({size[0]}x{size[1]} @ {args.fps}fps)")
+
+    frame_ms = 1000 / args.fps
+    max_frames = int(args.seconds * args.fps)
+    work_dir = tempfile.mkdtemp(prefix='tetris_export_')
+    old_cwd = os.getcwd()
+    os.chdir(work_dir)
+    frames = 0
+    start = time.perf_counter()
+    try:
+        random.seed(args.seed)
+        te.GameClock.use_virtual(0)
+        game = te.Tetris(renderer='surface')  # 直接读取 game.screen 的像素
+        game.sound_manager.enabled = False  # 只导出画面
+        game.sound_manager.music_enabled = False
+        if args.theme:
+            game.current_theme = next(t for t in te.THEMES if t.name == args.theme)
+            game.animation_manager.theme = game.current_theme
+        game.resize_window(*size)
+        player = AutoPlayer(game)
+
+        tail_frames = None
+        while frames < max_frames:
+            te.GameClock.advance(frame_ms)
+            player.step(te.GameClock.get_ticks())
+            game.handle_events()
+            game.update_game()
+            game.render_frame()
+
+            # 复制一份像素交给写入线程，主线程立即开始渲染下一帧
+            encoder.submit(frames, pygame.image.tobytes(game.screen, 'RGB'))
+            frames += 1
+
+            if game.game_over:
+                if tail_frames is None:
+                    tail_frames = int(GAME_OVER_TAIL_SECONDS * args.fps)
+                tail_frames -= 1
+                if tail_frames <= 0:
+                    break
+
+        render_elapsed = time.perf_counter() - start
+        encoder.finish()
+
+        game.statistics._stop_thread = True
+        if game.statistics._save_thread:
+            game.statistics._save_thread.join(timeout=1.0)
+    finally:
+        te.GameClock.use_real()
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    video_seconds = frames / args.fps
+    print(f"✅ {frames} 帧（{video_seconds:.1f} 秒），分数 {game.score}，"
+          f"渲染 {render_elapsed:.1f} 秒，总耗时 {elapsed:.1f} 秒，"
+          f"为实时速度的 {video_seconds / max(elapsed, 1e-6):.1f} 倍")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="俄罗斯方块视频导出")
+    parser.add_argument('--output', default='', help="输出文件（ffmpeg）或目录（PNG 序列）")
+    parser.add_argument('--format', choices=['auto', 'ffmpeg', 'png'], default='auto',
+                        help="auto: 有 ffmpeg 时导出视频，否则导出 PNG 序列")
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help="帧率")
+    parser.add_argument('--seconds', type=float, default=DEFAULT_SECONDS, help="最长导出时长（秒）")
+    parser.add_argument('--size', default=f'{DEFAULT_SIZE[0]}x{DEFAULT_SIZE[1]}', help="画面尺寸，如 530x685")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument('--theme', choices=[t.name for t in te.THEMES], help="主题（默认随机）")
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help="待写入帧队列长度")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(export(parse_args()))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  用户中断")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
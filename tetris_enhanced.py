@@ -30,8 +30,24 @@ import math
 import array
 import threading
 import queue
+import time
+import heapq
+import copy
+import gc
+import hashlib
+from collections import deque, OrderedDict
 from datetime import datetime
 
+try:
+    from pygame._sdl2 import video as sdl2_video  # 可选：纹理渲染后端
+except ImportError:
+    sdl2_video = None
+
+try:
+    import numpy  # 可选：霓虹泛光的模糊（没有时用缩小再放大近似）
+except ImportError:
+    numpy = None
+
 # 初始化 Pygame 和音频
 pygame.init()
 pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
@@ -67,6 +83,10 @@ SHADOW_COLORS = [
 
 # ==================== 主题系统 ====================
 
+# 默认消除光带颜色：消除行数 -> 颜色（4 行为彩虹光效，这里是发光层颜色）
+DEFAULT_BEAM_COLORS = {1: (0, 255, 255), 2: (0, 255, 100), 3: (200, 0, 255), 4: (255, 255, 255)}
+
+
 class GameTheme:
     """游戏主题类 - 定义配色、音乐风格和视觉效果"""
 
@@ -82,7 +102,11 @@ class GameTheme:
                  # 音乐配置 (调式: major/minor, 速度: 0.5-2.0, 风格)
                  music_scale, music_speed, music_style,
                  # 特殊效果
-                 bg_effect_type):  # 'gradient', 'particles', 'waves', 'stars', 'aurora'
+                 bg_effect_type,  # 'gradient', 'particles', 'waves', 'stars', 'aurora'
+                 # 渲染风格（默认与主题名相同，对应 Tetris._draw_block_* / _build_ghost_*）
+                 block_style=None, ghost_style=None,
+                 # 消除光带颜色：消除行数 (1-4) -> 颜色
+                 beam_colors=None):
         self.name = name
         self.display_name = display_name
         self.description = description
@@ -114,6 +138,263 @@ class GameTheme:
         # 背景特效类型
         self.bg_effect_type = bg_effect_type
 
+        # 渲染风格
+        self.block_style = block_style or name
+        self.ghost_style = ghost_style or name
+        self.beam_colors = beam_colors or DEFAULT_BEAM_COLORS
+        self.renderer = None  # 启用时构建的 ThemeRenderer
+
+    def activate(self, game):
+        """启用主题：第一次启用时构建渲染策略，之后直接复用"""
+        if self.renderer is None or self.renderer.game is not game:
+            self.renderer = ThemeRenderer(game, self)
+        return self.renderer
+
+
+# 霓虹模式下已落下方块的泛光：方块风格 -> (发光半径（基准方块大小下的像素）, 强度)，None 为不发光
+BLOCK_GLOW = {
+    'neon_city': (18, 0.35),
+    'space_scifi': (8, 0.3),
+    'ocean_world': (5, 0.25),
+    'sunset_dusk': (6, 0.4),
+    'forest_mystic': (8, 0.3),
+    'retro_pixel': None,  # 8-bit 风格，方块本身也不发光
+    'default': (10, 0.3),
+}
+
+
+def _box_blur(pixels, radius, axis):
+    """沿一个轴做半径为 radius 的均值模糊（前缀和，边界外按黑色）"""
+    pad = [(0, 0)] * pixels.ndim
+    pad[axis] = (radius + 1, radius)
+    total = numpy.cumsum(numpy.pad(pixels, pad), axis=axis)
+    n = pixels.shape[axis]
+    window = 2 * radius + 1
+    return (numpy.take(total, range(window, window + n), axis=axis)
+            - numpy.take(total, range(n), axis=axis)) / window
+
+
+def bloom(source, size, radius, strength):
+    """泛光后处理：缩小尺寸的发光源模糊后放大到 size，按 strength 压暗（加法混合用，黑色为不发光）
+
+    Args:
+        source: 缩小尺寸的发光源（不透明表面）
+        size: 放大后的尺寸
+        radius: 模糊半径（发光源的像素）
+        strength: 发光强度 0-1
+    """
+    # 模糊和压暗都在缩小的尺寸上做，最后只放大一次
+    if numpy is not None:
+        # 两次均值模糊近似高斯模糊
+        pixels = pygame.surfarray.array3d(source).astype(numpy.float32)
+        for axis in (0, 1):
+            pixels = _box_blur(_box_blur(pixels, radius, axis), radius, axis)
+        blurred = SURFACES.create(source.get_size(), alpha=False)
+        pygame.surfarray.blit_array(blurred, (pixels * strength).astype(numpy.uint8))
+    else:
+        width, height = source.get_size()
+        tiny = pygame.transform.smoothscale(source, (max(1, width // (radius + 1)), max(1, height // (radius + 1))))
+        blurred = pygame.transform.smoothscale(tiny, (width, height))
+        level = int(255 * strength)
+        blurred.fill((level, level, level), special_flags=pygame.BLEND_RGB_MULT)
+    return pygame.transform.smoothscale(blurred, size)
+
+
+class BackgroundPainter:
+    """背景绘制上下文 - 背景风格函数只通过它取随机数、创建表面和渐变色表
+
+    主线程（ThemeRenderer.painter）和背景渲染线程各用各的一份，互不干扰。
+    """
+
+    def __init__(self, theme, surfaces):
+        self.theme = theme
+        self.surfaces = surfaces  # 创建表面用的工厂
+        self.rng = random.Random()  # 背景装饰专用随机数（按时间播种），不影响方块序列
+        self._gradient = None  # (窗口高度, 每隔 2 行的 (y, 颜色))
+
+    def create(self, size, alpha=True):
+        """创建窗口格式的表面"""
+        return self.surfaces.create(size, alpha)
+
+    def gradient_colors(self, height):
+        """渐变背景每隔 2 行的 (y, 颜色)，按窗口高度缓存"""
+        if self._gradient is None or self._gradient[0] != height:
+            top, bottom = self.theme.bg_color, self.theme.bg_color2
+            colors = []
+            for y in range(0, height, 2):
+                ratio = y / height
+                colors.append((y, (int(top[0] * (1 - ratio) + bottom[0] * ratio),
+                                   int(top[1] * (1 - ratio) + bottom[1] * ratio),
+                                   int(top[2] * (1 - ratio) + bottom[2] * ratio))))
+            self._gradient = (height, colors)
+        return self._gradient[1]
+
+
+class ThemeRenderer:
+    """主题渲染策略 - 主题启用时构建一次
+
+    方块、幽灵方块、背景的绘制函数在这里按风格名选定，逐格绘制时直接调用，不再比较主题名；
+    新增主题只需在 GameTheme 中指定风格名（或新增对应的绘制方法）。
+    选定的是未绑定的函数，调用时传入正在绘制的游戏对象（渲染线程绘制时是快照，不是 self.game）。
+    """
+
+    def __init__(self, game, theme):
+        self.game = game
+        self.theme = theme
+        styles = type(game)
+        self.draw_block = getattr(styles, '_draw_block_' + theme.block_style, styles._draw_block_default)
+        self.build_ghost = getattr(styles, '_build_ghost_' + theme.ghost_style, styles._build_ghost_default)
+        self.draw_background = getattr(styles, '_draw_background_' + theme.bg_effect_type,
+                                       styles._draw_background_default)
+        # 霓虹城市的幽灵方块带移动的扫描线
+        self.ghost_scanline = theme.ghost_style == 'neon_city'
+        # 颜色索引 -> (主色, 高光, 阴影)
+        self.block_colors = tuple(zip(theme.piece_colors, theme.highlight_colors, theme.shadow_colors))
+        self.painter = BackgroundPainter(theme, SURFACES)  # 主线程的背景绘制上下文
+        self.glow = BLOCK_GLOW.get(theme.block_style, BLOCK_GLOW['default'])  # 棋盘泛光 (半径, 强度) 或 None
+        # 纯色背景没有动画，每帧直接填充；其余风格按背景频率重绘，画面双缓冲
+        self.animated_background = self.draw_background is not styles._draw_background_default
+        self._bg_front = None  # (签名, 表面) 当前显示的画面
+        self._bg_back = None  # (签名, 表面) 下一张画面（或可复用的旧表面），后台绘制期间主线程不碰
+        self._bg_lock = threading.Lock()  # 后台线程挂回画面与释放缓冲互斥
+
+    def draw_background_layer(self, width, height, current_time, hz=0, crossfade=False, worker=None):
+        """绘制背景层：hz 为 0 时每帧重绘；否则按自己的时钟每 1/hz 秒重绘一次，其间复用缓存的画面
+
+        crossfade 为 True 时从当前画面向下一张画面交叉淡化（下一张提前绘制）。
+        worker 为 BackgroundWorker 时下一张画面在后台线程绘制，到点时在帧开始处交换前后缓冲。
+        """
+        screen = self.game.screen
+        if not hz or not self.animated_background:
+            self.draw_background(self.game, screen, self.painter, width, height, current_time)
+            return
+
+        interval = 1000 / hz
+        tick = int(current_time // interval)
+        signature = (width, height, SURFACES.generation, interval, tick)
+        front = self._bg_front
+        if front is None or front[0] != signature:
+            if worker is not None and worker.pending(self):
+                if front is None or front[0][:4] != signature[:4]:
+                    # 尺寸/频率变了，旧画面不能用：前缓冲不归后台线程管，直接同步重画
+                    # （后台正在画的那张签名对不上，之后会被丢弃）
+                    self._bg_front = self._render_frame(front, signature)
+                # 否则下一张还在后台绘制：继续显示当前画面
+            else:
+                back = self._bg_back
+                if back is not None and back[0] == signature:
+                    front, back = back, front
+                else:
+                    front = self._render_frame(front, signature)
+                self._bg_front, self._bg_back = front, back
+                if worker is not None or crossfade:
+                    following = signature[:4] + (tick + 1,)
+                    if worker is not None:
+                        worker.submit(self, back, following)
+                    else:
+                        self._bg_back = self._render_frame(back, following)
+
+        front = self._bg_front
+        back = self._bg_back
+        if (crossfade and back is not None and back[0] == signature[:4] + (tick + 1,)
+                and (worker is None or not worker.pending(self))):
+            screen.blit(front[1], (0, 0))
+            back[1].set_alpha(int(255 * min(1.0, (current_time - tick * interval) / interval)))
+            screen.blit(back[1], (0, 0))
+            back[1].set_alpha(None)
+        else:
+            screen.blit(front[1], (0, 0))
+
+    def _render_frame(self, buffer, signature, painter=None):
+        """把签名对应时刻的背景画进缓冲（尺寸和窗口格式相同时复用旧表面），返回 (签名, 表面)
+
+        painter 为绘制所在线程的背景绘制上下文（默认主线程的）。
+        """
+        painter = painter or self.painter
+        width, height, generation, interval, tick = signature
+        if buffer is not None and buffer[0][:3] == signature[:3]:
+            surface = buffer[1]
+        else:
+            surface = painter.create((width, height), alpha=False)
+        self.draw_background(self.game, surface, painter, width, height, tick * interval)
+        return (signature, surface)
+
+    def attach_background(self, frame):
+        """挂上后台线程画好的下一张画面（主题已停用、缓冲已释放时丢弃）"""
+        with self._bg_lock:
+            if self._bg_front is not None:
+                self._bg_back = frame
+
+    def release_background(self):
+        """释放缓存的背景画面（主题停用时调用）"""
+        with self._bg_lock:
+            self._bg_front = None
+            self._bg_back = None
+
+
+class BackgroundWorker:
+    """背景渲染线程 - 动态背景的下一张画面在后台画进后缓冲，主线程只合成前缓冲
+
+    与当帧的绘制并行（pygame 的填充、画线和 blit 会释放 GIL）。线程用自己的表面工厂和
+    背景绘制上下文，不碰主线程的 SURFACES / SIZE_CACHE；出错时记在 error 中，由主循环抛出。
+    """
+
+    def __init__(self):
+        self.error = None  # 后台绘制抛出的异常
+        self.surfaces = SurfaceFactory()  # 本线程的表面工厂（像素格式随任务从主线程带过来）
+        self._painters = {}  # 主题名 -> 本线程的背景绘制上下文
+        self._formats = None  # 主线程 SURFACES.formats() 的结果（窗口重建后更新）
+        self._condition = threading.Condition()
+        self._job = None  # 等待开始的一张 (渲染策略, 缓冲, 签名, 像素格式)
+        self._busy = None  # 正在绘制的主题渲染策略
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, renderer, buffer, signature):
+        """提交一张画面（不等待）：画完后写入 renderer 的后缓冲；还没开始的上一张被直接替换"""
+        if self._formats is None or self._formats[2] != SURFACES.generation:
+            self._formats = SURFACES.formats()
+        with self._condition:
+            self._job = (renderer, buffer, signature, self._formats)
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """等待已提交的画面全部画完（基准测试取画面校验和前调用）"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._job is None and self._busy is None, timeout)
+
+    def pending(self, renderer):
+        """renderer 的后缓冲是否正在（或等待）后台绘制"""
+        job = self._job
+        return self._busy is renderer or (job is not None and job[0] is renderer)
+
+    def _painter(self, theme):
+        """本线程绘制 theme 背景用的上下文"""
+        painter = self._painters.get(theme.name)
+        if painter is None or painter.theme is not theme:
+            painter = self._painters[theme.name] = BackgroundPainter(theme, self.surfaces)
+        return painter
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._job is None:
+                    self._condition.wait()
+                renderer, buffer, signature, formats = self._job
+                self._busy = renderer
+                self._job = None
+            try:
+                self.surfaces.use_formats(formats)
+                with HITCHES.span('background', renderer.theme.name):
+                    frame = renderer._render_frame(buffer, signature, self._painter(renderer.theme))
+                renderer.attach_background(frame)
+            except Exception as e:
+                self.error = e
+            finally:
+                with self._condition:
+                    self._busy = None
+                    self._condition.notify_all()
+
 
 # 定义6个独特的主题
 THEMES = [
@@ -274,6 +555,7 @@ GRID_HEIGHT = 21  # 调整为21以匹配右边卡片高度
 BLOCK_SIZE = 25
 GRID_X_OFFSET = 40
 GRID_Y_OFFSET = 40  # 保持原来的值
+GLOW_PAD = 20  # 预渲染小图和预览卡片四周留给发光的边距（发光最多超出方块 18 像素，霓虹城市）
 
 WINDOW_WIDTH = GRID_WIDTH * BLOCK_SIZE + GRID_X_OFFSET * 2 + 200
 WINDOW_HEIGHT = GRID_HEIGHT * BLOCK_SIZE + GRID_Y_OFFSET * 2 + 120
@@ -290,6 +572,168 @@ SHAPES = [
 ]
 
 
+class GameClock:
+    """游戏时钟 - 游戏逻辑和动画计时的统一入口
+
+    默认读取 pygame 实时时钟；基准测试、离线导出时切换为虚拟时钟，
+    由调用方按固定步长推进，保证结果可复现。
+    """
+
+    virtual_ms = None  # 虚拟时间（毫秒），None 表示使用实时时钟
+
+    @classmethod
+    def get_ticks(cls):
+        """当前时间（毫秒）"""
+        if cls.virtual_ms is None:
+            return pygame.time.get_ticks()
+        return int(cls.virtual_ms)
+
+    @classmethod
+    def use_virtual(cls, start_ms=0):
+        """切换到虚拟时钟"""
+        cls.virtual_ms = start_ms
+
+    @classmethod
+    def use_real(cls):
+        """恢复实时时钟"""
+        cls.virtual_ms = None
+
+    @classmethod
+    def advance(cls, ms):
+        """推进虚拟时钟（实时时钟下无效）"""
+        if cls.virtual_ms is not None:
+            cls.virtual_ms += ms
+
+
+class SurfaceFactory:
+    """表面工厂 - 所有绘制代码和缓存通过它创建表面
+
+    新表面直接使用窗口的像素格式（相当于 convert / convert_alpha，但不多拷贝一次），
+    blit 时不需要逐像素转换格式。每次 set_mode 后 generation 加一，
+    以格式为前提的缓存把 generation 放进签名，窗口重建后自动按新格式重建。
+    """
+
+    def __init__(self):
+        self.generation = 0  # 窗口表面重建次数
+        self.allocations = 0  # 累计创建的表面数
+        self.frame_allocations = 0  # 本帧创建的表面数（由性能分析器读取并清零）
+        self._alpha_format = None  # 带透明通道的参考表面
+        self._opaque_format = None  # 不透明参考表面（即窗口表面）
+
+    def display_changed(self, screen):
+        """窗口表面（重新）创建后调用，记录新的像素格式"""
+        self._opaque_format = screen
+        try:
+            self._alpha_format = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+        except pygame.error:
+            # 纹理渲染后端没有 pygame 显示表面，使用默认的 32 位透明格式
+            self._alpha_format = pygame.Surface((1, 1), pygame.SRCALPHA)
+        self.generation += 1
+
+    def create(self, size, alpha=True):
+        """创建窗口格式的表面（alpha=True 时带逐像素透明）"""
+        self.allocations += 1
+        self.frame_allocations += 1
+        if alpha:
+            if self._alpha_format is not None:
+                return pygame.Surface(size, pygame.SRCALPHA, self._alpha_format)
+            return pygame.Surface(size, pygame.SRCALPHA)
+        if self._opaque_format is not None:
+            return pygame.Surface(size, 0, self._opaque_format)
+        return pygame.Surface(size)
+
+    def formats(self):
+        """当前像素格式的独立参考表面 (不透明, 透明, generation)，交给其他线程自己的工厂使用"""
+        return (self.create((1, 1), alpha=False), self.create((1, 1)), self.generation)
+
+    def use_formats(self, formats):
+        """改用 formats() 取得的像素格式（在使用本工厂的线程中调用）"""
+        self._opaque_format, self._alpha_format, self.generation = formats
+
+    def take_frame_allocations(self):
+        """读取并清零本帧的分配数"""
+        count = self.frame_allocations
+        self.frame_allocations = 0
+        return count
+
+
+SURFACES = SurfaceFactory()
+
+
+class SizeBucketCache:
+    """按尺寸档位分组的资源缓存（全局 LRU）
+
+    与尺寸有关的资源（方块/幽灵方块小图、字体、特效纹理、渐变背景……）都放进当前档位；
+    档位由 select 切换（通常是量化后的缩放因子），超过 max_buckets 时整档淘汰最久没用过的档。
+    窗口来回缩放时命中已有的档，内存随档数有界。
+    """
+
+    def __init__(self, max_buckets=4):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()  # 档位 -> {资源键: 资源}，最近使用的在末尾
+        self.current_key = None
+        self.current = {}  # 当前档（第一次 select 之前是不计入 LRU 的临时档）
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def select(self, key):
+        """切换到档位（没有则新建，必要时淘汰最久未用的档），返回该档的字典"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+        self.current_key = key
+        self.current = bucket
+        return bucket
+
+    def get(self, key, build):
+        """从当前档取资源，没有时调用 build() 创建并放入"""
+        item = self.current.get(key)
+        if item is None:
+            self.misses += 1
+            item = self.current[key] = build()
+        else:
+            self.hits += 1
+        return item
+
+    def discard(self, key):
+        """从当前档移除资源"""
+        self.current.pop(key, None)
+
+    def font(self, path, size):
+        """按字号缓存的字体（path 为 None 或加载失败时使用默认字体）"""
+        return self.get(('font', path, size), lambda: _load_font(path, size))
+
+    def clear(self):
+        """清空所有档"""
+        self._buckets.clear()
+        self.current = {}
+        if self.current_key is not None:
+            self.select(self.current_key)
+
+    def get_stats(self):
+        """档数、当前档资源数、命中/未命中/淘汰次数"""
+        return {'buckets': len(self._buckets), 'items': len(self.current),
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+def _load_font(path, size):
+    """加载字体（失败时使用默认字体）"""
+    try:
+        return pygame.font.Font(path, size)
+    except Exception:
+        return pygame.font.Font(None, size)
+
+
+# 全局尺寸档位缓存（Tetris.update_layout 按缩放因子切换档位）
+SIZE_CACHE = SizeBucketCache()
+
+
 class SettingsManager:
     """游戏设置管理器"""
 
@@ -302,7 +746,19 @@ class SettingsManager:
             'sfx_volume': 0.5,
             'show_ghost': True,
             'neon_mode': True,  # 默认开启霓虹模式
-            'theme': 'default'
+            'theme': 'default',
+            'frame_pacing': 'capped',  # 帧节奏模式：capped / uncapped / vsync
+            'target_fps': 60,  # 限帧模式下的目标帧率
+            'effect_sim_hz': 0,  # 特效模拟频率（0 = 与渲染同步）
+            'background_hz': 20,  # 动态背景重绘频率（0 = 每帧重绘），其间复用上一张画面
+            'background_crossfade': False,  # 背景相邻两张画面之间交叉淡化
+            'background_thread': True,  # 下一张背景画面在后台线程绘制（双缓冲）
+            'renderer': 'surface',  # 渲染后端：surface / texture / software（启动时生效）
+            'resolution_mode': 'native',  # 画布分辨率：native / base / integer
+            'next_count': 1,  # 预览方块数量（1-6）
+            'hitch_detection': True,  # 卡顿检测（超出帧预算的帧记入环形缓冲，F4 导出）
+            'scale_filter': 'smooth',  # 画布缩放过滤：smooth / nearest
+            'render_thread': False  # 绘制放到单独的渲染线程（启动时生效，仅 Surface 后端）
         }
         self.load_settings()
 
@@ -319,7 +775,7 @@ class SettingsManager:
     def save_settings(self):
         """保存设置"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
+            with HITCHES.span('save', self.filename), open(self.filename, 'w', encoding='utf-8') as f:
                 json.dump(self.settings, f, indent=2, ensure_ascii=False)
         except (PermissionError, IOError):
             pass
@@ -479,7 +935,23 @@ class SoundManager:
         self.background_music = None
         self.music_channel = None
         self.generate_sounds()
-        self.generate_background_music()
+
+        # 背景音乐在后台线程中合成（每首要几秒），合成好之前不阻塞游戏
+        self.music_cache = {}  # 主题名 -> 合成好的 Sound
+        self.music_theme = None  # 当前主题（应当播放它的音乐）
+        self._music_wanted = False  # 音乐还没合成好时记下"要播放"，合成好后自动开始
+        self._music_loops = -1
+        self._music_jobs = queue.PriorityQueue()  # (优先级, 序号, 主题)，当前主题优先于预取
+        self._music_job_seq = 0
+        self._music_requested = set()  # 已排队或已合成的主题名
+        self._music_results = {}  # 主题名 -> 采样数据（后台线程写入，主线程转成 Sound）
+        self._music_failures = {}  # 主题名 -> 合成失败的原因（后台线程写入，主线程取走）
+        self.music_errors = {}  # 主题名 -> 合成失败的原因（这些主题不再重试，没有背景音乐）
+        self._music_lock = threading.Lock()
+        self._music_thread = None
+        # 主线程空闲（帧间等待）时置位：后台合成只在这时推进，不和绘制争抢 GIL
+        self.music_gate = threading.Event()
+        self.music_gate.set()
 
     def generate_tone(self, frequency, duration, volume=0.3):
         """生成音调"""
@@ -496,7 +968,7 @@ class SoundManager:
         return pygame.mixer.Sound(buffer=sound_array)
 
     def generate_background_music(self, theme=None):
-        """生成背景音乐（循环旋律）- 为每个主题生成独特的主题曲"""
+        """生成背景音乐（循环旋律）- 同步合成，需要几秒；游戏中切换主题用 set_music_theme"""
         if theme is None:
             # 默认使用霓虹城市主题
             theme = THEMES[0]
@@ -505,6 +977,23 @@ class SoundManager:
         if self.background_music:
             self.background_music.stop()
 
+        self.background_music = self.music_cache.get(theme.name)
+        if self.background_music is None:
+            self.background_music = pygame.mixer.Sound(buffer=self.synthesize_music(theme))
+            self.music_cache[theme.name] = self.background_music
+        self.music_theme = theme
+
+    def synthesize_music(self, theme, pause=None):
+        """合成主题曲的采样数据（纯计算，不调用 pygame，可以在后台线程中运行）
+
+        Args:
+            theme: 主题
+            pause: 每合成一小段调用一次的让步函数（后台线程用它避开主线程绘制）
+
+        Returns:
+            array.array('h')：44.1kHz 立体声交错采样
+        """
+        rng = random.Random(theme.name)  # 噪音用独立随机数，不影响（也不受影响于）方块序列
         sample_rate = 44100
         duration = 20.0  # 延长到20秒，让循环不那么频繁
         n_samples = int(sample_rate * duration)
@@ -654,13 +1143,17 @@ class SoundManager:
             adjusted_dur = dur / theme.music_speed
             melody.append((freq, adjusted_dur))
 
-        samples = []
+        # 单声道采样（左右声道相同，最后再交错成立体声）；
+        # 不用 [左, 右] 小列表，避免几十万个对象拖慢垃圾回收
+        samples = array.array('h')
         current_time = 0
 
         for freq, dur in melody:
             note_samples = int(sample_rate * dur)
             for t in range(note_samples):
                 t_total = current_time + t
+                if pause and not t_total & 1023:
+                    pause()
                 value = 0
 
                 # 根据波形类型生成不同的音色
@@ -702,7 +1195,7 @@ class SoundManager:
                     # 自然音：木管乐器感觉
                     value += main_vol * math.sin(2 * math.pi * freq * t_total / sample_rate)
                     # 添加轻微的噪音特性
-                    noise = 0.02 * (random.random() - 0.5)
+                    noise = 0.02 * (rng.random() - 0.5)
                     value += noise
 
                 # 琶音效果（用于电子和复古风格）
@@ -727,39 +1220,132 @@ class SoundManager:
                 value += bass_vol * math.sin(2 * math.pi * bass_freq * t_total / sample_rate)
 
                 sample_value = int(overall_vol * 32767 * value * envelope)
-                samples.append([sample_value, sample_value])
+                samples.append(sample_value)
 
             current_time += note_samples
 
         # 🎵 添加全局淡出效果，让循环更自然
         # 在最后3秒逐渐降低音量
         fade_out_samples = int(sample_rate * 3.0)  # 最后3秒
-        for i in range(len(samples)):
-            if i >= len(samples) - fade_out_samples:
-                # 计算淡出进度 (0.0 到 1.0)
-                fade_progress = (i - (len(samples) - fade_out_samples)) / fade_out_samples
-                # 使用余弦曲线实现平滑淡出
-                fade_factor = 0.3 + 0.7 * (1 + math.cos(fade_progress * math.pi)) / 2
-                samples[i][0] = int(samples[i][0] * fade_factor)
-                samples[i][1] = int(samples[i][1] * fade_factor)
+        for i in range(max(0, len(samples) - fade_out_samples), len(samples)):
+            if pause and not i & 1023:
+                pause()
+            # 计算淡出进度 (0.0 到 1.0)
+            fade_progress = (i - (len(samples) - fade_out_samples)) / fade_out_samples
+            # 使用余弦曲线实现平滑淡出
+            fade_factor = 0.3 + 0.7 * (1 + math.cos(fade_progress * math.pi)) / 2
+            samples[i] = int(samples[i] * fade_factor)
 
         # 填充到完整长度
-        while len(samples) < n_samples:
-            samples.append([0, 0])
+        if len(samples) < n_samples:
+            samples.extend(array.array('h', bytes(2 * (n_samples - len(samples)))))
 
-        sound_array = array.array('h', [item for sublist in samples for item in sublist])
-        self.background_music = pygame.mixer.Sound(buffer=sound_array)
+        # 交错成立体声（左右声道相同）
+        sound_array = array.array('h', bytes(4 * len(samples)))
+        sound_array[0::2] = samples
+        sound_array[1::2] = samples
+        return sound_array
+
+    def prepare_music(self, theme, urgent=False):
+        """把主题曲放进后台合成队列（已合成或已排队则忽略）
+
+        Args:
+            theme: 要准备的主题
+            urgent: 当前主题要用的音乐，排在预取任务之前
+        """
+        if theme.name in self.music_cache or theme.name in self.music_errors:
+            return
+        if theme.name in self._music_requested and not urgent:
+            return
+        self._music_requested.add(theme.name)
+        self._music_job_seq += 1
+        self._music_jobs.put((0 if urgent else 1, self._music_job_seq, theme))
+        if self._music_thread is None or not self._music_thread.is_alive():
+            self._music_thread = threading.Thread(target=self._music_worker, daemon=True)
+            self._music_thread.start()
+
+    def _music_worker(self):
+        """后台合成线程：按优先级逐首合成"""
+        while True:
+            _, _, theme = self._music_jobs.get()
+            try:
+                with self._music_lock:
+                    done = (theme.name in self._music_results or theme.name in self.music_cache
+                            or theme.name in self._music_failures or theme.name in self.music_errors)
+                if not done:
+                    samples = self.synthesize_music(theme, pause=self._music_pause)
+                    with self._music_lock:
+                        self._music_results[theme.name] = samples
+            except Exception as e:
+                # 记下失败原因，由主线程在 update 中登记（这个主题没有背景音乐）
+                with self._music_lock:
+                    self._music_failures[theme.name] = f"{type(e).__name__}: {e}"
+            finally:
+                self._music_jobs.task_done()
+
+    def _music_pause(self):
+        """后台合成的让步点：主线程正在绘制时等到帧间空闲（一帧特别长或不限帧时最多等 20 毫秒）"""
+        self.music_gate.wait(0.02)
+
+    def wait_for_music(self):
+        """等待后台合成队列清空（基准测试、视频导出用，避免后台合成占用 CPU）"""
+        if self._music_thread is not None:
+            self._music_jobs.join()
+        self.update()
+
+    def is_music_ready(self, theme=None):
+        """主题曲是否已合成完毕（默认为当前主题；合成失败也算完毕，只是没有音乐）"""
+        theme = theme or self.music_theme
+        if theme is None:
+            return True
+        with self._music_lock:
+            return (theme.name in self.music_cache or theme.name in self._music_results
+                    or theme.name in self._music_failures or theme.name in self.music_errors)
+
+    def set_music_theme(self, theme):
+        """切换到主题的音乐（先停止旧音乐）：已合成好就立即换上，否则排队合成，合成好后由 update 接上"""
+        self.stop_music()
+        self.music_theme = theme
+        self.background_music = self.music_cache.get(theme.name)
+        if self.background_music is None and self.music_enabled:
+            self.prepare_music(theme, urgent=True)
+
+    def update(self):
+        """每帧调用：把后台合成好的采样转成 Sound，当前主题的音乐到了就开始播放"""
+        if not self._music_results and not self._music_failures:
+            return
+        with self._music_lock:
+            results, self._music_results = self._music_results, {}
+            failures, self._music_failures = self._music_failures, {}
+        for name, samples in results.items():
+            HITCHES.note('music', name)
+            try:
+                self.music_cache[name] = pygame.mixer.Sound(buffer=samples)
+            except Exception as e:
+                failures[name] = f"{type(e).__name__}: {e}"
+        for name, error in failures.items():
+            HITCHES.note('music_error', f"{name}: {error}")
+            self.music_errors[name] = error
+        if self.background_music is None and self.music_theme is not None:
+            self.background_music = self.music_cache.get(self.music_theme.name)
+            if self.background_music is not None and self._music_wanted:
+                self.play_music(self._music_loops)
 
     def play_music(self, loops=-1):
-        """播放背景音乐（loops=-1表示无限循环）"""
+        """播放背景音乐（loops=-1表示无限循环）；音乐还在合成时，合成好后自动开始"""
+        self._music_wanted = True
+        self._music_loops = loops
         if self.music_enabled and self.background_music:
             # 开局时音乐音量增加20%
             boosted_volume = min(1.0, self.music_volume * 1.2)
             self.background_music.set_volume(boosted_volume)
             self.background_music.play(loops=loops)
+        elif self.music_enabled and self.music_theme is not None:
+            self.prepare_music(self.music_theme, urgent=True)
 
     def stop_music(self):
         """停止背景音乐"""
+        self._music_wanted = False
         if self.background_music:
             self.background_music.stop()
 
@@ -821,10 +1407,21 @@ class SoundManager:
         return self.enabled
 
 
+# 特效按时间推进：参数仍按 60 FPS 时每帧的变化量给出，update(steps) 中 steps 为经过的“帧数”（可为小数），
+# 各效果使用与逐帧累加等价的闭式公式，所以不同帧率下同一时刻的画面相同
+EFFECT_STEP_MS = 1000 / 60
+
+
 class Particle:
     """粒子效果类"""
 
+    __slots__ = ('x', 'y', 'color', 'vx', 'vy', 'life', 'decay', 'size')
+
     def __init__(self, x, y, color):
+        self.reset(x, y, color)
+
+    def reset(self, x, y, color):
+        """重新初始化（对象池回收复用时调用）"""
         self.x = x
         self.y = y
         self.color = color
@@ -834,19 +1431,25 @@ class Particle:
         self.decay = random.uniform(0.02, 0.05)
         self.size = random.uniform(3, 6)
 
-    def update(self):
-        """更新粒子状态"""
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.2  # 重力
-        self.life -= self.decay
+    def update(self, steps=1.0):
+        """更新粒子状态（steps: 经过的 60 FPS 帧数）"""
+        self.x += self.vx * steps
+        # 重力：与逐帧 y += vy; vy += 0.2 的累加结果一致
+        self.y += self.vy * steps + 0.1 * steps * (steps - 1)
+        self.vy += 0.2 * steps
+        self.life -= self.decay * steps
+        return self.life > 0
+
+    def remaining_steps(self):
+        """距离消失还有多少帧"""
+        return self.life / self.decay
 
     def draw(self, surface):
         """绘制粒子"""
         if self.life > 0:
             alpha = int(self.life * 255)
             color = (*self.color[:3], alpha)
-            s = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
+            s = SURFACES.create((int(self.size * 2), int(self.size * 2)))
             pygame.draw.circle(s, color, (int(self.size), int(self.size)), int(self.size))
             surface.blit(s, (int(self.x - self.size), int(self.y - self.size)))
 
@@ -854,7 +1457,17 @@ class Particle:
 class SuckInParticle:
     """吸入式粒子 - 从边缘向中心移动，创造真空效果"""
 
+    __slots__ = ('x', 'y', 'target_x', 'target_y', 'color', 'vx', 'vy',
+                 'life', 'decay', 'size', 'trail', 'trail_time')
+
+    ACCELERATION = 1.05  # 每帧速度倍数（越接近目标越快）
+
     def __init__(self, x, y, target_x, target_y, color, speed=3.0):
+        self.trail = deque(maxlen=5)  # 尾迹效果（只保留最近 5 个位置）
+        self.reset(x, y, target_x, target_y, color, speed)
+
+    def reset(self, x, y, target_x, target_y, color, speed=3.0):
+        """重新初始化（对象池回收复用时调用）"""
         self.x = x
         self.y = y
         self.target_x = target_x
@@ -877,23 +1490,31 @@ class SuckInParticle:
         self.life = 1.0
         self.decay = random.uniform(0.015, 0.03)
         self.size = random.uniform(2, 5)
-        self.trail = []  # 尾迹效果
-
-    def update(self):
-        """更新粒子状态 - 向目标移动"""
-        # 保存位置用于尾迹
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > 5:
-            self.trail.pop(0)
-
-        self.x += self.vx
-        self.y += self.vy
-
-        # 加速效果（越接近目标越快）
-        self.vx *= 1.05
-        self.vy *= 1.05
+        self.trail.clear()
+        self.trail_time = 0.0
+
+    def update(self, steps=1.0):
+        """更新粒子状态 - 向目标移动（steps: 经过的 60 FPS 帧数）"""
+        # 保存位置用于尾迹（按时间采样，帧率高时尾迹长度不变）
+        self.trail_time += steps
+        if self.trail_time >= 1.0:
+            self.trail_time %= 1.0
+            self.trail.append((self.x, self.y))
+
+        # 加速效果（越接近目标越快）：位移为逐帧等比累加的和
+        growth = self.ACCELERATION ** steps
+        distance = (growth - 1) / (self.ACCELERATION - 1)
+        self.x += self.vx * distance
+        self.y += self.vy * distance
+        self.vx *= growth
+        self.vy *= growth
+
+        self.life -= self.decay * steps
+        return self.life > 0
 
-        self.life -= self.decay
+    def remaining_steps(self):
+        """距离消失还有多少帧"""
+        return self.life / self.decay
 
     def draw(self, surface):
         """绘制粒子带尾迹"""
@@ -905,13 +1526,13 @@ class SuckInParticle:
                 trail_alpha = int(alpha * (i / len(self.trail)) * 0.5)
                 trail_size = self.size * (i / len(self.trail))
                 color = (*self.color[:3], trail_alpha)
-                s = pygame.Surface((int(trail_size * 2), int(trail_size * 2)), pygame.SRCALPHA)
+                s = SURFACES.create((int(trail_size * 2), int(trail_size * 2)))
                 pygame.draw.circle(s, color, (int(trail_size), int(trail_size)), int(trail_size))
                 surface.blit(s, (int(tx - trail_size), int(ty - trail_size)))
 
             # 绘制主粒子
             color = (*self.color[:3], alpha)
-            s = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
+            s = SURFACES.create((int(self.size * 2), int(self.size * 2)))
             pygame.draw.circle(s, color, (int(self.size), int(self.size)), int(self.size))
             surface.blit(s, (int(self.x - self.size), int(self.y - self.size)))
 
@@ -919,11 +1540,25 @@ class SuckInParticle:
 class LightBeamAnimation:
     """光带动画类 - 霓虹风格"""
 
+    __slots__ = ('start_y', 'end_y', 'grid_rect', 'beam_type', 'color',
+                 'progress', 'speed', 'alpha')
+
+    # 彩虹色序列
+    rainbow_colors = (
+        (255, 0, 0), (255, 127, 0), (255, 255, 0),
+        (0, 255, 0), (0, 0, 255), (75, 0, 130),
+        (148, 0, 211)
+    )
+
     def __init__(self, start_y, end_y, grid_rect, beam_type, color):
         """
         创建光带动画
         beam_type: 'horizontal_left_right' | 'horizontal_center_out' | 'vertical_top_down' | 'rainbow'
         """
+        self.reset(start_y, end_y, grid_rect, beam_type, color)
+
+    def reset(self, start_y, end_y, grid_rect, beam_type, color):
+        """重新初始化（对象池回收复用时调用）"""
         self.start_y = start_y  # 消除行的Y坐标
         self.end_y = end_y  # 结束Y坐标
         self.grid_rect = grid_rect  # 网格区域矩形
@@ -933,16 +1568,9 @@ class LightBeamAnimation:
         self.speed = 0.05  # 动画速度
         self.alpha = 255  # 透明度
 
-        # 彩虹色序列
-        self.rainbow_colors = [
-            (255, 0, 0), (255, 127, 0), (255, 255, 0),
-            (0, 255, 0), (0, 0, 255), (75, 0, 130),
-            (148, 0, 211)
-        ]
-
-    def update(self):
-        """更新动画状态"""
-        self.progress += self.speed
+    def update(self, steps=1.0):
+        """更新动画状态（steps: 经过的 60 FPS 帧数）"""
+        self.progress += self.speed * steps
         if self.beam_type == 'rainbow':
             # 彩虹模式：慢慢淡出
             if self.progress > 0.5:
@@ -952,6 +1580,10 @@ class LightBeamAnimation:
             self.alpha = max(0, 255 - int(self.progress * 255))
         return self.progress < 1.0  # 返回False表示动画结束
 
+    def remaining_steps(self):
+        """距离动画结束还有多少帧"""
+        return (1.0 - self.progress) / self.speed
+
     def draw(self, surface, scale):
         """绘制光带动画"""
         if self.alpha <= 0:
@@ -967,7 +1599,7 @@ class LightBeamAnimation:
         if self.beam_type == 'horizontal_left_right':
             # 青色光带从左到右扫过
             beam_width = int(grid_width * self.progress)
-            s = pygame.Surface((beam_width, line_height), pygame.SRCALPHA)
+            s = SURFACES.create((beam_width, line_height))
             s.fill((*self.color, self.alpha))
             surface.blit(s, (grid_x, line_y))
 
@@ -983,7 +1615,7 @@ class LightBeamAnimation:
             max_width = int(grid_width // 2 * self.progress)
 
             # 左侧光带
-            s = pygame.Surface((max_width, line_height), pygame.SRCALPHA)
+            s = SURFACES.create((max_width, line_height))
             s.fill((*self.color, self.alpha))
             surface.blit(s, (center_x - max_width, line_y))
 
@@ -1003,7 +1635,7 @@ class LightBeamAnimation:
             # 紫色光带从上到下流动
             beam_height = int(line_height * self.progress)
             if beam_height > 0:
-                s = pygame.Surface((grid_width, beam_height), pygame.SRCALPHA)
+                s = SURFACES.create((grid_width, beam_height))
                 s.fill((*self.color, self.alpha))
                 surface.blit(s, (grid_x, line_y))
 
@@ -1026,13 +1658,13 @@ class LightBeamAnimation:
                     alpha = int(self.alpha * (1 - abs(i - color_index) / len(self.rainbow_colors)))
                     alpha = max(0, min(255, alpha))
 
-                    s = pygame.Surface((width, line_height), pygame.SRCALPHA)
+                    s = SURFACES.create((width, line_height))
                     s.fill((*self.rainbow_colors[i], alpha))
                     surface.blit(s, (grid_x + offset, line_y))
 
                 # 添加强烈发光效果
                 glow_alpha = int(self.alpha * 0.3)
-                glow_surface = pygame.Surface((grid_width, line_height), pygame.SRCALPHA)
+                glow_surface = SURFACES.create((grid_width, line_height))
                 glow_surface.fill((255, 255, 255, glow_alpha))
                 surface.blit(glow_surface, (grid_x, line_y))
 
@@ -1047,7 +1679,7 @@ class ScreenShake:
         """
         self.intensity = intensity
         self.duration = duration
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = GameClock.get_ticks()
         self.active = True
 
     def get_offset(self):
@@ -1055,7 +1687,7 @@ class ScreenShake:
         if not self.active:
             return (0, 0)
 
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = GameClock.get_ticks() - self.start_time
         if elapsed >= self.duration:
             self.active = False
             return (0, 0)
@@ -1086,7 +1718,7 @@ class PieceAnimation:
         """开始移动动画"""
         self.animating = True
         self.animation_type = 'move'
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = GameClock.get_ticks()
         self.start_x = start_x
         self.start_y = start_y
         self.target_x = target_x
@@ -1096,7 +1728,7 @@ class PieceAnimation:
         """开始旋转动画"""
         self.animating = True
         self.animation_type = 'rotate'
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = GameClock.get_ticks()
         self.start_piece = start_piece
         self.target_piece = target_piece
 
@@ -1104,7 +1736,7 @@ class PieceAnimation:
         """开始下落动画"""
         self.animating = True
         self.animation_type = 'drop'
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = GameClock.get_ticks()
         self.duration = 80  # 下落动画更快
         self.start_y = start_y
         self.target_y = target_y
@@ -1114,7 +1746,7 @@ class PieceAnimation:
         if not self.animating:
             return True  # 动画未激活或已完成
 
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = GameClock.get_ticks() - self.start_time
         if elapsed >= self.duration:
             self.animating = False
             return True  # 动画完成
@@ -1125,7 +1757,7 @@ class PieceAnimation:
         if not self.animating or self.animation_type != 'move':
             return current_x, current_y
 
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = GameClock.get_ticks() - self.start_time
         progress = min(elapsed / self.duration, 1.0)
 
         # 使用缓动函数（ease-out）
@@ -1141,7 +1773,7 @@ class PieceAnimation:
         if not self.animating or self.animation_type != 'drop':
             return current_y
 
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = GameClock.get_ticks() - self.start_time
         progress = min(elapsed / self.duration, 1.0)
 
         # 使用缓动函数（ease-in）
@@ -1154,29 +1786,39 @@ class PieceAnimation:
 class LandingFlash:
     """落地闪光效果 - 方块落地时的白色闪光过渡"""
 
+    __slots__ = ('center_x', 'center_y', 'width', 'height', 'duration', 'start_time', 'active')
+
     def __init__(self, center_x, center_y, piece_width, piece_height, duration):
+        self.reset(center_x, center_y, piece_width, piece_height, duration)
+
+    def reset(self, center_x, center_y, piece_width, piece_height, duration):
+        """重新初始化（对象池回收复用时调用）"""
         self.center_x = center_x
         self.center_y = center_y
         self.width = piece_width * 25  # BLOCK_SIZE = 25
         self.height = piece_height * 25
         self.duration = duration
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = GameClock.get_ticks()
         self.active = True
 
-    def update(self):
-        """更新闪光状态"""
-        elapsed = pygame.time.get_ticks() - self.start_time
+    def update(self, steps=1.0):
+        """更新闪光状态（按开始时间计算，与帧数无关）"""
+        elapsed = GameClock.get_ticks() - self.start_time
         if elapsed >= self.duration:
             self.active = False
             return False
         return True
 
+    def remaining_steps(self):
+        """距离闪光结束还有多少帧"""
+        return max(0, self.duration - (GameClock.get_ticks() - self.start_time)) / EFFECT_STEP_MS
+
     def draw(self, surface):
         """绘制闪光效果"""
         if not self.active:
             return
 
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = GameClock.get_ticks() - self.start_time
         progress = min(elapsed / self.duration, 1.0)
 
         # 快速淡出（开始很亮，快速消失）
@@ -1192,7 +1834,7 @@ class LandingFlash:
         )
 
         # 绘制半透明白色闪光
-        s = pygame.Surface((int(rect.width), int(rect.height)), pygame.SRCALPHA)
+        s = SURFACES.create((int(rect.width), int(rect.height)))
         s.fill((255, 255, 255, alpha))
         surface.blit(s, rect)
 
@@ -1200,19 +1842,26 @@ class LandingFlash:
 class ShockwaveEffect:
     """冲击波效果 - 用于多行消除"""
 
-    def __init__(self, center_x, center_y, max_radius, color):
+    __slots__ = ('center_x', 'center_y', 'max_radius', 'color', 'current_radius',
+                 'alpha', 'speed', 'active')
+
+    def __init__(self, center_x, center_y, max_radius, color, start_radius=0):
+        self.reset(center_x, center_y, max_radius, color, start_radius)
+
+    def reset(self, center_x, center_y, max_radius, color, start_radius=0):
+        """重新初始化（对象池回收复用时调用）；start_radius 为负数时延迟启动"""
         self.center_x = center_x
         self.center_y = center_y
         self.max_radius = max_radius
         self.color = color
-        self.current_radius = 0
+        self.current_radius = start_radius
         self.alpha = 255
         self.speed = max_radius / 20  # 20帧扩展到最大半径
         self.active = True
 
-    def update(self):
-        """更新冲击波状态"""
-        self.current_radius += self.speed
+    def update(self, steps=1.0):
+        """更新冲击波状态（steps: 经过的 60 FPS 帧数）"""
+        self.current_radius += self.speed * steps
         # 透明度随半径增大而减小
         progress = self.current_radius / self.max_radius
         self.alpha = int(255 * (1 - progress))
@@ -1222,6 +1871,12 @@ class ShockwaveEffect:
             return False
         return True
 
+    def remaining_steps(self):
+        """距离扩展到最大半径还有多少帧"""
+        if self.speed <= 0:
+            return 0
+        return (self.max_radius - self.current_radius) / self.speed
+
     def draw(self, surface):
         """绘制冲击波"""
         if not self.active or self.alpha <= 0:
@@ -1232,15 +1887,29 @@ class ShockwaveEffect:
             radius = int(self.current_radius - i * 15)
             if radius > 0:
                 alpha = max(0, self.alpha - i * 50)
-                s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                s = SURFACES.create((radius * 2, radius * 2))
                 pygame.draw.circle(s, (*self.color, alpha), (radius, radius), radius, 3)
                 surface.blit(s, (self.center_x - radius, self.center_y - radius))
 
 
 class FloatingText:
-    """浮动文字效果"""
+    """浮动文字效果
+
+    文字只在放大到最大（PEAK_SCALE 倍）时渲染一次，放大过程按 SCALE_BUCKETS 档从它缩小，
+    每档缩小一次后缓存；同样内容的文字共用这些帧（缓存在当前尺寸档位中）。
+    """
+
+    __slots__ = ('text', 'x', 'y', 'start_y', 'color', 'font_size', 'alpha',
+                 'scale', 'life', 'velocity_y')
+
+    PEAK_SCALE = 1.5  # 生命结束时的放大倍数
+    SCALE_BUCKETS = 16  # 1.0 - PEAK_SCALE 之间的缩放档数
 
     def __init__(self, text, x, y, color, font_size=36):
+        self.reset(text, x, y, color, font_size)
+
+    def reset(self, text, x, y, color, font_size=36):
+        """重新初始化（对象池回收复用时调用）"""
         self.text = text
         self.x = x
         self.y = y
@@ -1252,58 +1921,273 @@ class FloatingText:
         self.life = 1.0  # 生命值 1.0 -> 0
         self.velocity_y = -2  # 向上浮动
 
-    def update(self):
-        """更新文字状态"""
-        self.y += self.velocity_y
-        self.life -= 0.02
+    def update(self, steps=1.0):
+        """更新文字状态（steps: 经过的 60 FPS 帧数）"""
+        self.y += self.velocity_y * steps
+        self.life -= 0.02 * steps
         self.alpha = int(255 * self.life)
         self.scale = 1.0 + (1.0 - self.life) * 0.5  # 逐渐放大
 
         return self.life > 0
 
+    def remaining_steps(self):
+        """距离消失还有多少帧"""
+        return self.life / 0.02
+
+    def render_text(self, font, size):
+        """按指定字号渲染文字（字体不可用时使用默认字体）"""
+        return SIZE_CACHE.font(font, size).render(self.text, True, self.color)
+
+    def _frames(self, font):
+        """同样内容文字共用的帧列表：[各缩放档..., 峰值大小]（按需填充）"""
+        key = ('float_text', font, self.text, self.color, self.font_size)
+        frames = SIZE_CACHE.current.get(key)
+        if frames is None:
+            frames = SIZE_CACHE.current[key] = [None] * (self.SCALE_BUCKETS + 1)
+        return frames
+
+    def peak_frame(self, font):
+        """放大到最大时的文字（只渲染一次）"""
+        frames = self._frames(font)
+        if frames[-1] is None:
+            frames[-1] = self.render_text(font, int(self.font_size * self.PEAK_SCALE))
+        return frames[-1]
+
+    def get_frame(self, font):
+        """当前缩放对应档位的文字（由峰值大小的文字缩小，每档只缩小一次）"""
+        frames = self._frames(font)
+        progress = (self.scale - 1.0) / (self.PEAK_SCALE - 1.0)
+        bucket = max(0, min(self.SCALE_BUCKETS, int(round(progress * self.SCALE_BUCKETS))))
+        frame = frames[bucket]
+        if frame is None:
+            peak = self.peak_frame(font)
+            ratio = (1.0 + (self.PEAK_SCALE - 1.0) * bucket / self.SCALE_BUCKETS) / self.PEAK_SCALE
+            frame = frames[bucket] = pygame.transform.smoothscale(
+                peak, (max(1, int(peak.get_width() * ratio)), max(1, int(peak.get_height() * ratio))))
+        return frame
+
     def draw(self, surface, font):
-        """绘制浮动文字"""
+        """绘制浮动文字（预渲染帧 + 整体透明度，不再逐帧渲染字体）"""
         if self.life <= 0:
             return
 
-        # 创建缩放后的文字
-        scaled_size = int(self.font_size * self.scale)
-        if scaled_size > 0:
-            try:
-                scaled_font = pygame.font.Font(font, scaled_size)
-            except:
-                scaled_font = pygame.font.Font(None, scaled_size)
+        frame = self.get_frame(font)
+        frame.set_alpha(self.alpha)
+
+        # 居中绘制
+        rect = frame.get_rect(center=(self.x, int(self.y)))
+        surface.blit(frame, rect)
+
+
+class LineClearFlash:
+    """行消除闪光 - 消除行位置的白色横条淡出"""
+
+    __slots__ = ('y', 'alpha', 'combo', 'scale')
+
+    def __init__(self, line_y, combo_count):
+        self.reset(line_y, combo_count)
+
+    def reset(self, line_y, combo_count):
+        """重新初始化（对象池回收复用时调用）"""
+        self.y = line_y
+        self.alpha = 255
+        self.combo = combo_count
+        self.scale = 1.0
+
+    def update(self, steps=1.0):
+        """更新闪光状态（steps: 经过的 60 FPS 帧数）"""
+        self.alpha -= 10 * steps
+        self.scale += 0.05 * steps
+        return self.alpha > 0
+
+    def remaining_steps(self):
+        """距离完全淡出还有多少帧"""
+        return self.alpha / 10
 
-            text_surf = scaled_font.render(self.text, True, self.color)
-            text_surf.set_alpha(self.alpha)
+    def draw(self, surface):
+        """绘制闪光"""
+        if self.alpha > 0:
+            s = SURFACES.create((WINDOW_WIDTH, BLOCK_SIZE))
+            s.fill((255, 255, 255, int(self.alpha)))
+            surface.blit(s, (0, GRID_Y_OFFSET + self.y * BLOCK_SIZE))
+
+
+class EffectPool:
+    """特效对象池 - 固定容量，过期的特效对象回收后复用
+
+    长时间游戏中每次消除/落地都会创建上百个特效对象，频繁分配会触发 GC 卡顿。
+    池内对象按需创建，总数不超过 capacity；池满时按 policy 处理：
+        'drop_oldest' - 回收最早创建的活动对象给新特效使用
+        'refuse'      - 拒绝新特效，acquire 返回 None
+    """
+
+    POLICIES = ('drop_oldest', 'refuse')
+
+    def __init__(self, factory, capacity, policy='drop_oldest'):
+        self.factory = factory  # 特效类，需提供与 __init__ 参数相同的 reset 方法
+        self.capacity = capacity
+        self.policy = policy if policy in self.POLICIES else 'drop_oldest'
+        # 活动对象 -> 本次使用的编号（字典保持创建顺序，即绘制顺序；按对象删除为 O(1)）
+        self.active = {}
+        self._free = []  # 已回收、等待复用的对象
+        self._serial = 0  # 每次取出对象时加一，用来识别对象被提前回收后又复用的情况
+        self.created = 0  # 实际创建过的对象数
+        self.peak = 0  # 活动对象数峰值
+        self.dropped = 0  # 池满时被提前回收的对象数
+        self.refused = 0  # 池满时被拒绝的请求数
+
+    def acquire(self, *args, **kwargs):
+        """取出一个对象并用参数初始化，池满且策略为 refuse 时返回 None"""
+        active = self.active
+        if self._free:
+            obj = self._free.pop()
+            obj.reset(*args, **kwargs)
+        elif self.created < self.capacity:
+            obj = self.factory(*args, **kwargs)
+            self.created += 1
+        elif self.policy == 'drop_oldest' and active:
+            obj = next(iter(active))
+            del active[obj]
+            obj.reset(*args, **kwargs)
+            self.dropped += 1
+        else:
+            self.refused += 1
+            return None
+        self._serial += 1
+        active[obj] = self._serial
+        if len(active) > self.peak:
+            self.peak = len(active)
+        return obj
+
+    def release(self, obj, serial):
+        """回收对象；对象已被提前回收（编号不符）时忽略，返回是否回收"""
+        if self.active.get(obj) != serial:
+            return False
+        del self.active[obj]
+        self._free.append(obj)
+        return True
 
-            # 居中绘制
-            rect = text_surf.get_rect(center=(self.x, int(self.y)))
-            surface.blit(text_surf, rect)
+    def clear(self):
+        """回收全部活动对象"""
+        self._free.extend(self.active)
+        self.active.clear()
+
+    def get_stats(self):
+        """池状态（用于性能分析）"""
+        return {'active': len(self.active), 'capacity': self.capacity, 'peak': self.peak,
+                'dropped': self.dropped, 'refused': self.refused}
+
+
+class EffectTimeline:
+    """特效时间线 - 所有特效按类别分组，按到期时间统一回收
+
+    特效创建时由 remaining_steps() 算出到期时间放进最小堆。推进时间时只更新非空分组，
+    再从堆顶依次弹出到期的特效回收到对象池：不逐个检查是否结束，也不重建特效列表。
+    """
+
+    def __init__(self, config):
+        """config: 分组名 -> (特效类, 容量, 池满策略)，顺序即绘制顺序"""
+        self.groups = {name: EffectPool(factory, capacity, policy)
+                       for name, (factory, capacity, policy) in config.items()}
+        self._order = {name: i for i, name in enumerate(self.groups)}
+        self.live = []  # 非空分组 [(名称, 对象池)]，按绘制顺序
+        self.now = 0.0  # 时间线时间（毫秒，只随 advance 推进）
+        self._expiry = []  # 最小堆 [(到期时间, 序号, 分组名, 对象, 对象编号)]
+        self._sequence = 0  # 堆中同一时间到期时按加入顺序
+
+    def spawn(self, name, *args, **kwargs):
+        """在分组中创建特效，池满且策略为 refuse 时返回 None"""
+        pool = self.groups[name]
+        was_empty = not pool.active
+        obj = pool.acquire(*args, **kwargs)
+        if obj is None:
+            return None
+        if was_empty:
+            self._mark_live(name, pool)
+        self._sequence += 1
+        expire_at = self.now + obj.remaining_steps() * EFFECT_STEP_MS
+        heapq.heappush(self._expiry, (expire_at, self._sequence, name, obj, pool.active[obj]))
+        return obj
+
+    def _mark_live(self, name, pool):
+        """分组由空变为非空：按绘制顺序插入 live"""
+        index = self._order[name]
+        position = 0
+        while position < len(self.live) and self._order[self.live[position][0]] < index:
+            position += 1
+        self.live.insert(position, (name, pool))
+
+    def advance(self, ms):
+        """推进时间：更新非空分组中的特效，回收所有已到期的特效"""
+        self.now += ms
+        steps = ms / EFFECT_STEP_MS
+        for _, pool in self.live:
+            for obj in pool.active:
+                obj.update(steps)
+
+        expiry = self._expiry
+        emptied = False
+        while expiry and expiry[0][0] <= self.now:
+            _, _, name, obj, serial = heapq.heappop(expiry)
+            pool = self.groups[name]
+            if pool.release(obj, serial) and not pool.active:
+                emptied = True
+        if emptied:
+            self.live = [(name, pool) for name, pool in self.live if pool.active]
+
+    def clear(self):
+        """回收全部特效"""
+        for pool in self.groups.values():
+            pool.clear()
+        self.live = []
+        self._expiry = []
 
 
 class AnimationManager:
     """动画管理器"""
 
-    def __init__(self, theme=None):
-        self.particles = []
-        self.suck_in_particles = []  # 吸入式粒子列表
-        self.line_clear_animations = []  # 行消除动画
-        self.light_beams = []  # 光带动画列表
+    # 特效分组（对象池）配置：名称 -> (特效类, 容量, 池满策略)，顺序即绘制顺序
+    # 一次传奇连击 + Tetris 约产生 100 个普通粒子和 180 个吸入粒子
+    POOL_CONFIG = {
+        'beams': (LightBeamAnimation, 8, 'drop_oldest'),
+        'flashes': (LandingFlash, 8, 'refuse'),
+        'shockwaves': (ShockwaveEffect, 32, 'drop_oldest'),
+        'particles': (Particle, 400, 'drop_oldest'),
+        'suck_in': (SuckInParticle, 600, 'drop_oldest'),
+        'texts': (FloatingText, 24, 'drop_oldest'),
+        'line_clears': (LineClearFlash, 16, 'drop_oldest'),
+    }
+
+    # 浮动文字字体（不可用时 FloatingText 退回默认字体）
+    TEXT_FONT = "C:/Windows/Fonts/msyh.ttc"
+
+    # 单次更新最多推进的时间（毫秒），避免暂停或卡顿后特效一下子跳到结束
+    MAX_UPDATE_MS = 100
+
+    def __init__(self, theme=None, sim_hz=0):
+        """
+        theme: 当前主题（用于粒子颜色）
+        sim_hz: 特效模拟频率，0 表示每次 update 都推进；低于渲染帧率时多次 update 合并为一次推进
+        """
+        self.timeline = EffectTimeline(self.POOL_CONFIG)
+        self.pools = self.timeline.groups
+        # 以下即各对象池的活动对象（按创建顺序迭代，原地更新，引用始终有效）
+        self.particles = self.pools['particles'].active
+        self.suck_in_particles = self.pools['suck_in'].active  # 吸入式粒子
+        self.line_clear_animations = self.pools['line_clears'].active  # 行消除动画
+        self.light_beams = self.pools['beams'].active  # 光带动画
         self.screen_shake = None  # 屏幕震动效果
-        self.shockwaves = []  # 冲击波效果列表
-        self.floating_texts = []  # 浮动文字列表
-        self.landing_flashes = []  # 落地闪光效果列表
+        self.shockwaves = self.pools['shockwaves'].active  # 冲击波效果
+        self.floating_texts = self.pools['texts'].active  # 浮动文字
+        self.landing_flashes = self.pools['flashes'].active  # 落地闪光效果
         self.theme = theme  # 当前主题（用于粒子颜色）
+        self.sim_interval = 1000 / sim_hz if sim_hz else 0  # 模拟间隔（毫秒）
+        self._last_update = GameClock.get_ticks()  # 上次 update 的时间
+        self._pending_ms = 0.0  # 尚未模拟的时间
 
     def add_line_clear(self, line_y, combo_count):
         """添加行消除动画（保留旧方法兼容）"""
-        self.line_clear_animations.append({
-            'y': line_y,
-            'alpha': 255,
-            'combo': combo_count,
-            'scale': 1.0
-        })
+        self.timeline.spawn('line_clears', line_y, combo_count)
 
     def add_light_beam(self, start_y, end_y, grid_rect, lines_cleared, neon_mode):
         """添加霓虹光带动画 - 增强版（带吸入粒子效果）"""
@@ -1314,47 +2198,45 @@ class AnimationManager:
         center_y = grid_y + (start_y + end_y) / 2 * block_size + block_size // 2
         center_x = grid_x + grid_width // 2
 
+        # 光带颜色由主题提供（单行/双行/三行的文字、冲击波和吸入粒子使用同一颜色）
+        beam_colors = self.theme.beam_colors if self.theme else DEFAULT_BEAM_COLORS
+        color = beam_colors[min(lines_cleared, 4)]
+
         if lines_cleared == 1:
             # 单行：青色光带从左到右
-            beam = LightBeamAnimation(start_y, end_y, grid_rect,
-                                    'horizontal_left_right', (0, 255, 255))
-            self.light_beams.append(beam)
+            self.timeline.spawn('beams', start_y, end_y, grid_rect,
+                                'horizontal_left_right', color)
 
             # 单行也有轻微震动
             self.add_screen_shake(3, 200)
 
             # 单行文字提示
-            self.floating_texts.append(FloatingText("SINGLE!", center_x, center_y, (0, 255, 255), 28))
+            self.timeline.spawn('texts', "SINGLE!", center_x, center_y, color, 28)
 
             # 添加吸入式粒子（从左右两侧向中心）
             for _ in range(20):
                 # 左侧粒子
                 start_x = grid_x - random.randint(50, 150)
                 start_y = center_y + random.randint(-30, 30)
-                self.suck_in_particles.append(
-                    SuckInParticle(start_x, start_y, center_x, center_y, (0, 255, 255), speed=4.0)
-                )
+                self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y, color, speed=4.0)
                 # 右侧粒子
                 start_x = grid_x + grid_width + random.randint(50, 150)
-                self.suck_in_particles.append(
-                    SuckInParticle(start_x, start_y, center_x, center_y, (0, 255, 255), speed=4.0)
-                )
+                self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y, color, speed=4.0)
 
         elif lines_cleared == 2:
             # 双行：绿色光带从中间向两边
-            beam = LightBeamAnimation(start_y, end_y, grid_rect,
-                                    'horizontal_center_out', (0, 255, 100))
-            self.light_beams.append(beam)
+            self.timeline.spawn('beams', start_y, end_y, grid_rect,
+                                'horizontal_center_out', color)
 
             # 双行震动增强
             self.add_screen_shake(5, 250)
 
             # 双行文字提示
-            self.floating_texts.append(FloatingText("DOUBLE!", center_x, center_y, (0, 255, 100), 32))
+            self.timeline.spawn('texts', "DOUBLE!", center_x, center_y, color, 32)
 
             # 添加冲击波效果
             max_radius = grid_width * 0.6
-            self.shockwaves.append(ShockwaveEffect(center_x, center_y, max_radius, (0, 255, 100)))
+            self.timeline.spawn('shockwaves', center_x, center_y, max_radius, color)
 
             # 增强吸入式粒子（四角向中心）
             for _ in range(30):
@@ -1366,32 +2248,29 @@ class AnimationManager:
                     (grid_x + grid_width + random.randint(100, 200), grid_y + grid_height + random.randint(100, 200))
                 ]
                 start_x, start_y = random.choice(corners)
-                self.suck_in_particles.append(
-                    SuckInParticle(start_x, start_y, center_x, center_y, (0, 255, 100), speed=5.0)
-                )
+                self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y, color, speed=5.0)
 
         elif lines_cleared == 3:
             # 三行：紫色光带从上到下
-            beam = LightBeamAnimation(start_y, end_y, grid_rect,
-                                    'vertical_top_down', (200, 0, 255))
-            self.light_beams.append(beam)
+            self.timeline.spawn('beams', start_y, end_y, grid_rect,
+                                'vertical_top_down', color)
 
             # 三行剧烈震动
             self.add_screen_shake(8, 350)
 
             # 三行文字提示
-            self.floating_texts.append(FloatingText("TRIPLE!", center_x, center_y, (200, 0, 255), 36))
+            self.timeline.spawn('texts', "TRIPLE!", center_x, center_y, color, 36)
 
             # 添加冲击波效果（更大）
             max_radius = grid_width * 0.8
-            self.shockwaves.append(ShockwaveEffect(center_x, center_y, max_radius, (200, 0, 255)))
+            self.timeline.spawn('shockwaves', center_x, center_y, max_radius, color)
 
             # 增加粒子数量（普通粒子）
             for _ in range(50):  # 三行消除更多粒子
                 x = center_x + random.randint(-grid_width//2, grid_width//2)
                 y = center_y + random.randint(-50, 50)
                 color = (random.randint(150, 255), 0, random.randint(200, 255))
-                self.particles.append(Particle(x, y, color))
+                self.timeline.spawn('particles', x, y, color)
 
             # 大量吸入式粒子（全屏幕向中心）
             for _ in range(50):
@@ -1410,32 +2289,28 @@ class AnimationManager:
                     start_x = WINDOW_WIDTH + random.randint(50, 150)
                     start_y = random.randint(0, WINDOW_HEIGHT)
 
-                self.suck_in_particles.append(
-                    SuckInParticle(start_x, start_y, center_x, center_y,
-                                 (random.randint(150, 255), 0, random.randint(200, 255)), speed=6.0)
-                )
+                self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y,
+                                    (random.randint(150, 255), 0, random.randint(200, 255)), speed=6.0)
 
         else:  # 4行或更多 - Tetris!
             # 四行：彩虹光效
-            beam = LightBeamAnimation(start_y, end_y, grid_rect,
-                                    'rainbow', (255, 255, 255))
-            self.light_beams.append(beam)
+            self.timeline.spawn('beams', start_y, end_y, grid_rect,
+                                'rainbow', color)
 
             # Tetris超剧烈震动
             self.add_screen_shake(12, 500)
 
             # Tetris文字提示（超大）
-            self.floating_texts.append(FloatingText("TETRIS!!!", center_x, center_y, (255, 215, 0), 48))
-            self.floating_texts.append(FloatingText("PERFECT!", center_x, center_y - 50, (255, 100, 100), 36))
+            self.timeline.spawn('texts', "TETRIS!!!", center_x, center_y, (255, 215, 0), 48)
+            self.timeline.spawn('texts', "PERFECT!", center_x, center_y - 50, (255, 100, 100), 36)
 
             # 多个冲击波（产生层次感）
             for i in range(3):
                 max_radius = grid_width * (0.5 + i * 0.3)
                 color = [(255, 255, 0), (255, 100, 100), (100, 255, 255)][i]
                 # 延迟启动不同的冲击波
-                shockwave = ShockwaveEffect(center_x, center_y, max_radius, color)
-                shockwave.current_radius = -i * 30  # 延迟启动
-                self.shockwaves.append(shockwave)
+                self.timeline.spawn('shockwaves', center_x, center_y, max_radius, color,
+                                    start_radius=-i * 30)  # 延迟启动
 
             # 大量粒子爆炸
             for _ in range(100):  # Tetris消除超多粒子
@@ -1445,7 +2320,7 @@ class AnimationManager:
                     (255, 255, 0), (255, 100, 100), (100, 255, 255),
                     (255, 0, 255), (255, 255, 255), (255, 215, 0)
                 ])
-                self.particles.append(Particle(x, y, color))
+                self.timeline.spawn('particles', x, y, color)
 
             # 超多彩虹吸入式粒子（全屏所有方向）
             rainbow_colors = [
@@ -1460,9 +2335,7 @@ class AnimationManager:
                 start_y = center_y + math.sin(angle) * distance
                 color = random.choice(rainbow_colors)
 
-                self.suck_in_particles.append(
-                    SuckInParticle(start_x, start_y, center_x, center_y, color, speed=8.0)
-                )
+                self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y, color, speed=8.0)
 
     def add_screen_shake(self, intensity, duration):
         """添加屏幕震动效果"""
@@ -1532,7 +2405,7 @@ class AnimationManager:
         # 添加 Combo x n 文字（显示在网格内部右上方，消除行上方2cm处）
         color = colors[0]
         combo_text = f"Combo x{combo_count}"
-        self.floating_texts.append(FloatingText(combo_text, combo_x, combo_y, color, font_size))
+        self.timeline.spawn('texts', combo_text, combo_x, combo_y, color, font_size)
 
         # 添加震动效果
         self.add_screen_shake(shake_intensity, 300)
@@ -1546,29 +2419,26 @@ class AnimationManager:
 
             # 粒子向中心旋转吸入
             particle_color = random.choice(colors)
-            self.suck_in_particles.append(
-                SuckInParticle(start_x, start_y, center_x, center_y, particle_color, speed=3.0 * speed_mult)
-            )
+            self.timeline.spawn('suck_in', start_x, start_y, center_x, center_y, particle_color, speed=3.0 * speed_mult)
 
         # 添加冲击波效果（高等级连击）
         if combo_count >= 4:
             max_radius = grid_width * (0.4 + (combo_count - 4) * 0.1)
             shockwave_color = colors[0]
-            self.shockwaves.append(ShockwaveEffect(center_x, center_y, max_radius, shockwave_color))
+            self.timeline.spawn('shockwaves', center_x, center_y, max_radius, shockwave_color)
 
         # 多重冲击波（传奇连击）
         if combo_count >= 10:
             for i in range(1, 3):
                 max_radius = grid_width * (0.3 + i * 0.2)
                 color = colors[i % len(colors)]
-                shockwave = ShockwaveEffect(center_x, center_y, max_radius, color)
-                shockwave.current_radius = -i * 40  # 延迟启动
-                self.shockwaves.append(shockwave)
+                self.timeline.spawn('shockwaves', center_x, center_y, max_radius, color,
+                                    start_radius=-i * 40)  # 延迟启动
 
     def add_explosion(self, x, y, color):
         """添加爆炸效果"""
         for _ in range(30):
-            self.particles.append(Particle(x, y, color))
+            self.timeline.spawn('particles', x, y, color)
 
     def add_landing_effect(self, piece_x, piece_y, piece_width, piece_height, drop_distance=1):
         """添加方块落地特效 - 丝滑过渡动画"""
@@ -1594,12 +2464,11 @@ class AnimationManager:
             flash_duration = 50
 
         # 1. 添加落地闪光效果（丝滑过渡）
-        self.landing_flashes.append(LandingFlash(center_x, center_y, piece_width, piece_height, flash_duration))
+        self.timeline.spawn('flashes', center_x, center_y, piece_width, piece_height, flash_duration)
 
         # 2. 添加冲击波效果（延迟一点点启动，让闪光先出现）
-        shockwave = ShockwaveEffect(center_x, center_y, shockwave_radius, (200, 200, 200))
-        shockwave.current_radius = -5  # 延迟5帧开始，让闪光先出现
-        self.shockwaves.append(shockwave)
+        self.timeline.spawn('shockwaves', center_x, center_y, shockwave_radius, (200, 200, 200),
+                            start_radius=-5)  # 延迟5帧开始，让闪光先出现
 
         # 3. 添加轻微震动
         self.add_screen_shake(shake_intensity, 150)
@@ -1618,44 +2487,40 @@ class AnimationManager:
             else:
                 # 默认白色粒子
                 color = (random.randint(200, 255), random.randint(200, 255), random.randint(200, 255))
-            particle = Particle(start_x, start_y, color)
+            particle = self.timeline.spawn('particles', start_x, start_y, color)
 
             # 根据位置计算向外方向
             angle = math.atan2(offset_y, offset_x)
             speed = random.uniform(2, 5)
-            particle.vx = math.cos(angle) * speed
-            particle.vy = math.sin(angle) * speed - 0.5  # 稍微向上
-            self.particles.append(particle)
-
-    def update(self):
-        """更新所有动画"""
-        # 更新粒子
-        self.particles = [p for p in self.particles if p.life > 0]
-        for particle in self.particles:
-            particle.update()
-
-        # 更新吸入式粒子
-        self.suck_in_particles = [p for p in self.suck_in_particles if p.life > 0]
-        for particle in self.suck_in_particles:
-            particle.update()
+            if particle is not None:
+                particle.vx = math.cos(angle) * speed
+                particle.vy = math.sin(angle) * speed - 0.5  # 稍微向上
 
-        # 更新落地闪光
-        self.landing_flashes = [lf for lf in self.landing_flashes if lf.update()]
+    def update(self, dt=None):
+        """按经过的时间更新所有动画
 
-        # 更新行消除动画
-        for anim in self.line_clear_animations:
-            anim['alpha'] -= 10
-            anim['scale'] += 0.05
-        self.line_clear_animations = [a for a in self.line_clear_animations if a['alpha'] > 0]
+        Args:
+            dt: 经过的毫秒数，默认取距上次 update（或创建时）的游戏时间
+        """
+        now = GameClock.get_ticks()
+        if dt is None:
+            dt = now - self._last_update
+        self._last_update = now
 
-        # 更新光带动画
-        self.light_beams = [beam for beam in self.light_beams if beam.update()]
+        self._pending_ms = min(self._pending_ms + max(0, dt), self.MAX_UPDATE_MS)
+        if self._pending_ms <= 0 or self._pending_ms < self.sim_interval:
+            return
+        # 只更新非空分组，到期的特效按时间顺序回收到各自的池
+        self.timeline.advance(self._pending_ms)
+        self._pending_ms = 0.0
 
-        # 更新冲击波
-        self.shockwaves = [sw for sw in self.shockwaves if sw.update()]
+    def get_effect_counts(self):
+        """获取各类特效对象数量（用于性能分析）"""
+        return {name: len(pool.active) for name, pool in self.pools.items()}
 
-        # 更新浮动文字
-        self.floating_texts = [ft for ft in self.floating_texts if ft.update()]
+    def get_pool_stats(self):
+        """获取各特效对象池的占用情况（用于性能分析）"""
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
 
     def get_shake_offset(self):
         """获取震动偏移量"""
@@ -1663,48 +2528,67 @@ class AnimationManager:
             return self.screen_shake.get_offset()
         return (0, 0)
 
-    def draw(self, surface, scale=1.0):
-        """绘制所有动画"""
-        # 绘制光带动画
-        for beam in self.light_beams:
-            beam.draw(surface, scale)
-
-        # 绘制落地闪光效果（最上层）
-        for flash in self.landing_flashes:
-            flash.draw(surface)
-
-        # 绘制冲击波
-        for shockwave in self.shockwaves:
-            shockwave.draw(surface)
-
-        # 绘制粒子
-        for particle in self.particles:
-            particle.draw(surface)
-
-        # 绘制吸入式粒子
-        for particle in self.suck_in_particles:
-            particle.draw(surface)
-
-        # 绘制浮动文字
-        for ft in self.floating_texts:
-            # 尝试使用游戏字体路径
-            font_paths = ["C:/Windows/Fonts/msyh.ttc", "C:/Windows/Fonts/simhei.ttf"]
-            font = None
-            for font_path in font_paths:
-                try:
-                    font = font_path
-                    break
-                except:
-                    continue
-            ft.draw(surface, font)
+    def draw(self, surface, scale=1.0, live=None):
+        """绘制所有动画（只遍历非空分组，顺序：光带、落地闪光、冲击波、粒子、吸入粒子、浮动文字、行消除）
+
+        Args:
+            live: [(分组名, 特效序列)]，默认取当前的非空分组（EffectSnapshot 传入快照时的分组）
+        """
+        if live is None:
+            live = [(name, pool.active) for name, pool in self.timeline.live]
+        for name, effects in live:
+            if name == 'beams':
+                for beam in effects:
+                    beam.draw(surface, scale)
+            elif name == 'texts':
+                for ft in effects:
+                    ft.draw(surface, self.TEXT_FONT)
+            else:
+                for effect in effects:
+                    effect.draw(surface)
+
+    def snapshot(self):
+        """当前特效状态的快照（渲染线程绘制用）"""
+        return EffectSnapshot(self)
+
+
+class EffectSnapshot:
+    """特效状态快照 - 快照时把各分组的活动特效逐个复制成独立的记录，渲染线程只读这些副本
+
+    对象池里的特效对象由逻辑线程推进、回收后重置复用，渲染线程不能直接读取；
+    计数和对象池统计也在快照时算好。
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.theme = manager.theme
+        self.live = tuple((name, tuple(self.copy_effect(effect) for effect in pool.active))
+                          for name, pool in manager.timeline.live)
+        self._shake_offset = manager.get_shake_offset()
+        self._counts = manager.get_effect_counts()
+        self._pool_stats = manager.get_pool_stats()
+
+    @staticmethod
+    def copy_effect(effect):
+        """复制特效的当前状态（__slots__ 字段逐个复制，尾迹之类的队列冻结成元组）"""
+        cls = type(effect)
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = getattr(effect, name)
+            setattr(record, name, tuple(value) if isinstance(value, deque) else value)
+        return record
+
+    def get_shake_offset(self):
+        return self._shake_offset
+
+    def get_effect_counts(self):
+        return self._counts
 
-        # 绘制行消除特效
-        for anim in self.line_clear_animations:
-            if anim['alpha'] > 0:
-                # 绘制闪光效果
-                s = pygame.Surface((WINDOW_WIDTH, BLOCK_SIZE), pygame.SRCALPHA)
-                s.fill((255, 255, 255, anim['alpha']))
-                surface.blit(s, (0, GRID_Y_OFFSET + anim['y'] * BLOCK_SIZE))
+    def get_pool_stats(self):
+        return self._pool_stats
+
+    def draw(self, surface, scale=1.0):
+        self.manager.draw(surface, scale, self.live)
 
 
 class Statistics:
@@ -1714,7 +2598,7 @@ class Statistics:
         self.filename = filename
         self.load_statistics()
         # 设置新的游戏开始时间（不覆盖累计数据）
-        self.game_start_time = pygame.time.get_ticks()
+        self.game_start_time = GameClock.get_ticks()
         self.current_session_time = 0  # 当前会话的游戏时间
         self.last_piece_type = None
         self.consecutive_same_pieces = 0
@@ -1749,9 +2633,9 @@ class Statistics:
                 pass
 
     def _save_to_file(self, data):
-        """实际写入文件的方法"""
+        """实际写入文件的方法（在后台线程中运行，卡顿记录中也会出现）"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
+            with HITCHES.span('save', self.filename), open(self.filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
         except (PermissionError, IOError):
             pass  # 无法保存文件时静默失败
@@ -1827,7 +2711,7 @@ class Statistics:
 
     def reset_current_session(self):
         """重置当前会话数据（游戏重新开始时调用）"""
-        self.game_start_time = pygame.time.get_ticks()
+        self.game_start_time = GameClock.get_ticks()
         self.current_session_time = 0
         self.last_piece_type = None
         self.consecutive_same_pieces = 0
@@ -1837,21 +2721,21 @@ class Statistics:
 
     def update_total_game_time(self):
         """更新累计游戏时间"""
-        current_time = pygame.time.get_ticks()
+        current_time = GameClock.get_ticks()
         self.current_session_time = current_time - self.game_start_time
         # total_game_time 是历史累计时间，不包含当前会话
         # 只有在保存时才会合并
 
     def get_total_game_time_with_session(self):
         """获取包含当前会话的总游戏时间"""
-        current_time = pygame.time.get_ticks()
+        current_time = GameClock.get_ticks()
         session_time = current_time - self.game_start_time
         return self.total_game_time + session_time
 
     def update_game_time(self):
         """更新游戏时间（用于显示）"""
         # 这个方法现在返回包含当前会话的总时间
-        self.current_session_time = pygame.time.get_ticks() - self.game_start_time
+        self.current_session_time = GameClock.get_ticks() - self.game_start_time
 
     def get_formatted_time(self, milliseconds):
         """格式化时间为 HH:MM:SS"""
@@ -1883,6 +2767,25 @@ class Statistics:
         if score > self.highest_score:
             self.highest_score = score
 
+    def snapshot(self):
+        """当前统计数值的快照（渲染线程绘制用）"""
+        return StatisticsSnapshot(self)
+
+
+class StatisticsSnapshot:
+    """统计数据快照 - 只复制统计面板显示的数值（不带保存线程，丢弃时也不会去停它）"""
+
+    __slots__ = ('total_game_time', 'game_start_time', 'total_moves', 'total_rotations', 'highest_combo',
+                 'single_line_clears', 'double_line_clears', 'triple_line_clears', 'tetris_clears',
+                 'games_played', 'total_score', 'highest_score')
+
+    def __init__(self, statistics):
+        for name in self.__slots__:
+            setattr(self, name, getattr(statistics, name))
+
+    get_total_game_time_with_session = Statistics.get_total_game_time_with_session
+    get_formatted_time = Statistics.get_formatted_time
+
 
 class Achievement:
     """成就系统"""
@@ -1932,7 +2835,7 @@ class Achievement:
     def save_achievements(self):
         """保存成就"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
+            with HITCHES.span('save', self.filename), open(self.filename, 'w', encoding='utf-8') as f:
                 json.dump({'unlocked': self.unlocked}, f, indent=2, ensure_ascii=False)
         except (PermissionError, IOError):
             # 无法保存文件时静默失败
@@ -1942,6 +2845,7 @@ class Achievement:
         """解锁成就"""
         if achievement_id not in self.unlocked and achievement_id in [a['id'] for a in self.ACHIEVEMENTS_LIST]:
             self.unlocked.append(achievement_id)
+            HITCHES.note('unlock', achievement_id)
             self.save_achievements()
             # 添加通知
             achievement = next(a for a in self.ACHIEVEMENTS_LIST if a['id'] == achievement_id)
@@ -1949,6 +2853,10 @@ class Achievement:
             return True
         return False
 
+    def notify(self, title, desc):
+        """显示一条普通提示（与成就通知共用顶部通知栏）"""
+        self.notification_queue.append({'title': title, 'desc': desc})
+
     def update(self, current_time):
         """更新通知显示"""
         if self.current_notification:
@@ -1971,7 +2879,7 @@ class Achievement:
 
         # 背景
         bg_rect = pygame.Rect(x, y, notification_width, notification_height)
-        s = pygame.Surface((notification_width, notification_height), pygame.SRCALPHA)
+        s = SURFACES.create((notification_width, notification_height))
         s.fill((40, 40, 50, 230))  # 半透明背景
         screen.blit(s, (x, y))
 
@@ -1988,18 +2896,21 @@ class Achievement:
         desc_font = None
         for font_path in font_paths:
             try:
-                title_font = pygame.font.Font(font_path, title_size)
-                desc_font = pygame.font.Font(font_path, desc_size)
+                title_font = SIZE_CACHE.get(('font', font_path, title_size),
+                                            lambda: pygame.font.Font(font_path, title_size))
+                desc_font = SIZE_CACHE.get(('font', font_path, desc_size),
+                                           lambda: pygame.font.Font(font_path, desc_size))
                 break
             except:
                 continue
         if not title_font:
-            title_font = pygame.font.Font(None, title_size)
+            title_font = SIZE_CACHE.font(None, title_size)
         if not desc_font:
-            desc_font = pygame.font.Font(None, desc_size)
+            desc_font = SIZE_CACHE.font(None, desc_size)
 
         # 绘制文字
-        title_text = title_font.render(f"🏆 成就解锁: {self.current_notification['name']}", True, (255, 215, 0))
+        title = self.current_notification.get('title') or f"🏆 成就解锁: {self.current_notification['name']}"
+        title_text = title_font.render(title, True, (255, 215, 0))
         desc_text = desc_font.render(self.current_notification['desc'], True, (200, 200, 220))
 
         screen.blit(title_text, (x + int(10 * scale_factor), y + int(10 * scale_factor)))
@@ -2026,7 +2937,7 @@ class Leaderboard:
     def save_scores(self):
         """保存排行榜"""
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
+            with HITCHES.span('save', self.filename), open(self.filename, 'w', encoding='utf-8') as f:
                 json.dump(self.scores, f, indent=2, ensure_ascii=False)
         except (PermissionError, IOError):
             # 无法保存文件时静默失败
@@ -2056,307 +2967,1657 @@ class Leaderboard:
         return score > self.scores[-1]['score']
 
 
-class Tetris:
-    """俄罗斯方块游戏主类 - 增强版"""
+class GameLayout:
+    """界面布局 - 按窗口尺寸和主题一次性计算所有矩形，绘制和点击检测共用
+
+    窗口大小或主题变化时重建；点击检测通过网格索引直接定位候选区域。
+    """
+
+    # 点击索引的网格单元大小（像素）
+    HIT_CELL_SIZE = 32
+
+    # 键位面板中显示的动作（顺序即显示顺序）
+    KEYBIND_ACTIONS = ['left', 'right', 'rotate', 'soft_drop', 'hard_drop',
+                       'pause', 'neon', 'mute', 'restart', 'stats', 'achievements']
+
+    # 设置面板左列的开关项（顺序即显示顺序）
+    SETTING_TOGGLES = ['sound', 'music', 'ghost', 'neon']
+
+    def __init__(self, window_width, window_height, scale, theme_name=None):
+        self.key = (window_width, window_height, scale, theme_name)
+        self.window_width = window_width
+        self.window_height = window_height
+        self.scale = scale
+        self.rects = {}  # 区域名 -> pygame.Rect
+        self.points = {}  # 锚点名 -> (x, y)
+        self._hit_regions = {}  # 点击分组 -> [(区域名, rect)]（按优先级）
+        self._hit_index = {}  # 点击分组 -> {(列, 行): [(区域名, rect)]}
+        self._build()
+
+    def _s(self, value):
+        """按缩放因子换算长度"""
+        return int(value * self.scale)
+
+    def _centered(self, width, height):
+        """窗口居中的面板矩形"""
+        return pygame.Rect((self.window_width - width) // 2, (self.window_height - height) // 2,
+                           width, height)
+
+    def _build(self):
+        """计算所有区域"""
+        s = self._s
+        rects = self.rects
+
+        # 游戏网格
+        self.grid_x, self.grid_y = s(GRID_X_OFFSET), s(GRID_Y_OFFSET)
+        self.block_size = s(BLOCK_SIZE)
+        grid_width = GRID_WIDTH * self.block_size
+        grid_height = GRID_HEIGHT * self.block_size
+        rects['grid'] = pygame.Rect(self.grid_x, self.grid_y, grid_width, grid_height)
+        rects['grid_frame'] = pygame.Rect(self.grid_x - 2, self.grid_y - 2, grid_width + 4, grid_height + 4)
+        rects['grid_inner'] = pygame.Rect(self.grid_x - 1, self.grid_y - 1, grid_width + 2, grid_height + 2)
+        self.cell_rects = [
+            [pygame.Rect(self.grid_x + x * self.block_size, self.grid_y + y * self.block_size,
+                         self.block_size, self.block_size) for x in range(GRID_WIDTH)]
+            for y in range(GRID_HEIGHT)
+        ]
 
-    def __init__(self):
-        """初始化游戏"""
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.RESIZABLE)
-        pygame.display.set_caption("俄罗斯方块 - 增强版")
-        self.clock = pygame.time.Clock()
+        # 右侧信息卡片
+        column_x = int(self.grid_x + grid_width + 20 * self.scale)
+        self.card_width = s(190)
+
+        preview_y = int(self.grid_y + 35 * self.scale)
+        self.preview_block_size = int(self.block_size * 0.9)
+        next_card_y = preview_y - s(35)
+        next_card_height = self.preview_block_size * 4 + s(25)
+        next_card = rects['next_card'] = pygame.Rect(column_x - 6, next_card_y, self.card_width, next_card_height)
+        # 第 2 个以后的预览方块：卡片右侧 2 列 x 3 行的小格
+        queue_x = next_card.x + s(6) + self.preview_block_size * 4 + s(6)
+        queue_y = next_card.y + s(36)
+        rects['next_queue'] = pygame.Rect(queue_x, queue_y, next_card.right - s(6) - queue_x,
+                                          next_card.bottom - s(4) - queue_y)
+        self.next_queue_cells = [
+            pygame.Rect(queue_x + col * (rects['next_queue'].width // 2),
+                        queue_y + row * (rects['next_queue'].height // 3),
+                        rects['next_queue'].width // 2, rects['next_queue'].height // 3)
+            for row in range(3) for col in range(2)
+        ]
 
-        # 字体路径管理（必须在加载字体之前初始化）
-        self.font_path = None
+        info_y = int(self.grid_y + 121 * self.scale)
+        self.points['info'] = (column_x, info_y)
+        rects['info_card'] = pygame.Rect(column_x - 6, info_y - 6, self.card_width, s(140))
 
-        # 尝试加载中文字体
-        self.font = self.load_chinese_font(24)
-        self.large_font = self.load_chinese_font(48)
+        leaderboard_y = int(self.grid_y + 269 * self.scale)
+        self.points['leaderboard'] = (column_x, leaderboard_y)
+        rects['leaderboard_card'] = pygame.Rect(column_x - 6, leaderboard_y - 6, self.card_width, s(130))
 
-        # 窗口大小管理
-        self.window_width = WINDOW_WIDTH
-        self.window_height = WINDOW_HEIGHT
-        self.scale_factor = 1.0  # 缩放因子
+        controls_y = int(self.grid_y + 407 * self.scale)
+        self.points['controls'] = (column_x, controls_y)
+        rects['controls_card'] = pygame.Rect(column_x - 6, controls_y - 6, self.card_width, s(130))
 
-        # 游戏状态
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.score = 0
-        self.level = 1
-        self.lines_cleared = 0
-        self.game_over = False
-        self.paused = False
-        self.waiting_to_start = True  # 等待开始状态
-        self.countdown = 3  # 倒计时秒数
-        self.countdown_timer = 0  # 倒计时计时器
-        self.countdown_active = False  # 倒计时是否激活
+        # 弹出面板
+        rects['stats_panel'] = self._centered(s(420), s(520))
+        rects['achievements_panel'] = self._centered(s(500), s(580))
+        self._build_settings_panel()
+        self._build_keybind_panel()
 
-        # 方块
-        self.piece_bag = []  # 7-bag随机系统的袋子
-        self.current_piece = self.create_piece()
-        self.next_piece = self.create_piece()
-        self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
-        self.current_y = 0
+    def _build_settings_panel(self):
+        """设置面板（竖版两列布局）"""
+        s = self._s
+        rects = self.rects
+        panel = rects['settings_panel'] = self._centered(s(500), s(650))
 
-        # 下落计时器
-        self.fall_time = 0
-        self.fall_speed = 500
+        col_width = (panel.width - s(60)) // 2
+        col1_x = panel.x + s(20)
+        col2_x = panel.x + s(20) + col_width + s(20)
+        start_y = panel.y + s(80)
+        item_height = s(70)
 
-        # 新增功能
-        self.settings_manager = SettingsManager()
-        self.keybind_manager = KeyBindManager()
-        self.sound_manager = SoundManager()
+        # 左列：开关设置
+        for i, name in enumerate(self.SETTING_TOGGLES):
+            rect = rects['settings_' + name] = pygame.Rect(col1_x, start_y + i * item_height, col_width, s(60))
+            self._add_hit_region('settings', 'settings_' + name, rect)
+
+        # 左列开关下方：帧率模式（点击循环切换）
+        rect = rects['settings_pacing'] = pygame.Rect(
+            col1_x, start_y + len(self.SETTING_TOGGLES) * item_height, col_width, s(60))
+        self._add_hit_region('settings', 'settings_pacing', rect)
+
+        # 帧率下方：预览方块数量（点击循环切换）
+        rect = rects['settings_next'] = pygame.Rect(
+            col1_x, start_y + (len(self.SETTING_TOGGLES) + 1) * item_height, col_width, s(60))
+        self._add_hit_region('settings', 'settings_next', rect)
+
+        # 右列：音量滑块（轨道在卡片底部）
+        item_spacing = s(10)
+        slider_y = start_y
+        for slider_type in ('music', 'sfx'):
+            card = rects[f'{slider_type}_volume'] = pygame.Rect(col2_x, slider_y, col_width, s(80))
+            rects[f'{slider_type}_volume_track'] = pygame.Rect(
+                col2_x + s(15), slider_y + s(48), col_width - s(30), s(12))
+            self._add_hit_region('settings', f'{slider_type}_volume', card)
+            slider_y += card.height + item_spacing
+
+        # 主题下拉框及展开列表
+        dropdown = rects['theme_dropdown'] = pygame.Rect(col2_x, slider_y, col_width, s(60))
+        theme_list = rects['theme_list'] = pygame.Rect(col2_x, dropdown.bottom, col_width, s(180))
+        row_height = s(28)
+        self.theme_rows = []
+        for i in range(len(THEMES)):
+            row = pygame.Rect(col2_x, theme_list.y + s(5) + i * row_height, col_width, row_height)
+            self.theme_rows.append(row)
+            self._add_hit_region('theme_list', ('theme_row', i), row)
+        self._add_hit_region('theme_list', 'theme_list', theme_list)
+        self._add_hit_region('settings', 'theme_dropdown', dropdown)
+
+        # 恢复出厂设置按钮（在底部提示文字上方1cm处）
+        hint_y = panel.bottom - s(35)
+        self.points['settings_hint'] = (self.window_width // 2, hint_y)
+        reset_button = rects['settings_reset'] = pygame.Rect(
+            panel.x + s(20), hint_y - s(45) - s(38), panel.width - s(40), s(45))
+        self._add_hit_region('settings', 'settings_reset', reset_button)
+
+    def _build_keybind_panel(self):
+        """键位绑定面板（两列布局）"""
+        s = self._s
+        rects = self.rects
+        panel = rects['keybind_panel'] = self._centered(s(550), s(650))
+
+        start_y = panel.y + s(80)
+        item_height = s(42)
+        col_width = (panel.width - s(60)) // 2
+        col1_x = panel.x + s(20)
+        col2_x = panel.x + s(20) + col_width + s(20)
+
+        self.keybind_items = []
+        for i, action in enumerate(self.KEYBIND_ACTIONS):
+            x = col1_x if i % 2 == 0 else col2_x
+            rect = pygame.Rect(x, start_y + (i // 2) * item_height, col_width, s(38))
+            self.keybind_items.append((action, rect))
+            self._add_hit_region('keybind', ('keybind', action), rect)
+
+        button_y = start_y + len(self.KEYBIND_ACTIONS) // 2 * item_height + s(80)
+        reset_button = rects['keybind_reset'] = pygame.Rect(
+            panel.x + s(20), button_y, panel.width - s(40), s(45))
+        self._add_hit_region('keybind', 'keybind_reset', reset_button)
+        self.points['keybind_hint'] = (self.window_width // 2, panel.bottom - s(30))
+
+    def _add_hit_region(self, group, name, rect):
+        """登记可点击区域（先登记的优先）"""
+        entry = (name, rect)
+        self._hit_regions.setdefault(group, []).append(entry)
+        index = self._hit_index.setdefault(group, {})
+        cell = self.HIT_CELL_SIZE
+        for cx in range(rect.left // cell, rect.right // cell + 1):
+            for cy in range(rect.top // cell, rect.bottom // cell + 1):
+                index.setdefault((cx, cy), []).append(entry)
+
+    def hit_test(self, pos, *groups):
+        """返回 pos 处的区域名（按分组顺序查找，边界包含在内），未命中返回 None"""
+        x, y = pos
+        cell = (int(x) // self.HIT_CELL_SIZE, int(y) // self.HIT_CELL_SIZE)
+        for group in groups:
+            for name, rect in self._hit_index.get(group, {}).get(cell, ()):
+                if rect.x <= x <= rect.right and rect.y <= y <= rect.bottom:
+                    return name
+        return None
+
+
+class FrameProfiler:
+    """帧性能分析器 - 统计主循环各阶段耗时（F3 切换显示）
+
+    使用 time.perf_counter 打点，关闭时每次打点只做一次布尔判断。
+    浮层关闭时如果开着卡顿检测（hitches），仍然打点，每帧结束把结果交给卡顿检测器。
+    """
+
+    # 主循环各阶段（按绘制顺序）
+    PHASES = ('events', 'logic', 'animation', 'background', 'grid', 'ghost',
+              'hud', 'panels', 'effects', 'overlays', 'flip')
+
+    def __init__(self, window=120, refresh_interval=0.25, hitches=None):
+        self.enabled = False
+        self.hitches = hitches  # HitchDetector（可选）
+        self._active = False  # 浮层或卡顿检测开启时才打点
+        self.window = window  # 滚动统计的帧数
+        self.refresh_interval = refresh_interval  # 浮层文字刷新间隔（秒）
+        self.phase_times = {phase: deque(maxlen=window) for phase in self.PHASES}
+        self.frame_times = deque(maxlen=window)  # 每帧工作耗时（不含 tick 等待）
+        self.frame_intervals = deque(maxlen=window)  # 相邻两帧开始时间间隔
+        self.surface_allocations = deque(maxlen=window)  # 每帧新建的表面数
+        self._current = {}
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._hud_surface = None
+        self._hud_built_at = 0.0
+        self._font = None
+        self.owner = None  # 只接受这个线程的打点（渲染线程模式下为渲染线程），None 表示不限
 
-        # 🎨 主题系统 - 随机选择主题（必须在AnimationManager之前）
-        self.current_theme = random.choice(THEMES)
+    def toggle(self):
+        """切换分析器开关（重新开启时清空旧数据）"""
+        self.enabled = not self.enabled
+        self._update_active()
+        if self.enabled:
+            for samples in self.phase_times.values():
+                samples.clear()
+            self.frame_times.clear()
+            self.frame_intervals.clear()
+            self.surface_allocations.clear()
+            SURFACES.take_frame_allocations()
+            self._frame_start = 0.0
+            self._hud_surface = None
+        return self.enabled
 
-        # 从设置加载初始状态（如果配置文件存在则使用配置的值，否则使用默认值）
-        self.sound_manager.enabled = self.settings_manager.get('sound_enabled', True)
-        self.sound_manager.music_enabled = self.settings_manager.get('music_enabled', True)
-        self.show_ghost = self.settings_manager.get('show_ghost', True)
-        self.neon_mode = self.settings_manager.get('neon_mode', True)  # 默认开启霓虹模式
+    def set_hitch_detection(self, enabled):
+        """开关卡顿检测（没有卡顿检测器时忽略）"""
+        if self.hitches is None:
+            return
+        if enabled:
+            self.hitches.enable()
+        else:
+            self.hitches.disable()
+        self._update_active()
 
-        # 现在可以创建AnimationManager并传递主题
-        self.animation_manager = AnimationManager(theme=self.current_theme)  # 传递主题
-        self.piece_animation = PieceAnimation()  # 方块动画管理器
-        self.leaderboard = Leaderboard()
-        self.statistics = Statistics()
-        self.achievement = Achievement()
-        self.combo_count = 0
-        self.last_clear_time = 0
-        self.show_statistics = False  # 是否显示统计面板
-        self.show_achievements = False  # 是否显示成就面板
-        self.show_settings = False  # 是否显示设置菜单
-        self.key_binding_mode = None  # 当前正在绑定的键位
-        self.dragging_slider = None  # 当前正在拖动的滑块 ('music' 或 'sfx')
-        self.first_piece_placed = False  # 成就跟踪
-        self.last_save_time = pygame.time.get_ticks()  # 统计数据上次保存时间
+    def _update_active(self):
+        self._active = self.enabled or (self.hitches is not None and self.hitches.enabled)
+        if not self._active:
+            self._frame_start = 0.0
 
-        # 按钮点击反馈
-        self.reset_button_clicked = 0  # 点击动画计时器
-        self.reset_keybind_button_clicked = 0  # 键位重置按钮点击动画计时器
+    def begin_frame(self):
+        """标记一帧开始"""
+        if not self._active:
+            return
+        now = time.perf_counter()
+        if self._frame_start and self.enabled:
+            self.frame_intervals.append(now - self._frame_start)
+        self._frame_start = self._last_mark = now
+        self._current = {}
+        if self.hitches is not None:
+            self.hitches.begin_frame(now)
+
+    def mark(self, phase):
+        """把上次打点到现在的耗时计入指定阶段（同一阶段可多次累加）"""
+        if not self._active or (self.owner is not None and threading.get_ident() != self.owner):
+            return
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - self._last_mark)
+        self._last_mark = now
 
-        # 主题下拉框状态
-        self.theme_dropdown_opened = False  # 下拉框是否展开
+    def end_frame(self):
+        """标记一帧结束，写入滚动窗口（并交给卡顿检测器判断）"""
+        if not self._active or not self._frame_start:
+            return
+        current = self._current
+        frame_time = self._last_mark - self._frame_start
+        if self.hitches is not None and self.hitches.enabled:
+            self.hitches.end_frame(frame_time, current)
+        if not self.enabled:
+            return
+        for phase, samples in self.phase_times.items():
+            samples.append(current.get(phase, 0.0))
+        self.frame_times.append(frame_time)
+        self.surface_allocations.append(SURFACES.take_frame_allocations())
+
+    @staticmethod
+    def summarize(samples):
+        """计算 (平均, p95, 最大)，单位毫秒"""
+        if not samples:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(samples)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        return (sum(ordered) / len(ordered) * 1000, p95 * 1000, ordered[-1] * 1000)
+
+    def get_fps(self):
+        """根据帧间隔计算平均帧率"""
+        if not self.frame_intervals:
+            return 0.0
+        mean_interval = sum(self.frame_intervals) / len(self.frame_intervals)
+        return 1.0 / mean_interval if mean_interval > 0 else 0.0
+
+    def draw(self, surface, effect_counts=None, pacing=None, effects=None):
+        """绘制性能浮层（文字按 refresh_interval 节流重建，避免浮层自身成为开销）"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._hud_surface is None or now - self._hud_built_at >= self.refresh_interval:
+            self._hud_surface = self._build_hud(effect_counts or {}, pacing, effects)
+            self._hud_built_at = now
+        surface.blit(self._hud_surface, (8, 8))
+
+    def _build_hud(self, effect_counts, pacing=None, effects=None):
+        """重建浮层表面"""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 16)
+        font = self._font
+        line_height = font.get_linesize()
+
+        frame_mean, frame_p95, frame_max = self.summarize(self.frame_times)
+        header = f"FPS {self.get_fps():5.1f}   frame {frame_mean:.2f} / {frame_p95:.2f} / {frame_max:.2f} ms"
+        # 表格行：(阶段名, 平均, p95, 最大, 颜色)，数值列右对齐到固定位置
+        rows = [('phase', 'mean', 'p95', 'max', (150, 150, 170))]
+        for phase in self.PHASES:
+            mean, p95, peak = self.summarize(self.phase_times[phase])
+            color = (255, 120, 120) if p95 > 4.0 else (220, 220, 230)
+            rows.append((phase, f"{mean:.2f}", f"{p95:.2f}", f"{peak:.2f}", color))
+        counts = [f"{name} {count}" for name, count in effect_counts.items() if count]
+        footer = "fx: " + (", ".join(counts) if counts else "none")
+        allocations = self.surface_allocations
+        mean_allocations = sum(allocations) / len(allocations) if allocations else 0.0
+        footers = [footer, f"surf {mean_allocations:.1f}/frame  max {max(allocations, default=0)}  "
+                           f"total {SURFACES.allocations}"]
+        if pacing is not None:
+            # pacing 为 FramePacer，只在重建浮层时才统计
+            pacing = pacing.get_stats()
+            footers.append(f"{pacing['label']}  jitter {pacing['jitter']:.2f}  "
+                           f"p99 {pacing['p99']:.2f}  late {pacing['late']}")
+        if effects is not None:
+            # effects 为 AnimationManager：总占用、峰值占用率最高的池、池满丢弃/拒绝次数
+            pools = effects.get_pool_stats()
+            active = sum(p['active'] for p in pools.values())
+            capacity = sum(p['capacity'] for p in pools.values())
+            busiest, stats = max(pools.items(), key=lambda item: item[1]['peak'] / item[1]['capacity'])
+            footers.append(f"pool {active}/{capacity}  {busiest} {stats['peak'] * 100 // stats['capacity']}%  "
+                           f"drop {sum(p['dropped'] for p in pools.values())} "
+                           f"refuse {sum(p['refused'] for p in pools.values())}")
+        assets = SIZE_CACHE.get_stats()
+        footers.append(f"assets {assets['buckets']}/{SIZE_CACHE.max_buckets} buckets  {assets['items']} items  "
+                       f"evict {assets['evictions']}")
+        if self.hitches is not None and self.hitches.enabled:
+            footers.append(f"hitch {self.hitches.hitch_count} (> {self.hitches.budget_ms:.1f} ms)  "
+                           f"F4 dump")
+
+        graph_height = 40
+        width = 260
+        height = 10 + (len(rows) + 1 + len(footers)) * line_height + graph_height + 10
+        hud = SURFACES.create((width, height))
+        hud.fill((0, 0, 0, 170))
+
+        y = 5
+        hud.blit(font.render(header, True, (0, 255, 200)), (6, y))
+        y += line_height
+        column_rights = (120, 175, 230)
+        for name, *values, color in rows:
+            hud.blit(font.render(name, True, color), (6, y))
+            for right, value in zip(column_rights, values):
+                value_surf = font.render(value, True, color)
+                hud.blit(value_surf, (right - value_surf.get_width(), y))
+            y += line_height
+        for line in footers:
+            hud.blit(font.render(line, True, (255, 215, 0)), (6, y))
+            y += line_height
+
+        # 帧耗时柱状图（虚线为 60 FPS 预算 16.7ms）
+        graph_top = y + 5
+        budget_ms = 1000 / 60
+        scale_ms = budget_ms * 2  # 图表满高度对应 33.3ms
+        samples = list(self.frame_times)[-(width - 12):]
+        for i, frame_time in enumerate(samples):
+            ms = frame_time * 1000
+            bar = min(graph_height, int(ms / scale_ms * graph_height))
+            color = (100, 255, 100) if ms <= budget_ms else (255, 90, 90)
+            pygame.draw.line(hud, color, (6 + i, graph_top + graph_height),
+                             (6 + i, graph_top + graph_height - bar))
+        budget_y = graph_top + graph_height - int(budget_ms / scale_ms * graph_height)
+        for x in range(6, width - 6, 6):
+            pygame.draw.line(hud, (255, 255, 255, 120), (x, budget_y), (x + 2, budget_y))
+        return hud
+
+
+class HitchDetector:
+    """卡顿检测器 - 帧耗时超过预算时，记录这一帧里发生了什么（F4 导出到文件）
+
+    每帧收集游戏事件（消除、成就解锁、切换主题、存档……，见 note / span）和垃圾回收
+    （gc.callbacks）；帧耗时超过预算时，连同各阶段耗时和 context() 提供的现场信息
+    （特效数量等）写入环形缓冲，没有超时的帧只清空收集到的内容。
+    """
+
+    def __init__(self, capacity=64, filename='tetris_hitches.json'):
+        self.enabled = False
+        self.budget_ms = 1000 / 60
+        self.records = deque(maxlen=capacity)  # 最近的卡顿记录
+        self.filename = filename
+        self.context = None  # 无参数函数，返回卡顿时附加的现场信息（dict）
+        self.frame_index = 0
+        self.hitch_count = 0
+        self._frame_start = time.perf_counter()
+        self._events = []  # 本帧事件
+        self._collections = []  # 本帧垃圾回收 (代, 耗时毫秒, 回收对象数)
+        self._gc_start = 0.0
+
+    def enable(self):
+        """开启检测（注册垃圾回收回调）"""
+        if not self.enabled:
+            self.enabled = True
+            gc.callbacks.append(self._on_gc)
+
+    def disable(self):
+        """关闭检测"""
+        if self.enabled:
+            self.enabled = False
+            try:
+                gc.callbacks.remove(self._on_gc)
+            except ValueError:
+                pass
+            self._events = []
+            self._collections = []
 
-        # 面板自动暂停
-        self.was_paused_before_panel = False  # 记录打开面板前的暂停状态
+    def set_budget(self, fps):
+        """按目标帧率设置帧预算"""
+        self.budget_ms = 1000 / max(1, fps)
 
-        # 生成背景音乐（使用当前主题）
-        self.sound_manager.generate_background_music(self.current_theme)
+    def _on_gc(self, phase, info):
+        """垃圾回收回调（在触发回收的线程中调用）"""
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        else:
+            self._collections.append((info['generation'], (time.perf_counter() - self._gc_start) * 1000,
+                                      info['collected']))
 
-    def draw_theme_background(self):
-        """根据主题绘制增强的背景效果"""
-        theme = self.current_theme
-        width, height = self.window_width, self.window_height
-        current_time = pygame.time.get_ticks()
-
-        # 根据主题效果类型绘制不同的背景
-        if theme.bg_effect_type == "gradient":
-            # 🌆 霓虹城市 - 动态扫描线渐变
-            # 绘制基础渐变
-            for y in range(0, height, 2):  # 优化：每2行绘制一次
-                ratio = y / height
-                r = int(theme.bg_color[0] * (1 - ratio) + theme.bg_color2[0] * ratio)
-                g = int(theme.bg_color[1] * (1 - ratio) + theme.bg_color2[1] * ratio)
-                b = int(theme.bg_color[2] * (1 - ratio) + theme.bg_color2[2] * ratio)
-                pygame.draw.line(self.screen, (r, g, b), (0, y), (width, y), 2)
-
-            # 添加扫描线效果
-            scan_line_y = int((current_time * 0.05) % height)
-            scan_alpha = int(30 + 20 * math.sin(current_time * 0.005))
-            scan_surface = pygame.Surface((width, 3), pygame.SRCALPHA)
-            scan_surface.fill((*theme.text_highlight, scan_alpha))
-            self.screen.blit(scan_surface, (0, scan_line_y))
-
-            # 添加网格线（赛博朋克风格）
-            grid_spacing = 50
-            for x in range(0, width, grid_spacing):
-                pygame.draw.line(self.screen, (*theme.grid_border, 30), (x, 0), (x, height), 1)
-            for y in range(0, height, grid_spacing):
-                pygame.draw.line(self.screen, (*theme.grid_border, 30), (0, y), (width, y), 1)
-
-        elif theme.bg_effect_type == "stars":
-            # 🚀 太空科幻 - 动态星空 + 流星
-            self.screen.fill(theme.bg_color)
-
-            # 绘制星星（使用时间相关种子，让星星缓慢移动）
-            import hashlib
-            seed = int(hashlib.md5(str(current_time // 2000).encode()).hexdigest(), 16) % 1000
-            random.seed(seed)
-
-            for i in range(150):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(1, 3)
-                # 闪烁效果
-                twinkle = math.sin(current_time * 0.003 + i * 0.5) * 0.5 + 0.5
-                brightness = int(150 + 105 * twinkle)
-                color = (
-                    min(255, theme.bg_color2[0] + brightness),
-                    min(255, theme.bg_color2[1] + brightness),
-                    min(255, theme.bg_color2[2] + brightness)
-                )
-                pygame.draw.circle(self.screen, color, (x, y), size)
-
-            # 流星效果
-            meteor_count = 2
-            for i in range(meteor_count):
-                meteor_x = int((current_time * 0.15 + i * 500) % (width + 200)) - 100
-                meteor_y = int((current_time * 0.08 + i * 300) % (height + 200)) - 100
-                meteor_length = 30 + i * 20
-                # 流星尾迹
-                for j in range(meteor_length):
-                    alpha = int(50 * (1 - j / meteor_length))
-                    tail_x = meteor_x - j * 2
-                    tail_y = meteor_y - j
-                    if 0 <= tail_x < width and 0 <= tail_y < height:
-                        s = pygame.Surface((2, 1), pygame.SRCALPHA)
-                        s.fill((*theme.text_highlight, alpha))
-                        self.screen.blit(s, (tail_x, tail_y))
-
-        elif theme.bg_effect_type == "particles":
-            # 👾 复古像素 - 浮动像素方块
-            self.screen.fill(theme.bg_color)
-
-            import hashlib
-            seed = int(hashlib.md5(str(current_time // 400).encode()).hexdigest(), 16) % 1000
-            random.seed(seed)
-
-            # 浮动的像素方块（更大、更多）
-            for _ in range(50):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(4, 12)
-                color = random.choice(theme.particle_colors)
-                alpha = random.randint(40, 100)
-                s = pygame.Surface((size, size), pygame.SRCALPHA)
-                s.fill((color[0], color[1], color[2], alpha))
-                self.screen.blit(s, (x, y))
-
-            # 添加像素网格线
-            grid_size = 20
-            for x in range(0, width, grid_size):
-                pygame.draw.line(self.screen, (*theme.grid_border, 20), (x, 0), (x, height), 1)
-            for y in range(0, height, grid_size):
-                pygame.draw.line(self.screen, (*theme.grid_border, 20), (0, y), (width, y), 1)
-
-        elif theme.bg_effect_type == "waves":
-            # 🌊 海洋世界 - 动态波浪 + 气泡
-            self.screen.fill(theme.bg_color)
-
-            import hashlib
-            seed = int(hashlib.md5(str(current_time // 150).encode()).hexdigest(), 16) % 1000
-            random.seed(seed)
-
-            # 多层动态波浪
-            for layer in range(6):
-                wave_y = int(height * (0.15 + 0.14 * layer))
-                amplitude = 12 + layer * 4
-                phase_shift = layer * 0.8
-
-                for x in range(0, width, 4):
-                    wave_offset = math.sin(x * 0.015 + current_time * 0.001 + phase_shift) * amplitude
-                    y = wave_y + int(wave_offset)
-                    alpha = 35 - layer * 5
-                    color = (
-                        min(255, theme.bg_color2[0] + 60),
-                        min(255, theme.bg_color2[1] + 60),
-                        min(255, theme.bg_color2[2] + 60)
-                    )
-                    s = pygame.Surface((6, 2 + layer), pygame.SRCALPHA)
-                    s.fill((color[0], color[1], color[2], alpha))
-                    self.screen.blit(s, (x, y))
-
-            # 气泡效果
-            bubble_count = 15
-            for i in range(bubble_count):
-                bubble_x = int((current_time * 0.03 + i * 137) % width)
-                bubble_y = int(height - (current_time * 0.05 + i * 89) % height)
-                bubble_size = 3 + i % 5
-                bubble_alpha = 30 + i * 5
-                pygame.draw.circle(self.screen, (*theme.text_highlight, bubble_alpha),
-                                 (bubble_x, bubble_y), bubble_size, 1)
-
-        elif theme.bg_effect_type == "aurora":
-            # 🌲 森林秘境 - 极光效果 + 萤火虫
-            self.screen.fill(theme.bg_color)
-
-            import hashlib
-            seed = int(hashlib.md5(str(current_time // 250).encode()).hexdigest(), 16) % 1000
-            random.seed(seed)
-
-            # 多层极光带
-            for i in range(4):
-                aurora_y = int(height * (0.25 + 0.18 * i))
-                color = theme.particle_colors[i % len(theme.particle_colors)]
-
-                for x in range(0, width, 8):
-                    # 更复杂的波浪运动
-                    wave_offset = math.sin(x * 0.008 + current_time * 0.0015 + i * 1.5) * 40
-                    wave_offset += math.sin(x * 0.015 + current_time * 0.002 + i) * 20
-                    y = aurora_y + int(wave_offset)
-
-                    s = pygame.Surface((12, 25 + i * 8), pygame.SRCALPHA)
-                    alpha = 25 - i * 5
-                    s.fill((color[0], color[1], color[2], alpha))
-                    self.screen.blit(s, (x, y))
-
-            # 萤火虫效果
-            firefly_count = 20
-            for i in range(firefly_count):
-                firefly_x = int((math.sin(current_time * 0.0005 + i * 0.5) * 0.5 + 0.5) * width)
-                firefly_y = int((math.cos(current_time * 0.0003 + i * 0.7) * 0.5 + 0.5) * height)
-                firefly_size = 2 + (i % 3)
-                # 闪烁效果
-                firefly_alpha = int(50 + 50 * math.sin(current_time * 0.005 + i))
-                pygame.draw.circle(self.screen, (*theme.text_highlight, firefly_alpha),
-                                 (firefly_x, firefly_y), firefly_size)
+    def note(self, kind, detail=None, duration_ms=None):
+        """记录一个游戏事件（检测关闭时直接返回）
 
-        elif theme.name == "sunset_dusk":
-            # 🌅 日落黄昏 - 温暖渐变 + 光线
-            # 基础渐变
-            for y in range(0, height, 2):
-                ratio = y / height
-                # 三色渐变（模拟日落）
-                if ratio < 0.3:
-                    r = int(theme.bg_color[0])
-                    g = int(theme.bg_color[1] * (1 - ratio / 0.3) + theme.bg_color2[1] * (ratio / 0.3))
-                    b = int(theme.bg_color[2])
-                elif ratio < 0.7:
-                    r = int(theme.bg_color2[0] * (1 - (ratio - 0.3) / 0.4) + theme.bg_color[0] * ((ratio - 0.3) / 0.4))
-                    g = int(theme.bg_color2[1])
-                    b = int(theme.bg_color[2] * (1 - (ratio - 0.3) / 0.4) + theme.bg_color2[2] * ((ratio - 0.3) / 0.4))
-                else:
-                    r = int(theme.bg_color[0])
-                    g = int(theme.bg_color[1] * (1 - (ratio - 0.7) / 0.3) + theme.bg_color[1] * ((ratio - 0.7) / 0.3))
-                    b = int(theme.bg_color2[2])
-                pygame.draw.line(self.screen, (r, g, b), (0, y), (width, y), 2)
-
-            # 光线效果（模拟阳光）
-            sun_x = int(width * 0.7)
-            sun_y = int(height * 0.2)
-            ray_count = 8
-            for i in range(ray_count):
-                ray_angle = math.pi * 0.1 * (i - ray_count / 2) / ray_count
-                ray_length = int(height * 0.6)
-                ray_end_x = sun_x + int(math.sin(ray_angle) * ray_length)
-                ray_end_y = sun_y + ray_length
-
-                # 绘制渐变光线
-                for j in range(20):
-                    alpha = int(15 * (1 - j / 20))
-                    t = j / 20
-                    ray_x1 = int(sun_x + (ray_end_x - sun_x) * t)
-                    ray_y1 = int(sun_y + (ray_end_y - sun_y) * t)
-                    ray_x2 = int(sun_x + (ray_end_x - sun_x) * (t + 0.05))
-                    ray_y2 = int(sun_y + (ray_end_y - sun_y) * (t + 0.05))
-
-                    s = pygame.Surface((abs(ray_x2 - ray_x1) + 10, 3), pygame.SRCALPHA)
-                    s.fill((*theme.text_highlight, alpha))
-                    self.screen.blit(s, (min(ray_x1, ray_x2) - 5, ray_y1))
+        Args:
+            kind: 事件类型，如 'clear'、'unlock'、'theme'、'save'
+            detail: 附加说明（行数、成就 id、文件名……）
+            duration_ms: 事件本身的耗时（同步存档等）
+        """
+        if not self.enabled:
+            return
+        event = {'at_ms': round((time.perf_counter() - self._frame_start) * 1000, 2), 'event': kind}
+        if detail is not None:
+            event['detail'] = detail
+        if duration_ms is not None:
+            event['ms'] = round(duration_ms, 2)
+        self._events.append(event)
+
+    def span(self, kind, detail=None):
+        """with HITCHES.span('save', 'settings'): ... —— 记录事件并附上代码块耗时"""
+        return _HitchSpan(self, kind, detail)
+
+    def begin_frame(self, now):
+        """一帧开始（由 FrameProfiler 调用）；上一帧结束后到现在的事件计入这一帧"""
+        self._frame_start = now
+
+    def end_frame(self, frame_time, phases):
+        """一帧结束（由 FrameProfiler 调用）：超出预算时写入环形缓冲"""
+        self.frame_index += 1
+        frame_ms = frame_time * 1000
+        if frame_ms > self.budget_ms:
+            self.hitch_count += 1
+            record = {
+                'frame': self.frame_index,
+                'time': datetime.now().strftime('%H:%M:%S.%f')[:-3],
+                'frame_ms': round(frame_ms, 2),
+                'budget_ms': round(self.budget_ms, 2),
+                'phases': {phase: round(seconds * 1000, 2) for phase, seconds in phases.items()},
+                'events': self._events,
+                'gc': [{'generation': generation, 'ms': round(ms, 2), 'collected': collected}
+                       for generation, ms, collected in self._collections],
+            }
+            if self.context is not None:
+                try:
+                    record.update(self.context())
+                except Exception:
+                    pass
+            self.records.append(record)
+        self._events = []
+        self._collections = []
+
+    def dump(self, filename=None):
+        """把环形缓冲中的卡顿记录写入 JSON 文件，返回文件路径（失败返回 None）"""
+        path = filename or self.filename
+        data = {
+            'budget_ms': round(self.budget_ms, 2),
+            'frames': self.frame_index,
+            'hitches': self.hitch_count,
+            'python': sys.version.split()[0],
+            'pygame': pygame.version.ver,
+            'records': list(self.records),
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except (PermissionError, IOError):
+            return None
+        return os.path.abspath(path)
+
+
+class _HitchSpan:
+    """HitchDetector.span 返回的上下文：退出时记录事件和耗时"""
+
+    __slots__ = ('detector', 'kind', 'detail', 'start')
+
+    def __init__(self, detector, kind, detail):
+        self.detector = detector
+        self.kind = kind
+        self.detail = detail
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.detector.note(self.kind, self.detail, (time.perf_counter() - self.start) * 1000)
+        return False
 
+
+# 全局卡顿检测器（各管理器在存档等位置直接记录事件）
+HITCHES = HitchDetector()
+
+
+class FramePacer:
+    """帧节奏控制 - 限帧（忙等待，精度高）/ 不限帧 / 垂直同步，并统计帧间隔抖动
+
+    垂直同步通过 set_mode(SCALED, vsync=1) 请求（pygame 只在 SCALED / OPENGL 下真正开启）；
+    驱动不支持时退回到按目标帧率限帧。请求成功后先试运行 VSYNC_PROBE_FRAMES 帧，
+    确认 flip 确实在等待刷新才取消限帧。
+    """
+
+    MODES = ('capped', 'uncapped', 'vsync')
+    MODE_NAMES = {'capped': '限帧', 'uncapped': '不限帧', 'vsync': '垂直同步'}
+
+    # 设置面板中点击循环切换的预设 (模式, 目标帧率)
+    PRESETS = [('capped', 60), ('capped', 120), ('capped', 144), ('capped', 240),
+               ('vsync', 60), ('uncapped', 60)]
+
+    # 垂直同步确认：试运行的帧数，以及认为"flip 在等待刷新"的最高刷新率
+    # （帧间隔中位数比 1/VSYNC_MAX_HZ 还短，说明 flip 没有阻塞）
+    VSYNC_PROBE_FRAMES = 30
+    VSYNC_MAX_HZ = 360
+
+    def __init__(self, mode='capped', target_fps=60, window=240):
+        self.clock = pygame.time.Clock()
+        self.mode = mode if mode in self.MODES else 'capped'
+        self.target_fps = max(30, int(target_fps or 60))
+        self.vsync_active = False  # 垂直同步已确认生效
+        self.intervals = deque(maxlen=window)  # 帧间隔（秒）
+        self._last_tick = None
+        self._vsync_probe = None  # 正在确认垂直同步时：试运行期间的帧间隔
+
+    def set_display_mode(self, size, flags=pygame.RESIZABLE):
+        """按当前模式创建窗口表面（窗口大小或帧节奏模式改变时调用）"""
+        self.vsync_active = False
+        self._vsync_probe = None
+        if self.mode == 'vsync':
+            # 不带 SCALED 时 pygame 会直接忽略 vsync 参数（不报错）
+            try:
+                screen = pygame.display.set_mode(size, flags | pygame.SCALED, vsync=1)
+                self.start_vsync_probe()
+                SURFACES.display_changed(screen)
+                return screen
+            except pygame.error:
+                pass  # 不支持垂直同步，退回限帧
+        screen = pygame.display.set_mode(size, flags)
+        SURFACES.display_changed(screen)
+        return screen
+
+    def start_vsync_probe(self):
+        """垂直同步请求已被接受：先限帧试运行几帧，确认生效后才由 flip 控制节奏"""
+        self.vsync_active = False
+        self._vsync_probe = []
+
+    def _vsync_failed(self):
+        """请求了垂直同步但没有生效（已退回限帧）"""
+        return self.mode == 'vsync' and not self.vsync_active and self._vsync_probe is None
+
+    def configure(self, mode, target_fps):
+        """切换模式和目标帧率，返回是否需要重新创建窗口表面"""
+        needs_new_display = (mode == 'vsync') != (self.mode == 'vsync')
+        self.mode = mode if mode in self.MODES else 'capped'
+        self.target_fps = max(30, int(target_fps))
+        self.intervals.clear()
+        self._last_tick = None
+        return needs_new_display
+
+    def next_preset(self):
+        """当前设置之后的下一个预设"""
+        current = (self.mode, self.target_fps if self.mode == 'capped' else 60)
+        index = self.PRESETS.index(current) if current in self.PRESETS else -1
+        return self.PRESETS[(index + 1) % len(self.PRESETS)]
+
+    def tick(self, presents=True):
+        """帧结束时调用：按模式等待，并记录帧间隔
+
+        Args:
+            presents: 调用线程是否负责 flip。使用渲染线程时主线程不 flip，垂直同步不会让它等待，
+                      一律按目标帧率 sleep（不忙等待，等待期间 GIL 留给渲染线程），也不参与垂直同步确认
+        """
+        if not presents:
+            self.clock.tick(self.target_fps)
+        elif self._vsync_probe is not None:
+            # 确认期间只限制在最高刷新率，垂直同步生效时 flip 本身等得更久
+            self.clock.tick_busy_loop(self.VSYNC_MAX_HZ * 2)
+        elif self.mode == 'capped' or self._vsync_failed():
+            # tick_busy_loop 用忙等待代替 sleep，帧间隔更稳定
+            self.clock.tick_busy_loop(self.target_fps)
+        else:
+            # 不限帧 / 垂直同步（由 flip 阻塞等待刷新）
+            self.clock.tick()
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            self.intervals.append(now - self._last_tick)
+            if presents and self._vsync_probe is not None:
+                self._check_vsync_probe(now - self._last_tick)
+        self._last_tick = now
+
+    def _check_vsync_probe(self, interval):
+        """记录试运行的帧间隔，够数后判断垂直同步是否生效"""
+        self._vsync_probe.append(interval)
+        if len(self._vsync_probe) >= self.VSYNC_PROBE_FRAMES:
+            median = sorted(self._vsync_probe)[len(self._vsync_probe) // 2]
+            self.vsync_active = median >= 1 / self.VSYNC_MAX_HZ
+            self._vsync_probe = None
+
+    def describe(self):
+        """显示用的模式说明"""
+        if self.mode == 'capped':
+            return f"{self.MODE_NAMES['capped']} {self.target_fps}"
+        if self._vsync_failed():
+            return f"{self.MODE_NAMES['capped']} {self.target_fps}（无垂直同步）"
+        return self.MODE_NAMES[self.mode]
+
+    def get_stats(self):
+        """帧间隔统计（毫秒）：平均、标准差（抖动）、p99、最大、超时帧数"""
+        label = self.mode if self.mode != 'capped' else f"capped@{self.target_fps}"
+        if self._vsync_failed():
+            label = f"vsync->capped@{self.target_fps}"
+        if not self.intervals:
+            return {'label': label, 'mean': 0.0, 'jitter': 0.0, 'p99': 0.0, 'max': 0.0, 'late': 0}
+        values = sorted(v * 1000 for v in self.intervals)
+        mean = sum(values) / len(values)
+        jitter = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+        budget = 1000 / self.target_fps if self.mode == 'capped' else mean
+        return {
+            'label': label,
+            'mean': mean,
+            'jitter': jitter,
+            'p99': values[int(0.99 * (len(values) - 1))],
+            'max': values[-1],
+            'late': sum(1 for v in values if v > budget * 1.5),
+        }
+
+
+class SurfaceBackend:
+    """Surface 渲染后端（默认）- 所有内容用软件 blit 画到窗口表面，flip 显示
+
+    绘制代码通过 render_backend 的 draw_block / draw_sprite / draw_panel / draw_effects
+    输出方块、幽灵方块、面板和特效，其余内容直接画在 game.screen 上。
+    """
+
+    name = 'surface'
+
+    # 网格和已落下的方块整体缓存成棋盘层（霓虹发光由一次泛光生成）
+    board_layer = True
+
+    def __init__(self, game):
+        self.game = game
+        self.display = None  # 窗口表面
+        self.canvas = None  # 离屏画布（画布尺寸与窗口不同时才有）
+        self.viewport = None  # 画布缩放后在窗口中的位置（保持宽高比，两侧留黑边）
+        self._bars = []  # 黑边区域
+        self.previewing = False  # 窗口大小调整中（画布保持原尺寸缩放显示）
+        self.fallback_error = None  # 请求的纹理后端创建失败的原因（退回到本后端时）
+
+    def create_display(self, size, canvas_size=None):
+        """创建（或按新尺寸重建）窗口，返回绘制目标表面
+
+        canvas_size 与窗口尺寸不同时，返回该尺寸的离屏画布，present 时整体缩放到窗口。
+        """
+        self.previewing = False
+        self.display = self.game.frame_pacer.set_display_mode(size)
+        if not self._set_viewport(size, canvas_size):
+            self.canvas = None
+            return self.display
+        self.display.fill((0, 0, 0))
+        self.canvas = SURFACES.create(canvas_size, alpha=False)
+        return self.canvas
+
+    def _set_viewport(self, size, canvas_size):
+        """计算画布缩放到窗口的区域和黑边，不需要缩放时返回 False"""
+        if canvas_size is None or tuple(canvas_size) == tuple(size):
+            self.viewport = None
+            self._bars = []
+            return False
+        width, height = size
+        ratio = min(width / canvas_size[0], height / canvas_size[1])
+        view_width = max(1, int(canvas_size[0] * ratio))
+        view_height = max(1, int(canvas_size[1] * ratio))
+        self.viewport = pygame.Rect((width - view_width) // 2, (height - view_height) // 2,
+                                    view_width, view_height)
+        bars = [pygame.Rect(0, 0, width, self.viewport.top),
+                pygame.Rect(0, self.viewport.bottom, width, height - self.viewport.bottom),
+                pygame.Rect(0, 0, self.viewport.left, height),
+                pygame.Rect(self.viewport.right, 0, width - self.viewport.right, height)]
+        self._bars = [bar for bar in bars if bar.width > 0 and bar.height > 0]
+        return True
+
+    def preview_display(self, size):
+        """窗口大小调整中：不重建窗口，按原画布尺寸继续绘制，present 时缩放到新窗口，返回绘制目标表面"""
+        # pygame 2 在窗口大小变化时已换了新尺寸的窗口表面，以它的实际大小为准
+        self.display = pygame.display.get_surface() or self.display
+        size = self.display.get_size()
+        canvas_size = (self.game.window_width, self.game.window_height)
+        if self.canvas is None:
+            # 原来直接画在窗口表面上，调整期间先画到同尺寸的离屏画布
+            self.canvas = SURFACES.create(canvas_size, alpha=False)
+        if not self._set_viewport(size, canvas_size):
+            self.viewport = pygame.Rect((0, 0), size)
+        self.previewing = True
+        return self.canvas
+
+    def map_mouse(self, pos):
+        """窗口坐标 -> 画布坐标"""
+        if self.viewport is None:
+            return pos
+        view = self.viewport
+        canvas_width, canvas_height = self.game.window_width, self.game.window_height
+        return (int((pos[0] - view.x) * canvas_width / view.width),
+                int((pos[1] - view.y) * canvas_height / view.height))
+
+    def draw_block(self, rect, color_index):
+        """绘制一个方块"""
+        self.game.draw_3d_block(rect, color_index)
+
+    def draw_sprite(self, sprite, position):
+        """绘制一个预先渲染好的小图（幽灵方块等）"""
+        self.game.screen.blit(sprite, position)
+
+    def release_sprite(self, sprite):
+        """预渲染小图不再使用（纹理后端丢弃对应纹理）"""
+
+    def draw_panel(self, panel):
+        """绘制整窗大小的弹出面板（含遮罩）"""
+        self.game.screen.blit(panel, (0, 0))
+
+    def draw_effects(self):
+        """绘制特效"""
+        self.game.animation_manager.draw(self.game.screen, self.game.scale_factor)
+
+    def begin_overlay(self):
+        """开始绘制最上层（通知、暂停/结束画面、性能浮层）"""
+
+    def end_overlay(self):
+        """最上层绘制结束"""
+
+    def present(self):
+        """把这一帧显示到窗口（有离屏画布时先整体缩放一次）"""
+        if self.canvas is not None:
+            target = self.display.subsurface(self.viewport)
+            # 调整窗口大小期间的预览用最近邻缩放（只求便宜）
+            if self.game.scale_filter == 'nearest' or self.previewing:
+                pygame.transform.scale(self.canvas, self.viewport.size, target)
+            else:
+                pygame.transform.smoothscale(self.canvas, self.viewport.size, target)
+            for bar in self._bars:
+                self.display.fill((0, 0, 0), bar)
+        pygame.display.flip()
+
+
+class TextureBackend(SurfaceBackend):
+    """SDL2 纹理渲染后端 - 方块、幽灵方块、粒子和文字以纹理缓存，由 Renderer 合成
+
+    背景、网格和信息卡片仍用软件绘制到一张离屏表面，每帧作为一张纹理上传；
+    方块与幽灵方块的小图、面板、特效纹理只上传一次，之后每次绘制只设置透明度
+    和颜色调制，窗口越大相对 Surface 后端省得越多。
+    software=True 时使用 SDL 的软件渲染器（没有 GPU 的机器也能运行和测试）。
+    """
+
+    name = 'texture'
+
+    # 方块以纹理小图合成（发光已在小图中），网格每帧照常绘制
+    board_layer = False
+
+    BLEND = 1  # SDL_BLENDMODE_BLEND
+    RING_STEP = 1.08  # 冲击波圆环纹理的半径分档比例（缩放绘制时线宽误差 < 8%）
+
+    def __init__(self, game, software=False):
+        if sdl2_video is None:
+            raise pygame.error("pygame._sdl2.video 不可用")
+        super().__init__(game)
+        self.software = software
+        self.window = sdl2_video.Window("俄罗斯方块 - 增强版", size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+                                        resizable=True)
+        self.renderer = None
+        self.renderer_vsync = False
+        self.frame = None  # 软件绘制层（背景、网格、信息卡片）
+        self.frame_texture = None
+        self.overlay = None  # 最上层（透明背景）
+        self.overlay_texture = None
+        self.canvas_texture = None  # 画布尺寸与窗口不同时的渲染目标纹理
+        self._sprites = []  # 本帧待绘制的 (纹理, 位置)
+        self._panel_source = None
+        self._panel_texture = None
+        self._panel_pending = False
+        self._effects_pending = False
+        self._overlay_used = False
+        self._saved_screen = None
+
+    def create_display(self, size, canvas_size=None):
+        """调整窗口大小并重建离屏层（渲染器只在第一次创建）"""
+        pacer = self.game.frame_pacer
+        if tuple(self.window.size) != tuple(size):
+            self.window.size = size
+        if self.renderer is None:
+            # 渲染器的垂直同步只能在创建时指定，运行中切换帧节奏模式在下次启动时生效
+            self._create_renderer(pacer.mode == 'vsync')
+        if self.renderer_vsync and pacer.mode == 'vsync':
+            pacer.start_vsync_probe()
         else:
-            # 默认纯色背景
-            self.screen.fill(theme.bg_color)
+            pacer.vsync_active = False
+
+        self.previewing = False
+        self.canvas_texture = None
+        if self._set_viewport(size, canvas_size):
+            self.canvas_texture = self._create_canvas_texture(canvas_size, self.game.scale_filter)
+            size = canvas_size
+
+        self.frame = pygame.Surface(size)
+        SURFACES.display_changed(self.frame)
+        self.frame_texture = sdl2_video.Texture(self.renderer, size, streaming=True)
+        self.overlay = SURFACES.create(size)
+        self.overlay_texture = sdl2_video.Texture(self.renderer, size, streaming=True)
+        self.overlay_texture.blend_mode = self.BLEND
+        self._panel_source = None
+        self._panel_texture = None
+        return self.frame
+
+    def _create_canvas_texture(self, size, scale_filter):
+        """创建画布渲染目标纹理（缩放质量提示只在创建纹理时读取：0 最近邻，1 线性）"""
+        previous = os.environ.get('SDL_RENDER_SCALE_QUALITY')
+        os.environ['SDL_RENDER_SCALE_QUALITY'] = '0' if scale_filter == 'nearest' else '1'
+        try:
+            return sdl2_video.Texture(self.renderer, size, target=True)
+        finally:
+            if previous is None:
+                del os.environ['SDL_RENDER_SCALE_QUALITY']
+            else:
+                os.environ['SDL_RENDER_SCALE_QUALITY'] = previous
+
+    def preview_display(self, size):
+        """窗口大小调整中：离屏层保持原尺寸，合成后整体缩放到新窗口"""
+        canvas_size = self.frame.get_size()
+        if self.canvas_texture is None:
+            self.canvas_texture = self._create_canvas_texture(canvas_size, 'nearest')
+        if not self._set_viewport(size, canvas_size):
+            self.viewport = pygame.Rect((0, 0), size)
+        self.previewing = True
+        return self.frame
+
+    def _create_renderer(self, vsync):
+        """创建渲染器（请求垂直同步失败时退回不同步）"""
+        accelerated = 0 if self.software else -1
+        try:
+            self.renderer = sdl2_video.Renderer(self.window, accelerated=accelerated, vsync=vsync)
+            self.renderer_vsync = vsync
+        except pygame.error:
+            if not vsync:
+                raise
+            self.renderer = sdl2_video.Renderer(self.window, accelerated=accelerated)
+            self.renderer_vsync = False
+        self.renderer.draw_blend_mode = self.BLEND
+
+    def _texture(self, surface):
+        """取得表面对应的纹理（第一次使用时上传；与小图一起缓存在当前尺寸档位中）"""
+        cache = SIZE_CACHE.current
+        texture = cache.get(surface)
+        if texture is None:
+            texture = sdl2_video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = self.BLEND
+            cache[surface] = texture
+        return texture
+
+    def draw_block(self, rect, color_index):
+        """方块按 (大小, 颜色, 霓虹模式) 预渲染成带发光边距的小图"""
+        sprite, pad = self.game.get_block_sprite(color_index, rect.width)
+        self._sprites.append((self._texture(sprite), (rect.x - pad, rect.y - pad)))
+
+    def draw_sprite(self, sprite, position):
+        self._sprites.append((self._texture(sprite), position))
+
+    def release_sprite(self, sprite):
+        SIZE_CACHE.discard(sprite)
+
+    def draw_panel(self, panel):
+        # 面板缓存表面只有内容变化时才会换新，这时才重新上传
+        if panel is not self._panel_source:
+            self._panel_source = panel
+            self._panel_texture = sdl2_video.Texture.from_surface(self.renderer, panel)
+            self._panel_texture.blend_mode = self.BLEND
+        self._panel_pending = True
+
+    def draw_effects(self):
+        # 特效要画在方块和面板之上，推迟到 present 时按顺序合成
+        self._effects_pending = True
+
+    def begin_overlay(self):
+        self.overlay.fill((0, 0, 0, 0))
+        self._saved_screen = self.game.screen
+        self.game.screen = self.overlay
+        self._overlay_used = True
+
+    def end_overlay(self):
+        self.game.screen = self._saved_screen
+        self._saved_screen = None
+
+    def present(self):
+        """按层合成：软件层 → 方块小图 → 面板 → 特效 → 最上层（有画布纹理时最后整体缩放）"""
+        renderer = self.renderer
+        if self.canvas_texture is not None:
+            renderer.target = self.canvas_texture
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+
+        self.frame_texture.update(self.frame)
+        self.frame_texture.draw()
+        for texture, (x, y) in self._sprites:
+            texture.draw(dstrect=(x, y, texture.width, texture.height))
+        if self._panel_pending and self._panel_texture is not None:
+            self._panel_texture.draw()
+        if self._effects_pending:
+            self._draw_effects(self.game.animation_manager, self.game.scale_factor)
+        if self._overlay_used:
+            self.overlay_texture.update(self.overlay)
+            self.overlay_texture.draw()
+        if self.canvas_texture is not None:
+            renderer.target = None
+            renderer.draw_color = (0, 0, 0, 255)
+            renderer.clear()
+            self.canvas_texture.draw(dstrect=self.viewport)
+        renderer.present()
+
+        self._sprites.clear()
+        self._panel_pending = False
+        self._effects_pending = False
+        self._overlay_used = False
+
+    # ==================== 特效 ====================
+
+    def _fill_rect(self, color, alpha, rect):
+        """半透明填充矩形"""
+        self.renderer.draw_color = (*color[:3], max(0, min(255, int(alpha))))
+        self.renderer.fill_rect(rect)
+
+    def _dot_texture(self, radius):
+        """白色实心圆纹理（用颜色调制上色）"""
+        key = ('dot', radius)
+        texture = SIZE_CACHE.current.get(key)
+        if texture is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius)
+            texture = sdl2_video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = self.BLEND
+            SIZE_CACHE.current[key] = texture
+        return texture
+
+    def _ring_texture(self, radius):
+        """白色圆环纹理，半径按 RING_STEP 分档，绘制时缩放到实际半径"""
+        bucket = int(round(math.log(radius) / math.log(self.RING_STEP)))
+        key = ('ring', bucket)
+        texture = SIZE_CACHE.current.get(key)
+        if texture is None:
+            base = max(1, int(round(self.RING_STEP ** bucket)))
+            surface = pygame.Surface((base * 2, base * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 255, 255), (base, base), base, 3)
+            texture = sdl2_video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = self.BLEND
+            SIZE_CACHE.current[key] = texture
+        return texture
+
+    def _text_texture(self, ft):
+        """浮动文字按最大缩放（PEAK_SCALE 倍）渲染一次，之后缩小绘制"""
+        key = ('text', ft.text, ft.color, ft.font_size)
+        texture = SIZE_CACHE.current.get(key)
+        if texture is None:
+            surface = ft.peak_frame(AnimationManager.TEXT_FONT)
+            texture = sdl2_video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = self.BLEND
+            SIZE_CACHE.current[key] = texture
+        return texture
+
+    def _draw_dot(self, x, y, size, color, alpha):
+        radius = int(size)
+        if radius <= 0:
+            return
+        texture = self._dot_texture(radius)
+        texture.color = color[:3]
+        texture.alpha = max(0, min(255, int(alpha)))
+        diameter = int(size * 2)
+        texture.draw(dstrect=(int(x - size), int(y - size), diameter, diameter))
+
+    def _draw_effects(self, animations, scale):
+        """与 AnimationManager.draw 相同的绘制顺序和外观，改用纹理/矩形填充（只遍历非空分组）"""
+        for name, pool in animations.timeline.live:
+            getattr(self, '_draw_' + name)(pool.active, scale)
+
+    def _draw_beams(self, beams, scale):
+        for beam in beams:
+            self._draw_beam(beam, scale)
+
+    def _draw_flashes(self, flashes, scale):
+        for flash in flashes:
+            if not flash.active:
+                continue
+            progress = min((GameClock.get_ticks() - flash.start_time) / flash.duration, 1.0)
+            expand = progress * 10
+            rect = pygame.Rect(flash.center_x - flash.width // 2 - expand,
+                               flash.center_y - flash.height // 2 - expand,
+                               flash.width + expand * 2, flash.height + expand * 2)
+            self._fill_rect((255, 255, 255), 255 * (1 - progress ** 0.5), rect)
+
+    def _draw_shockwaves(self, shockwaves, scale):
+        for shockwave in shockwaves:
+            if not shockwave.active or shockwave.alpha <= 0:
+                continue
+            for i in range(3):
+                radius = int(shockwave.current_radius - i * 15)
+                if radius > 0:
+                    texture = self._ring_texture(radius)
+                    texture.color = shockwave.color[:3]
+                    texture.alpha = max(0, min(255, shockwave.alpha - i * 50))
+                    texture.draw(dstrect=(shockwave.center_x - radius, shockwave.center_y - radius,
+                                          radius * 2, radius * 2))
+
+    def _draw_particles(self, particles, scale):
+        for particle in particles:
+            if particle.life > 0:
+                self._draw_dot(particle.x, particle.y, particle.size, particle.color, particle.life * 255)
+
+    def _draw_suck_in(self, particles, scale):
+        for particle in particles:
+            if particle.life <= 0:
+                continue
+            alpha = int(particle.life * 255)
+            trail_length = len(particle.trail)
+            for i, (tx, ty) in enumerate(particle.trail):
+                ratio = i / trail_length
+                self._draw_dot(tx, ty, particle.size * ratio, particle.color, alpha * ratio * 0.5)
+            self._draw_dot(particle.x, particle.y, particle.size, particle.color, alpha)
+
+    def _draw_texts(self, texts, scale):
+        for ft in texts:
+            scaled_size = int(ft.font_size * ft.scale)
+            if ft.life <= 0 or scaled_size <= 0:
+                continue
+            texture = self._text_texture(ft)
+            ratio = scaled_size / int(ft.font_size * ft.PEAK_SCALE)
+            width, height = int(texture.width * ratio), int(texture.height * ratio)
+            texture.alpha = max(0, min(255, ft.alpha))
+            texture.draw(dstrect=(int(ft.x - width / 2), int(ft.y - height / 2), width, height))
+
+    def _draw_line_clears(self, line_clears, scale):
+        for anim in line_clears:
+            if anim.alpha > 0:
+                self._fill_rect((255, 255, 255), anim.alpha,
+                                (0, GRID_Y_OFFSET + anim.y * BLOCK_SIZE, WINDOW_WIDTH, BLOCK_SIZE))
+
+    def _draw_beam(self, beam, scale):
+        """光带（与 LightBeamAnimation.draw 的几何一致；边缘亮线不透明）"""
+        if beam.alpha <= 0:
+            return
+        grid_x, grid_y, grid_width, grid_height = beam.grid_rect
+        block_size = int(25 * scale)
+        line_y = grid_y + beam.start_y * block_size
+        line_height = (beam.end_y - beam.start_y + 1) * block_size
+        color = beam.color
+
+        if beam.beam_type == 'horizontal_left_right':
+            beam_width = int(grid_width * beam.progress)
+            self._fill_rect(color, beam.alpha, (grid_x, line_y, beam_width, line_height))
+            if beam_width > 0:
+                self._fill_rect(color, 255, (grid_x + beam_width - 1, line_y, 3, line_height + 1))
+
+        elif beam.beam_type == 'horizontal_center_out':
+            center_x = grid_x + grid_width // 2
+            max_width = int(grid_width // 2 * beam.progress)
+            self._fill_rect(color, beam.alpha, (center_x - max_width, line_y, max_width, line_height))
+            self._fill_rect(color, beam.alpha, (center_x, line_y, max_width, line_height))
+            if max_width > 0:
+                for edge_x in (center_x - max_width, center_x + max_width):
+                    self._fill_rect(color, 255, (edge_x - 1, line_y, 3, line_height + 1))
+
+        elif beam.beam_type == 'vertical_top_down':
+            beam_height = int(line_height * beam.progress)
+            if beam_height > 0:
+                self._fill_rect(color, beam.alpha, (grid_x, line_y, grid_width, beam_height))
+                self._fill_rect(color, 255, (grid_x, line_y + beam_height - 1, grid_width + 1, 3))
+
+        elif beam.beam_type == 'rainbow' and beam.progress < 1.0:
+            colors = beam.rainbow_colors
+            color_index = min(int(beam.progress * len(colors)), len(colors) - 1)
+            width = int(grid_width / len(colors)) + 1
+            for i, strip_color in enumerate(colors):
+                offset = int((i / len(colors)) * grid_width)
+                alpha = int(beam.alpha * (1 - abs(i - color_index) / len(colors)))
+                self._fill_rect(strip_color, alpha, (grid_x + offset, line_y, width, line_height))
+            self._fill_rect((255, 255, 255), int(beam.alpha * 0.3), (grid_x, line_y, grid_width, line_height))
+
+
+# 渲染后端：surface（默认）/ texture（SDL2 硬件加速）/ software（SDL2 软件渲染器）
+RENDER_BACKENDS = ('surface', 'texture', 'software')
+
+
+def create_render_backend(game, name):
+    """按名称创建渲染后端，纹理后端不可用时退回 Surface 后端"""
+    if name in ('texture', 'software'):
+        try:
+            return TextureBackend(game, software=(name == 'software'))
+        except pygame.error as e:
+            # 游戏创建好通知栏后提示玩家（见 Tetris.__init__）
+            backend = SurfaceBackend(game)
+            backend.fallback_error = str(e)
+            return backend
+    return SurfaceBackend(game)
+
+
+class RenderThread:
+    """渲染线程 - 主线程处理输入和游戏逻辑，每帧发布一份快照（Tetris.take_snapshot），
+    渲染线程只绘制最新的快照，来不及画的旧快照直接丢弃；输入和下落不再被绘制耗时拖慢。
+
+    窗口表面、主题渲染策略和尺寸缓存归渲染线程使用，主线程重建窗口、切换主题、重建布局时先取得
+    game.render_lock；绘制缓存（Tetris.RENDER_CACHES）从游戏对象移到渲染线程，只在它绘制的快照上出现。
+    纹理后端的渲染器只能在创建它的线程中使用，因此只支持 Surface 后端。
+    """
+
+    # GIL 切换间隔（秒）：绘制大多是 Python 代码，默认 5ms 的间隔下主线程醒来后要等渲染线程让出 GIL，
+    # 缩短后输入和逻辑最多晚 1ms 执行（渲染线程运行期间生效，stop 时恢复）
+    SWITCH_INTERVAL = 0.001
+
+    def __init__(self, game):
+        self.game = game
+        # 绘制缓存归渲染线程所有：游戏对象上不再保留，主线程的快照里也就没有
+        self.caches = {name: getattr(game, name) for name in game.RENDER_CACHES}
+        for name in game.RENDER_CACHES:
+            setattr(game, name, None)
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.SWITCH_INTERVAL)
+        self.frames = 0  # 已绘制的快照数
+        self.dropped = 0  # 没来得及绘制就被新快照替换的快照数
+        self.error = None  # 渲染线程中的异常（主线程发现后重新抛出）
+        self._snapshot = None
+        self._ready = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def publish(self, snapshot):
+        """发布最新快照（上一份还没开始画时直接替换）"""
+        with self._ready:
+            if self._snapshot is not None:
+                self.dropped += 1
+            self._snapshot = snapshot
+            self._ready.notify()
+
+    def stop(self, timeout=1.0):
+        """停止渲染线程（正在画的一帧画完为止）"""
+        with self._ready:
+            self._running = False
+            self._ready.notify()
+        self._thread.join(timeout)
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        game = self.game
+        # 性能分析器只统计渲染线程（主线程的输入/逻辑打点不计入）
+        game.profiler.owner = threading.get_ident()
+        while True:
+            with self._ready:
+                while self._running and self._snapshot is None:
+                    self._ready.wait()
+                if not self._running:
+                    return
+                snapshot, self._snapshot = self._snapshot, None
+            with game.render_lock:
+                # 快照之后窗口、主题或布局变过：快照里的表面、渲染策略和布局已经过期，等下一份
+                if (snapshot.screen is not game.screen or snapshot.theme_renderer is not game.theme_renderer
+                        or snapshot.layout is not game.layout):
+                    continue
+                try:
+                    self.draw(snapshot)
+                except Exception as e:
+                    self.error = e
+                    return
+            self.frames += 1
+
+    def draw(self, snapshot):
+        """绘制一份快照并显示"""
+        game = self.game
+        backend = game.render_backend
+        profiler = game.profiler
+        profiler.begin_frame()
+        # 后端通过 game 读取画面状态，绘制期间指向快照；绘制缓存放进快照，画完收回
+        backend.game = snapshot
+        for name, cache in self.caches.items():
+            setattr(snapshot, name, cache)
+        try:
+            snapshot.render_frame()
+            backend.present()
+        finally:
+            backend.game = game
+            self.caches = {name: getattr(snapshot, name) for name in self.caches}
+        profiler.mark('flip')
+        profiler.end_frame()
+
+
+class Tetris:
+    """俄罗斯方块游戏主类 - 增强版"""
+
+    # 画布分辨率模式：
+    #   native  - 按窗口大小直接绘制（缩放因子限制在 MIN_SCALE-MAX_SCALE，按 SCALE_STEP 取档）
+    #   base    - 固定按 WINDOW_WIDTH x WINDOW_HEIGHT 绘制，再整体缩放到窗口
+    #   integer - 按不超过窗口的基准分辨率整数倍绘制，再整体缩放到窗口
+    RESOLUTION_MODES = ('native', 'base', 'integer')
+
+    # native 模式的缩放范围和档位步长（缩放因子向下取整到步长的整数倍，
+    # 窗口大小微调时落在同一档，尺寸相关的缓存可以复用）
+    MIN_SCALE = 0.6
+    MAX_SCALE = 4.0
+    SCALE_STEP = 0.05
+
+    # 预览方块数量上限（第 1 个正常大小，其余在卡片右侧按小格显示）
+    MAX_NEXT_COUNT = 6
+
+    # 切换主题时新主题底色淡出的时长（毫秒）
+    THEME_FADE_MS = 400
+
+    # 拖动窗口边缘时，窗口大小停止变化这么久（秒）之后才重建窗口表面和布局
+    RESIZE_SETTLE = 0.15
+
+    # 绘制代码读写的缓存属性（使用渲染线程时归渲染线程所有，绘制快照前放进快照）
+    RENDER_CACHES = ('_panel_cache', '_overlay_cache', '_hud_cache', '_next_preview', '_theme_hint', '_board_layer')
+
+    def __init__(self, renderer=None, resolution=None, scale_filter=None, render_thread=None):
+        """初始化游戏
+
+        Args:
+            renderer: 渲染后端名称（见 RENDER_BACKENDS），默认读取设置
+            resolution: 画布分辨率模式（见 RESOLUTION_MODES），默认读取设置
+            scale_filter: 画布缩放到窗口时的过滤方式 'smooth' / 'nearest'，默认读取设置
+            render_thread: 是否在单独的渲染线程中绘制（见 RenderThread），默认读取设置
+        """
+        # 设置需要在创建窗口之前读取（帧节奏模式影响 set_mode 参数）
+        self.settings_manager = SettingsManager()
+        self.frame_pacer = FramePacer(self.settings_manager.get('frame_pacing', 'capped'),
+                                      self.settings_manager.get('target_fps', 60))
+        self.render_lock = threading.RLock()  # 渲染线程绘制一帧期间持有；重建窗口、切换主题、重建布局前先取得
+        self.resolution_mode = resolution or self.settings_manager.get('resolution_mode', 'native')
+        if self.resolution_mode not in self.RESOLUTION_MODES:
+            self.resolution_mode = 'native'
+        self.scale_filter = scale_filter or self.settings_manager.get('scale_filter', 'smooth')
+        self.display_size = (WINDOW_WIDTH, WINDOW_HEIGHT)  # 实际窗口大小
+        self._pending_resize = None  # 等待生效的窗口大小调整 (新尺寸, 最后一次事件时间)
+        self.render_backend = create_render_backend(
+            self, renderer or self.settings_manager.get('renderer', 'surface'))
+        self.screen = self.render_backend.create_display((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("俄罗斯方块 - 增强版")
+
+        # 字体路径管理（必须在加载字体之前初始化）
+        self.font_path = None
+
+        # 尝试加载中文字体
+        self.font = self.load_chinese_font(24)
+        self.large_font = self.load_chinese_font(48)
+
+        # 窗口大小管理
+        self.window_width = WINDOW_WIDTH
+        self.window_height = WINDOW_HEIGHT
+        self.scale_factor = 1.0  # 缩放因子
+
+        # 游戏状态
+        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.game_over = False
+        self.paused = False
+        self.waiting_to_start = True  # 等待开始状态
+        self.countdown = 3  # 倒计时秒数
+        self.countdown_timer = 0  # 倒计时计时器
+        self.countdown_active = False  # 倒计时是否激活
+
+        # 方块
+        self.next_count = max(1, min(self.MAX_NEXT_COUNT, int(self.settings_manager.get('next_count', 1))))
+        self.next_queue = []  # 接下来的方块（至少 next_count 个，next_piece 为第一个）
+        self._queue_version = 0  # 队列每次变化加一，预览缓存据此失效
+        self._next_preview = None  # (签名, 表面, 位置)
+        self._board_layer = None  # (签名, 棋盘层表面, 泛光表面或 None, 泛光边距)
+        self.reset_piece_queue()
+
+        # 下落计时器
+        self.fall_time = 0
+        self.fall_speed = 500
+
+        # 新增功能
+        self.keybind_manager = KeyBindManager()
+        self.sound_manager = SoundManager()
+
+        # 🎨 主题系统 - 随机选择主题（必须在AnimationManager之前）
+        self.current_theme = random.choice(THEMES)
+        # 动态背景按自己的频率重绘（0 = 每帧），可选相邻画面交叉淡化
+        self.background_hz = self.settings_manager.get('background_hz', 20)
+        self.background_crossfade = self.settings_manager.get('background_crossfade', False)
+        self.background_worker = BackgroundWorker() if self.settings_manager.get('background_thread', True) else None
+
+        # 界面布局（窗口大小或主题变化时重建）
+        self.layout = None
+        self.update_layout()
+
+        # 从设置加载初始状态（如果配置文件存在则使用配置的值，否则使用默认值）
+        self.sound_manager.enabled = self.settings_manager.get('sound_enabled', True)
+        self.sound_manager.music_enabled = self.settings_manager.get('music_enabled', True)
+        self.show_ghost = self.settings_manager.get('show_ghost', True)
+        self.neon_mode = self.settings_manager.get('neon_mode', True)  # 默认开启霓虹模式
+
+        # 现在可以创建AnimationManager并传递主题
+        self.animation_manager = self.create_animation_manager()
+        self.piece_animation = PieceAnimation()  # 方块动画管理器
+        self.leaderboard = Leaderboard()
+        self.statistics = Statistics()
+        self.achievement = Achievement()
+        if self.render_backend.fallback_error:
+            self.achievement.notify("纹理渲染后端不可用", "已改用 Surface 渲染")
+        self.combo_count = 0
+        self.last_clear_time = 0
+        self.show_statistics = False  # 是否显示统计面板
+        self.show_achievements = False  # 是否显示成就面板
+        self.show_settings = False  # 是否显示设置菜单
+        self.key_binding_mode = None  # 当前正在绑定的键位
+        self.dragging_slider = None  # 当前正在拖动的滑块 ('music' 或 'sfx')
+        self.first_piece_placed = False  # 成就跟踪
+        self.last_save_time = GameClock.get_ticks()  # 统计数据上次保存时间
+
+        # 按钮点击反馈
+        self.reset_button_clicked = 0  # 点击动画计时器
+        self.reset_keybind_button_clicked = 0  # 键位重置按钮点击动画计时器
+
+        # 主题下拉框状态
+        self.theme_dropdown_opened = False  # 下拉框是否展开
+
+        # 面板自动暂停
+        self.was_paused_before_panel = False  # 记录打开面板前的暂停状态
+
+        # 帧性能分析器（F3 切换显示）
+        self.profiler = FrameProfiler(hitches=HITCHES)
+
+        # 卡顿检测：预算跟随目标帧率，卡顿时附上特效数量等现场信息
+        HITCHES.set_budget(self.frame_pacer.target_fps)
+        HITCHES.context = self.hitch_context
+        self.profiler.set_hitch_detection(self.settings_manager.get('hitch_detection', True))
+
+        # 弹出面板缓存：面板名 -> (签名, 含遮罩的整窗表面)
+        self._panel_cache = {}
+        # 提示画面缓存（开始/倒计时/结束/暂停）：画面名 -> (签名, 含遮罩的整窗表面)
+        self._overlay_cache = {}
+        # 右侧信息卡片缓存（信息/排行榜/操作说明）：卡片名 -> (签名, 卡片表面, 位置)
+        self._hud_cache = {}
+
+        # 主题切换过渡的开始时间（None 表示没有过渡）
+        self._theme_transition = None
+        self._theme_hint = None  # ((缩放, 主题名), "正在准备音乐" 提示文字表面)
+
+        # 背景音乐在后台合成（使用当前主题），同时预取下一个主题
+        self.next_theme = None
+        self.sound_manager.set_music_theme(self.current_theme)
+        self.prefetch_next_theme()
+
+        # 渲染线程：主线程只处理输入和逻辑，发布快照给渲染线程绘制
+        self.render_thread = None
+        if render_thread is None:
+            render_thread = self.settings_manager.get('render_thread', False)
+        if render_thread:
+            if self.render_backend.name == 'surface':
+                self.render_thread = RenderThread(self)
+            else:
+                self.achievement.notify("渲染线程只支持 Surface 后端", "已改为在主线程中绘制")
+
+    def take_snapshot(self):
+        """本帧画面状态的快照（渲染线程绘制用）
+
+        游戏对象浅拷贝一份：数值、标志、布局等随拷贝冻结；主线程会原地修改的
+        网格、当前方块、预览队列复制成元组；统计数值和特效复制成只读记录，绘制时读取的其他子对象
+        （方块动画、成就通知、排行榜、按键、帧节奏）各复制一份，其中的列表和字典也一并复制。
+        绘制缓存不在快照里，由渲染线程持有（见 RenderThread）。
+        """
+        snapshot = copy.copy(self)
+        snapshot.grid = tuple(tuple(row) for row in self.grid)
+        snapshot.current_piece = tuple(tuple(row) for row in self.current_piece)
+        snapshot.next_queue = tuple(self.next_queue)
+        snapshot.animation_manager = self.animation_manager.snapshot()
+        snapshot.piece_animation = copy.copy(self.piece_animation)
+        snapshot.statistics = self.statistics.snapshot()
+        snapshot.achievement = copy.copy(self.achievement)
+        snapshot.achievement.unlocked = tuple(self.achievement.unlocked)
+        snapshot.achievement.notification_queue = tuple(self.achievement.notification_queue)
+        snapshot.leaderboard = copy.copy(self.leaderboard)
+        snapshot.leaderboard.scores = tuple(self.leaderboard.scores)
+        snapshot.keybind_manager = copy.copy(self.keybind_manager)
+        snapshot.keybind_manager.bindings = dict(self.keybind_manager.bindings)
+        snapshot.frame_pacer = copy.copy(self.frame_pacer)
+        snapshot.frame_pacer.intervals = tuple(self.frame_pacer.intervals)
+        return snapshot
+
+    def quit_game(self):
+        """退出游戏（先停下渲染线程，避免窗口关闭时还在绘制）"""
+        if self.render_thread is not None:
+            self.render_thread.stop()
+        pygame.quit()
+        sys.exit()
+
+    def draw_theme_background(self):
+        """根据主题绘制增强的背景效果（背景风格函数在主题启用时选定，按背景频率重绘）"""
+        self.theme_renderer.draw_background_layer(self.window_width, self.window_height, GameClock.get_ticks(),
+                                                  self.background_hz, self.background_crossfade,
+                                                  self.background_worker)
+
+    def _draw_background_gradient(self, surface, painter, width, height, current_time):
+        """背景风格：动态扫描线渐变（霓虹城市、日落黄昏）"""
+        theme = painter.theme
+        # 绘制基础渐变（每2行绘制一次，颜色在主题启用后按窗口高度缓存）
+        for y, color in painter.gradient_colors(height):
+            pygame.draw.line(surface, color, (0, y), (width, y), 2)
+
+        # 添加扫描线效果
+        scan_line_y = int((current_time * 0.05) % height)
+        scan_alpha = int(30 + 20 * math.sin(current_time * 0.005))
+        scan_surface = painter.create((width, 3))
+        scan_surface.fill((*theme.text_highlight, scan_alpha))
+        surface.blit(scan_surface, (0, scan_line_y))
+
+        # 添加网格线（赛博朋克风格）
+        grid_spacing = 50
+        for x in range(0, width, grid_spacing):
+            pygame.draw.line(surface, (*theme.grid_border, 30), (x, 0), (x, height), 1)
+        for y in range(0, height, grid_spacing):
+            pygame.draw.line(surface, (*theme.grid_border, 30), (0, y), (width, y), 1)
+
+    def _draw_background_stars(self, surface, painter, width, height, current_time):
+        """背景风格：太空科幻 - 动态星空 + 流星"""
+        theme = painter.theme
+        rng = painter.rng  # 背景专用随机数，不影响方块序列
+        surface.fill(theme.bg_color)
+
+        # 绘制星星（使用时间相关种子，让星星缓慢移动）
+        seed = int(hashlib.md5(str(current_time // 2000).encode()).hexdigest(), 16) % 1000
+        rng.seed(seed)
+
+        for i in range(150):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(1, 3)
+            # 闪烁效果
+            twinkle = math.sin(current_time * 0.003 + i * 0.5) * 0.5 + 0.5
+            brightness = int(150 + 105 * twinkle)
+            color = (
+                min(255, theme.bg_color2[0] + brightness),
+                min(255, theme.bg_color2[1] + brightness),
+                min(255, theme.bg_color2[2] + brightness)
+            )
+            pygame.draw.circle(surface, color, (x, y), size)
+
+        # 流星效果
+        meteor_count = 2
+        for i in range(meteor_count):
+            meteor_x = int((current_time * 0.15 + i * 500) % (width + 200)) - 100
+            meteor_y = int((current_time * 0.08 + i * 300) % (height + 200)) - 100
+            meteor_length = 30 + i * 20
+            # 流星尾迹
+            for j in range(meteor_length):
+                alpha = int(50 * (1 - j / meteor_length))
+                tail_x = meteor_x - j * 2
+                tail_y = meteor_y - j
+                if 0 <= tail_x < width and 0 <= tail_y < height:
+                    s = painter.create((2, 1))
+                    s.fill((*theme.text_highlight, alpha))
+                    surface.blit(s, (tail_x, tail_y))
+
+    def _draw_background_particles(self, surface, painter, width, height, current_time):
+        """背景风格：复古像素 - 浮动像素方块"""
+        theme = painter.theme
+        rng = painter.rng  # 背景专用随机数，不影响方块序列
+        surface.fill(theme.bg_color)
+
+        seed = int(hashlib.md5(str(current_time // 400).encode()).hexdigest(), 16) % 1000
+        rng.seed(seed)
+
+        # 浮动的像素方块（更大、更多）
+        for _ in range(50):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(4, 12)
+            color = rng.choice(theme.particle_colors)
+            alpha = rng.randint(40, 100)
+            s = painter.create((size, size))
+            s.fill((color[0], color[1], color[2], alpha))
+            surface.blit(s, (x, y))
+
+        # 添加像素网格线
+        grid_size = 20
+        for x in range(0, width, grid_size):
+            pygame.draw.line(surface, (*theme.grid_border, 20), (x, 0), (x, height), 1)
+        for y in range(0, height, grid_size):
+            pygame.draw.line(surface, (*theme.grid_border, 20), (0, y), (width, y), 1)
+
+    def _draw_background_waves(self, surface, painter, width, height, current_time):
+        """背景风格：海洋世界 - 动态波浪 + 气泡"""
+        theme = painter.theme
+        rng = painter.rng  # 背景专用随机数，不影响方块序列
+        surface.fill(theme.bg_color)
+
+        seed = int(hashlib.md5(str(current_time // 150).encode()).hexdigest(), 16) % 1000
+        rng.seed(seed)
+
+        # 多层动态波浪
+        for layer in range(6):
+            wave_y = int(height * (0.15 + 0.14 * layer))
+            amplitude = 12 + layer * 4
+            phase_shift = layer * 0.8
+
+            for x in range(0, width, 4):
+                wave_offset = math.sin(x * 0.015 + current_time * 0.001 + phase_shift) * amplitude
+                y = wave_y + int(wave_offset)
+                alpha = 35 - layer * 5
+                color = (
+                    min(255, theme.bg_color2[0] + 60),
+                    min(255, theme.bg_color2[1] + 60),
+                    min(255, theme.bg_color2[2] + 60)
+                )
+                s = painter.create((6, 2 + layer))
+                s.fill((color[0], color[1], color[2], alpha))
+                surface.blit(s, (x, y))
+
+        # 气泡效果
+        bubble_count = 15
+        for i in range(bubble_count):
+            bubble_x = int((current_time * 0.03 + i * 137) % width)
+            bubble_y = int(height - (current_time * 0.05 + i * 89) % height)
+            bubble_size = 3 + i % 5
+            bubble_alpha = 30 + i * 5
+            pygame.draw.circle(surface, (*theme.text_highlight, bubble_alpha),
+                             (bubble_x, bubble_y), bubble_size, 1)
+
+    def _draw_background_aurora(self, surface, painter, width, height, current_time):
+        """背景风格：森林秘境 - 极光效果 + 萤火虫"""
+        theme = painter.theme
+        rng = painter.rng  # 背景专用随机数，不影响方块序列
+        surface.fill(theme.bg_color)
+
+        seed = int(hashlib.md5(str(current_time // 250).encode()).hexdigest(), 16) % 1000
+        rng.seed(seed)
+
+        # 多层极光带
+        for i in range(4):
+            aurora_y = int(height * (0.25 + 0.18 * i))
+            color = theme.particle_colors[i % len(theme.particle_colors)]
+
+            for x in range(0, width, 8):
+                # 更复杂的波浪运动
+                wave_offset = math.sin(x * 0.008 + current_time * 0.0015 + i * 1.5) * 40
+                wave_offset += math.sin(x * 0.015 + current_time * 0.002 + i) * 20
+                y = aurora_y + int(wave_offset)
+
+                s = painter.create((12, 25 + i * 8))
+                alpha = 25 - i * 5
+                s.fill((color[0], color[1], color[2], alpha))
+                surface.blit(s, (x, y))
+
+        # 萤火虫效果
+        firefly_count = 20
+        for i in range(firefly_count):
+            firefly_x = int((math.sin(current_time * 0.0005 + i * 0.5) * 0.5 + 0.5) * width)
+            firefly_y = int((math.cos(current_time * 0.0003 + i * 0.7) * 0.5 + 0.5) * height)
+            firefly_size = 2 + (i % 3)
+            # 闪烁效果
+            firefly_alpha = int(50 + 50 * math.sin(current_time * 0.005 + i))
+            pygame.draw.circle(surface, (*theme.text_highlight, firefly_alpha),
+                             (firefly_x, firefly_y), firefly_size)
+
+    def _draw_background_sunset(self, surface, painter, width, height, current_time):
+        """背景风格：日落黄昏 - 温暖渐变 + 光线"""
+        theme = painter.theme
+        # 基础渐变
+        for y in range(0, height, 2):
+            ratio = y / height
+            # 三色渐变（模拟日落）
+            if ratio < 0.3:
+                r = int(theme.bg_color[0])
+                g = int(theme.bg_color[1] * (1 - ratio / 0.3) + theme.bg_color2[1] * (ratio / 0.3))
+                b = int(theme.bg_color[2])
+            elif ratio < 0.7:
+                r = int(theme.bg_color2[0] * (1 - (ratio - 0.3) / 0.4) + theme.bg_color[0] * ((ratio - 0.3) / 0.4))
+                g = int(theme.bg_color2[1])
+                b = int(theme.bg_color[2] * (1 - (ratio - 0.3) / 0.4) + theme.bg_color2[2] * ((ratio - 0.3) / 0.4))
+            else:
+                r = int(theme.bg_color[0])
+                g = int(theme.bg_color[1] * (1 - (ratio - 0.7) / 0.3) + theme.bg_color[1] * ((ratio - 0.7) / 0.3))
+                b = int(theme.bg_color2[2])
+            pygame.draw.line(surface, (r, g, b), (0, y), (width, y), 2)
+
+        # 光线效果（模拟阳光）
+        sun_x = int(width * 0.7)
+        sun_y = int(height * 0.2)
+        ray_count = 8
+        for i in range(ray_count):
+            ray_angle = math.pi * 0.1 * (i - ray_count / 2) / ray_count
+            ray_length = int(height * 0.6)
+            ray_end_x = sun_x + int(math.sin(ray_angle) * ray_length)
+            ray_end_y = sun_y + ray_length
+
+            # 绘制渐变光线
+            for j in range(20):
+                alpha = int(15 * (1 - j / 20))
+                t = j / 20
+                ray_x1 = int(sun_x + (ray_end_x - sun_x) * t)
+                ray_y1 = int(sun_y + (ray_end_y - sun_y) * t)
+                ray_x2 = int(sun_x + (ray_end_x - sun_x) * (t + 0.05))
+                ray_y2 = int(sun_y + (ray_end_y - sun_y) * (t + 0.05))
+
+                s = painter.create((abs(ray_x2 - ray_x1) + 10, 3))
+                s.fill((*theme.text_highlight, alpha))
+                surface.blit(s, (min(ray_x1, ray_x2) - 5, ray_y1))
+
+    def _draw_background_default(self, surface, painter, width, height, current_time):
+        """背景风格：默认纯色背景"""
+        theme = painter.theme
+        surface.fill(theme.bg_color)
 
     def load_chinese_font(self, size):
         """加载支持中文的字体"""
@@ -2379,6 +4640,16 @@ class Tetris:
         self.font_path = None
         return pygame.font.Font(None, size)
 
+    def update_layout(self):
+        """窗口尺寸、缩放或主题变化后重建布局（未变化时直接复用；渲染线程正在绘制时等它画完）"""
+        key = (self.window_width, self.window_height, self.scale_factor, self.current_theme.name)
+        if self.layout is None or self.layout.key != key:
+            HITCHES.note('layout', f"{key[0]}x{key[1]}")
+            with self.render_lock:
+                self.layout = GameLayout(*key)
+                # 与尺寸有关的小图、字体、纹理按缩放因子分档缓存，缩放回来时直接命中
+                SIZE_CACHE.select(self.scale_factor)
+
     def get_scaled_offset(self, base_x, base_y):
         """根据窗口缩放计算偏移量"""
         scaled_x = int(base_x * self.scale_factor)
@@ -2407,24 +4678,133 @@ class Tetris:
         return [[color if cell == 1 else 0 for cell in row] for row in shape]
 
     def get_next_pieces_preview(self, count=5):
-        """获取接下来N个方块的预览（用于UI显示）"""
-        preview = []
-        temp_bag = self.piece_bag.copy()
-        temp_piece_index = piece_index = 0
+        """获取接下来N个方块的预览（用于UI显示）
+
+        直接取自方块队列，不够时从袋子中补足（补进队列，保证预览和实际出现的方块一致）
+        """
+        while len(self.next_queue) < count:
+            self.next_queue.append(self.create_piece())
+        return self.next_queue[:count]
+
+    @property
+    def current_theme(self):
+        """当前主题"""
+        return self._current_theme
+
+    @current_theme.setter
+    def current_theme(self, theme):
+        # 切换主题时同时启用它的渲染策略（渲染策略和背景缓冲区归渲染线程使用，先等它画完这一帧）
+        with self.render_lock:
+            previous = getattr(self, 'theme_renderer', None)
+            self._current_theme = theme
+            self.theme_renderer = theme.activate(self)
+            if previous is not None and previous is not self.theme_renderer:
+                previous.release_background()
+
+    def prefetch_next_theme(self):
+        """预先选好按 R 后切换到的主题（排除当前主题），并在后台合成它的音乐"""
+        self.next_theme = random.choice([t for t in THEMES if t != self.current_theme])
+        if self.sound_manager.music_enabled:
+            self.sound_manager.prepare_music(self.next_theme)
+
+    def switch_theme(self, theme):
+        """切换主题（不阻塞）
+
+        渲染策略和布局立即生效，画面从新主题底色淡入；音乐在后台合成，好了之后自动接上。
+        """
+        HITCHES.note('theme', theme.name)
+        with self.render_lock:
+            self.current_theme = theme
+            self.update_layout()
+        self.animation_manager.theme = theme
+        self.sound_manager.set_music_theme(theme)
+        self._theme_transition = GameClock.get_ticks()
+        self.prefetch_next_theme()
+
+    def update_theme_transition(self):
+        """淡入结束且音乐已就绪时结束主题切换过渡"""
+        if self._theme_transition is None:
+            return
+        if GameClock.get_ticks() - self._theme_transition < self.THEME_FADE_MS:
+            return
+        if self.sound_manager.music_enabled and not self.sound_manager.is_music_ready():
+            return
+        self._theme_transition = None
+        if self.sound_manager.music_enabled and self.current_theme.name in self.sound_manager.music_errors:
+            self.achievement.notify("主题音乐合成失败", "这个主题暂时没有背景音乐")
+
+    def draw_theme_transition(self):
+        """主题切换过渡：新主题底色逐渐变透明；音乐还在合成时在底部显示提示"""
+        elapsed = GameClock.get_ticks() - self._theme_transition
+        if elapsed < self.THEME_FADE_MS:
+            alpha = int(255 * (1 - elapsed / self.THEME_FADE_MS))
+            fade = SURFACES.create((self.window_width, self.window_height))
+            fade.fill((*self.current_theme.bg_color, alpha))
+            self.screen.blit(fade, (0, 0))
+
+        if self.sound_manager.music_enabled and not self.sound_manager.is_music_ready():
+            scale = self.scale_factor
+            # 文字用主题的文字颜色：缩放或主题变了都要重新渲染
+            key = (scale, self.current_theme.name)
+            if self._theme_hint is None or self._theme_hint[0] != key:
+                hint_font = SIZE_CACHE.font(self.font_path, max(12, int(16 * scale)))
+                self._theme_hint = (key, hint_font.render("正在准备主题音乐...", True,
+                                                          self.current_theme.text_color))
+            hint = self._theme_hint[1]
+            self.screen.blit(hint, hint.get_rect(bottomright=(self.window_width - int(10 * scale),
+                                                              self.window_height - int(8 * scale))))
+
+    def hitch_context(self):
+        """卡顿记录附带的现场信息"""
+        if self.show_settings or self.show_statistics or self.show_achievements:
+            state = 'panel'
+        elif self.waiting_to_start or self.countdown_active:
+            state = 'start'
+        elif self.game_over:
+            state = 'game_over'
+        else:
+            state = 'paused' if self.paused else 'playing'
+        return {
+            'state': state,
+            'theme': self.current_theme.name,
+            'effects': {name: count for name, count in self.animation_manager.get_effect_counts().items()
+                        if count},
+        }
+
+    @property
+    def next_piece(self):
+        """下一个方块（队列第一个）"""
+        return self.next_queue[0]
+
+    @next_piece.setter
+    def next_piece(self, piece):
+        if self.next_queue:
+            self.next_queue[0] = piece
+        else:
+            self.next_queue.append(piece)
+        self._queue_version += 1
 
-        # 模拟从袋子中取方块
-        for _ in range(count):
-            if not temp_bag:
-                temp_bag = list(range(len(SHAPES)))
-                random.shuffle(temp_bag)
+    def create_animation_manager(self):
+        """按当前主题和特效模拟频率设置创建动画管理器"""
+        return AnimationManager(theme=self.current_theme,
+                                sim_hz=self.settings_manager.get('effect_sim_hz', 0))
 
-            piece_idx = temp_bag.pop()
-            shape = SHAPES[piece_idx]
-            color = piece_idx + 1
-            piece = [[color if cell == 1 else 0 for cell in row] for row in shape]
-            preview.append(piece)
+    def reset_piece_queue(self):
+        """清空方块袋子，重新生成当前方块和预览队列"""
+        self.piece_bag = []
+        self.current_piece = self.create_piece()
+        self.next_queue = [self.create_piece() for _ in range(self.next_count)]
+        self._queue_version += 1
+        self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
+        self.current_y = 0
 
-        return preview
+    def set_next_count(self, count, save=True):
+        """设置预览方块数量（1 - MAX_NEXT_COUNT）"""
+        self.next_count = max(1, min(self.MAX_NEXT_COUNT, count))
+        self.get_next_pieces_preview(self.next_count)
+        self._queue_version += 1
+        if save:
+            self.settings_manager.set('next_count', self.next_count)
 
     def rotate_piece(self, piece):
         """旋转方块"""
@@ -2485,7 +4865,7 @@ class Tetris:
 
     def clear_lines(self):
         """清除完整的行 - 增强版带连击和霓虹光效"""
-        current_time = pygame.time.get_ticks()
+        current_time = GameClock.get_ticks()
 
         # 检查连击（2秒内连续消除）
         if current_time - self.last_clear_time < 2000:
@@ -2502,6 +4882,7 @@ class Tetris:
 
         if lines_to_clear:
             lines_count = len(lines_to_clear)
+            HITCHES.note('clear', lines_count)
 
             # 统计跟踪
             self.statistics.record_line_clear(lines_count)
@@ -2556,9 +4937,9 @@ class Tetris:
 
             # 添加霓虹光带动画（炫酷消除效果）
             if lines_to_clear:
-                grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-                block_size = self.get_scaled_size(BLOCK_SIZE)
-                grid_rect = (grid_x, grid_y, GRID_WIDTH * block_size, GRID_HEIGHT * block_size)
+                grid_x, grid_y = self.layout.grid_x, self.layout.grid_y
+                block_size = self.layout.block_size
+                grid_rect = tuple(self.layout.rects['grid'])
 
                 start_y = min(lines_to_clear)
                 end_y = max(lines_to_clear)
@@ -2612,8 +4993,9 @@ class Tetris:
 
     def new_piece(self):
         """生成新方块"""
-        self.current_piece = self.next_piece
-        self.next_piece = self.create_piece()
+        self.current_piece = self.next_queue.pop(0)
+        self.get_next_pieces_preview(self.next_count)
+        self._queue_version += 1
         self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
         self.current_y = 0
 
@@ -2649,211 +5031,254 @@ class Tetris:
         return tuple(tuple(row) for row in piece)
 
     def draw_3d_block(self, rect, color_index):
-        """绘制3D方块 - 为每个主题应用独特的渲染风格"""
-        # 使用主题配色方案
-        main_color = self.current_theme.piece_colors[color_index]
-        highlight = self.current_theme.highlight_colors[color_index]
-        shadow = self.current_theme.shadow_colors[color_index]
-
-        theme_name = self.current_theme.name
-
-        # ==================== 主题专属渲染风格 ====================
-
-        if theme_name == "neon_city":
-            # 🌆 霓虹城市 - 赛博朋克风格：强发光 + 扫描线
-            if self.neon_mode:
-                # 多层发光效果
-                for i in range(3, 0, -1):
-                    glow_size = i * 6
-                    glow_alpha = 15 - i * 4
-                    glow_surface = pygame.Surface((rect.width + glow_size * 2, rect.height + glow_size * 2), pygame.SRCALPHA)
-                    pygame.draw.rect(glow_surface, (*main_color, glow_alpha),
-                                   (glow_size, glow_size, rect.width, rect.height))
-                    self.screen.blit(glow_surface, (rect.x - glow_size, rect.y - glow_size))
-
-            # 主方块 - 带数字网格纹理
-            main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
-            pygame.draw.rect(self.screen, main_color, main_rect)
-
-            # 添加赛博朋克风格的数字纹理
-            if rect.width > 15:
-                grid_color = (*highlight, 100) if len(highlight) == 4 else (*highlight, 100)
-                for i in range(2, int(rect.width) - 2, 4):
-                    pygame.draw.line(self.screen, grid_color,
-                                   (rect.x + i, rect.y + 2),
-                                   (rect.x + i, rect.bottom - 2), 1)
-
-            # 亮边框
-            pygame.draw.rect(self.screen, highlight, main_rect, 2)
-
-        elif theme_name == "space_scifi":
-            # 🚀 太空科幻 - 神秘风格：柔和光晕 + 星点
-            # 柔和外发光
-            if self.neon_mode:
-                glow_surface = pygame.Surface((rect.width + 12, rect.height + 12), pygame.SRCALPHA)
-                pygame.draw.rect(glow_surface, (*main_color, 40),
-                               (6, 6, rect.width, rect.height))
-                self.screen.blit(glow_surface, (rect.x - 6, rect.y - 6))
-
-            # 主方块 - 圆角
-            main_rect = pygame.Rect(rect.x + 3, rect.y + 3, rect.width - 6, rect.height - 6)
-            pygame.draw.rect(self.screen, main_color, main_rect, border_radius=3)
-
-            # 添加星点装饰
-            if rect.width > 15:
-                star_positions = [(rect.x + 6, rect.y + 6), (rect.right - 6, rect.bottom - 6)]
-                for sx, sy in star_positions:
-                    pygame.draw.circle(self.screen, (255, 255, 255, 150), (sx, sy), 1)
-
-            # 柔和边框
-            pygame.draw.rect(self.screen, highlight, main_rect, 1, border_radius=3)
-
-        elif theme_name == "retro_pixel":
-            # 👾 复古像素 - 8-bit风格：硬边 + 高对比
-            # 无发光，纯像素风格
-            main_rect = pygame.Rect(rect.x + 1, rect.y + 1, rect.width - 2, rect.height - 2)
-            pygame.draw.rect(self.screen, main_color, main_rect)
-
-            # 高对比边框（黑色）
-            pygame.draw.rect(self.screen, (0, 0, 0), main_rect, 2)
-
-            # 内部高光（像素感）
-            pygame.draw.rect(self.screen, highlight,
-                           (rect.x + 3, rect.y + 3, 4, 4))
-            pygame.draw.rect(self.screen, shadow,
-                           (rect.right - 7, rect.bottom - 7, 4, 4))
-
-        elif theme_name == "ocean_world":
-            # 🌊 海洋世界 - 流畅风格：圆角 + 波浪纹理
-            if self.neon_mode:
-                # 水波纹发光
-                glow_surface = pygame.Surface((rect.width + 10, rect.height + 10), pygame.SRCALPHA)
-                for i in range(3):
-                    offset = i * 3
-                    pygame.draw.rect(glow_surface, (*main_color, 20 - i * 5),
-                                   (5 + offset, 5 + offset, rect.width - offset * 2, rect.height - offset * 2),
-                                   border_radius=4)
-                self.screen.blit(glow_surface, (rect.x - 5, rect.y - 5))
-
-            # 主方块 - 大圆角
-            main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
-            pygame.draw.rect(self.screen, main_color, main_rect, border_radius=6)
-
-            # 波浪纹理
-            if rect.width > 15:
-                wave_color = (*highlight, 80) if len(highlight) == 4 else (*highlight, 80)
-                mid_y = rect.centery
-                for x in range(rect.left + 4, rect.right - 4, 3):
-                    wave_offset = math.sin((x - rect.left) * 0.3) * 2
-                    pygame.draw.circle(self.screen, wave_color, (x, int(mid_y + wave_offset)), 1)
-
-            # 柔和边框
-            pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=6)
-
-        elif theme_name == "sunset_dusk":
-            # 🌅 日落黄昏 - 温暖风格：渐变 + 柔和光晕
-            if self.neon_mode:
-                # 温暖渐变发光
-                glow_surface = pygame.Surface((rect.width + 8, rect.height + 8), pygame.SRCALPHA)
-                # 多层渐变
-                colors_grad = [
-                    (*main_color, 50),
-                    (*highlight, 30),
-                    (*shadow, 20)
-                ]
-                for i, color in enumerate(colors_grad):
-                    offset = i * 2
-                    pygame.draw.rect(glow_surface, color,
-                                   (4 - offset, 4 - offset, rect.width + offset * 2, rect.height + offset * 2),
-                                   border_radius=5)
-                self.screen.blit(glow_surface, (rect.x - 4, rect.y - 4))
-
-            # 主方块 - 柔和圆角
-            main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
-            pygame.draw.rect(self.screen, main_color, main_rect, border_radius=5)
-
-            # 日落渐变效果（垂直渐变）
-            if rect.height > 10:
-                grad_surface = pygame.Surface((rect.width - 8, rect.height - 8), pygame.SRCALPHA)
-                for y in range(0, rect.height - 8, 2):
-                    ratio = y / (rect.height - 8)
-                    grad_color = (
-                        int(main_color[0] * (1 - ratio) + highlight[0] * ratio),
-                        int(main_color[1] * (1 - ratio) + highlight[1] * ratio),
-                        int(main_color[2] * (1 - ratio) + highlight[2] * ratio),
-                        100
-                    )
-                    pygame.draw.line(grad_surface, grad_color,
-                                   (0, y), (rect.width - 8, y), 2)
-                self.screen.blit(grad_surface, (rect.x + 4, rect.y + 4))
-
-            # 温暖边框
-            pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=5)
-
-        elif theme_name == "forest_mystic":
-            # 🌲 森林秘境 - 自然风格：有机形状 + 叶子纹理
-            if self.neon_mode:
-                # 自然有机发光
-                glow_surface = pygame.Surface((rect.width + 14, rect.height + 14), pygame.SRCALPHA)
-                # 不规则形状发光
-                for i in range(4):
-                    offset = [i * 3, i * 3, (3-i) * 3, (3-i) * 3][i % 4]
-                    alpha = 25 - i * 5
-                    pygame.draw.rect(glow_surface, (*main_color, alpha),
-                                   (7 - offset, 7 - offset, rect.width + offset * 2, rect.height + offset * 2),
-                                   border_radius=8 - i)
-                self.screen.blit(glow_surface, (rect.x - 7, rect.y - 7))
-
-            # 主方块 - 自然圆角
-            main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
-            pygame.draw.rect(self.screen, main_color, main_rect, border_radius=7)
-
-            # 叶子纹理
-            if rect.width > 15:
-                leaf_color = (*highlight, 90) if len(highlight) == 4 else (*highlight, 90)
-                # 绘制简单的叶子形状
-                leaf_center = (rect.centerx, rect.centery)
-                pygame.draw.ellipse(self.screen, leaf_color,
-                                   (leaf_center[0] - 4, leaf_center[1] - 3, 8, 6))
-                pygame.draw.line(self.screen, leaf_color,
-                               (leaf_center[0], leaf_center[1] - 3),
-                               (leaf_center[0], leaf_center[1] + 3), 1)
-
-            # 自然边框
-            pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=7)
+        """绘制3D方块 - 按当前主题的方块风格绘制（风格函数在主题启用时选定）"""
+        renderer = self.theme_renderer
+        renderer.draw_block(self, rect, *renderer.block_colors[color_index])
+
+    def _draw_block_neon_city(self, rect, main_color, highlight, shadow):
+        """方块风格：霓虹城市 - 赛博朋克风格：强发光 + 扫描线"""
+        if self.neon_mode:
+            # 多层发光效果
+            for i in range(3, 0, -1):
+                glow_size = i * 6
+                glow_alpha = 15 - i * 4
+                glow_surface = SURFACES.create((rect.width + glow_size * 2, rect.height + glow_size * 2))
+                pygame.draw.rect(glow_surface, (*main_color, glow_alpha),
+                               (glow_size, glow_size, rect.width, rect.height))
+                self.screen.blit(glow_surface, (rect.x - glow_size, rect.y - glow_size))
+
+        # 主方块 - 带数字网格纹理
+        main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
+        pygame.draw.rect(self.screen, main_color, main_rect)
+
+        # 添加赛博朋克风格的数字纹理
+        if rect.width > 15:
+            grid_color = (*highlight, 100) if len(highlight) == 4 else (*highlight, 100)
+            for i in range(2, int(rect.width) - 2, 4):
+                pygame.draw.line(self.screen, grid_color,
+                               (rect.x + i, rect.y + 2),
+                               (rect.x + i, rect.bottom - 2), 1)
+
+        # 亮边框
+        pygame.draw.rect(self.screen, highlight, main_rect, 2)
+
+    def _draw_block_space_scifi(self, rect, main_color, highlight, shadow):
+        """方块风格：太空科幻 - 神秘风格：柔和光晕 + 星点"""
+        # 柔和外发光
+        if self.neon_mode:
+            glow_surface = SURFACES.create((rect.width + 12, rect.height + 12))
+            pygame.draw.rect(glow_surface, (*main_color, 40),
+                           (6, 6, rect.width, rect.height))
+            self.screen.blit(glow_surface, (rect.x - 6, rect.y - 6))
+
+        # 主方块 - 圆角
+        main_rect = pygame.Rect(rect.x + 3, rect.y + 3, rect.width - 6, rect.height - 6)
+        pygame.draw.rect(self.screen, main_color, main_rect, border_radius=3)
+
+        # 添加星点装饰
+        if rect.width > 15:
+            star_positions = [(rect.x + 6, rect.y + 6), (rect.right - 6, rect.bottom - 6)]
+            for sx, sy in star_positions:
+                pygame.draw.circle(self.screen, (255, 255, 255, 150), (sx, sy), 1)
+
+        # 柔和边框
+        pygame.draw.rect(self.screen, highlight, main_rect, 1, border_radius=3)
+
+    def _draw_block_retro_pixel(self, rect, main_color, highlight, shadow):
+        """方块风格：复古像素 - 8-bit风格：硬边 + 高对比"""
+        # 无发光，纯像素风格
+        main_rect = pygame.Rect(rect.x + 1, rect.y + 1, rect.width - 2, rect.height - 2)
+        pygame.draw.rect(self.screen, main_color, main_rect)
+
+        # 高对比边框（黑色）
+        pygame.draw.rect(self.screen, (0, 0, 0), main_rect, 2)
+
+        # 内部高光（像素感）
+        pygame.draw.rect(self.screen, highlight,
+                       (rect.x + 3, rect.y + 3, 4, 4))
+        pygame.draw.rect(self.screen, shadow,
+                       (rect.right - 7, rect.bottom - 7, 4, 4))
+
+    def _draw_block_ocean_world(self, rect, main_color, highlight, shadow):
+        """方块风格：海洋世界 - 流畅风格：圆角 + 波浪纹理"""
+        if self.neon_mode:
+            # 水波纹发光
+            glow_surface = SURFACES.create((rect.width + 10, rect.height + 10))
+            for i in range(3):
+                offset = i * 3
+                pygame.draw.rect(glow_surface, (*main_color, 20 - i * 5),
+                               (5 + offset, 5 + offset, rect.width - offset * 2, rect.height - offset * 2),
+                               border_radius=4)
+            self.screen.blit(glow_surface, (rect.x - 5, rect.y - 5))
+
+        # 主方块 - 大圆角
+        main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
+        pygame.draw.rect(self.screen, main_color, main_rect, border_radius=6)
+
+        # 波浪纹理
+        if rect.width > 15:
+            wave_color = (*highlight, 80) if len(highlight) == 4 else (*highlight, 80)
+            mid_y = rect.centery
+            for x in range(rect.left + 4, rect.right - 4, 3):
+                wave_offset = math.sin((x - rect.left) * 0.3) * 2
+                pygame.draw.circle(self.screen, wave_color, (x, int(mid_y + wave_offset)), 1)
+
+        # 柔和边框
+        pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=6)
+
+    def _draw_block_sunset_dusk(self, rect, main_color, highlight, shadow):
+        """方块风格：日落黄昏 - 温暖风格：渐变 + 柔和光晕"""
+        if self.neon_mode:
+            # 温暖渐变发光
+            glow_surface = SURFACES.create((rect.width + 8, rect.height + 8))
+            # 多层渐变
+            colors_grad = [
+                (*main_color, 50),
+                (*highlight, 30),
+                (*shadow, 20)
+            ]
+            for i, color in enumerate(colors_grad):
+                offset = i * 2
+                pygame.draw.rect(glow_surface, color,
+                               (4 - offset, 4 - offset, rect.width + offset * 2, rect.height + offset * 2),
+                               border_radius=5)
+            self.screen.blit(glow_surface, (rect.x - 4, rect.y - 4))
+
+        # 主方块 - 柔和圆角
+        main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
+        pygame.draw.rect(self.screen, main_color, main_rect, border_radius=5)
+
+        # 日落渐变效果（垂直渐变）
+        if rect.height > 10:
+            grad_surface = SURFACES.create((rect.width - 8, rect.height - 8))
+            for y in range(0, rect.height - 8, 2):
+                ratio = y / (rect.height - 8)
+                grad_color = (
+                    int(main_color[0] * (1 - ratio) + highlight[0] * ratio),
+                    int(main_color[1] * (1 - ratio) + highlight[1] * ratio),
+                    int(main_color[2] * (1 - ratio) + highlight[2] * ratio),
+                    100
+                )
+                pygame.draw.line(grad_surface, grad_color,
+                               (0, y), (rect.width - 8, y), 2)
+            self.screen.blit(grad_surface, (rect.x + 4, rect.y + 4))
+
+        # 温暖边框
+        pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=5)
+
+    def _draw_block_forest_mystic(self, rect, main_color, highlight, shadow):
+        """方块风格：森林秘境 - 自然风格：有机形状 + 叶子纹理"""
+        if self.neon_mode:
+            # 自然有机发光
+            glow_surface = SURFACES.create((rect.width + 14, rect.height + 14))
+            # 不规则形状发光
+            for i in range(4):
+                offset = [i * 3, i * 3, (3-i) * 3, (3-i) * 3][i % 4]
+                alpha = 25 - i * 5
+                pygame.draw.rect(glow_surface, (*main_color, alpha),
+                               (7 - offset, 7 - offset, rect.width + offset * 2, rect.height + offset * 2),
+                               border_radius=8 - i)
+            self.screen.blit(glow_surface, (rect.x - 7, rect.y - 7))
+
+        # 主方块 - 自然圆角
+        main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
+        pygame.draw.rect(self.screen, main_color, main_rect, border_radius=7)
+
+        # 叶子纹理
+        if rect.width > 15:
+            leaf_color = (*highlight, 90) if len(highlight) == 4 else (*highlight, 90)
+            # 绘制简单的叶子形状
+            leaf_center = (rect.centerx, rect.centery)
+            pygame.draw.ellipse(self.screen, leaf_color,
+                               (leaf_center[0] - 4, leaf_center[1] - 3, 8, 6))
+            pygame.draw.line(self.screen, leaf_color,
+                           (leaf_center[0], leaf_center[1] - 3),
+                           (leaf_center[0], leaf_center[1] + 3), 1)
+
+        # 自然边框
+        pygame.draw.rect(self.screen, highlight, main_rect, 2, border_radius=7)
+
+    def _draw_block_default(self, rect, main_color, highlight, shadow):
+        """方块风格：默认风格 - 标准渲染"""
+        if self.neon_mode:
+            glow_surface = SURFACES.create((rect.width + 20, rect.height + 20))
+            pygame.draw.rect(glow_surface, (*main_color, 50),
+                           (10, 10, rect.width, rect.height))
+            self.screen.blit(glow_surface, (rect.x - 10, rect.y - 10))
+
+        # 主方块
+        main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
+        pygame.draw.rect(self.screen, main_color, main_rect)
+
+        # 高光和阴影
+        pygame.draw.line(self.screen, highlight,
+                        (rect.x + 2, rect.y + 2), (rect.right - 2, rect.y + 2), 3)
+        pygame.draw.line(self.screen, highlight,
+                        (rect.x + 2, rect.y + 2), (rect.x + 2, rect.bottom - 2), 3)
+        pygame.draw.line(self.screen, shadow,
+                        (rect.x + 2, rect.bottom - 2), (rect.right - 2, rect.bottom - 2), 3)
+        pygame.draw.line(self.screen, shadow,
+                        (rect.right - 2, rect.y + 2), (rect.right - 2, rect.bottom - 2), 3)
+
+    def get_block_sprite(self, color_index, size):
+        """方块预渲染小图（纹理后端和棋盘层用）：返回 (表面, 四周留给发光的边距)
+
+        缓存在当前尺寸档位中（键包含主题），来回缩放窗口或切换主题时可以直接复用。
+        """
+        key = ('block', self.current_theme.name, size, color_index, self.neon_mode)
+        cache = SIZE_CACHE.current
+        cached = cache.get(key)
+        if cached is None:
+            pad = GLOW_PAD
+            surface = self.prerender((size + pad * 2, size + pad * 2),
+                                     lambda: self.draw_3d_block(pygame.Rect(pad, pad, size, size), color_index))
+            cached = (surface, pad)
+            cache[key] = cached
+        return cached
+
+    def prerender(self, size, draw):
+        """把一段直接画在屏幕上的绘制代码预渲染成透明小图，贴回屏幕时效果与直接绘制一致
 
+        Args:
+            size: 小图尺寸
+            draw: 无参数的绘制函数，绘制目标为 self.screen（坐标相对小图左上角）
+        """
+        # 窗口表面上 pygame.draw 会忽略颜色的 alpha，直接画进透明表面却会变成半透明，
+        # 所以分别画在透明、黑色、白色底上：黑白底结果相同的像素是不透明部分，其余取透明底的结果
+        glow = SURFACES.create(size)
+        on_black = pygame.Surface(size)
+        on_white = pygame.Surface(size)
+        on_white.fill((255, 255, 255))
+        screen = self.screen
+        try:
+            for target in (glow, on_black, on_white):
+                self.screen = target
+                draw()
+        finally:
+            self.screen = screen
+        opaque = SURFACES.create(size)
+        opaque.blit(on_black, (0, 0))
+        mask = pygame.mask.from_threshold(on_black, (0, 0, 0, 255), (2, 2, 2, 255), othersurface=on_white)
+        return mask.to_surface(SURFACES.create(size), setsurface=opaque, unsetsurface=glow)
+
+    def draw_grid(self, offset_x=0, offset_y=0):
+        """绘制游戏网格 - 使用主题配色（offset 为屏幕震动偏移）"""
+        if self.render_backend.board_layer:
+            self.draw_board_layer(offset_x, offset_y)
         else:
-            # 默认风格 - 标准渲染
-            if self.neon_mode:
-                glow_surface = pygame.Surface((rect.width + 20, rect.height + 20), pygame.SRCALPHA)
-                pygame.draw.rect(glow_surface, (*main_color, 50),
-                               (10, 10, rect.width, rect.height))
-                self.screen.blit(glow_surface, (rect.x - 10, rect.y - 10))
-
-            # 主方块
-            main_rect = pygame.Rect(rect.x + 2, rect.y + 2, rect.width - 4, rect.height - 4)
-            pygame.draw.rect(self.screen, main_color, main_rect)
-
-            # 高光和阴影
-            pygame.draw.line(self.screen, highlight,
-                            (rect.x + 2, rect.y + 2), (rect.right - 2, rect.y + 2), 3)
-            pygame.draw.line(self.screen, highlight,
-                            (rect.x + 2, rect.y + 2), (rect.x + 2, rect.bottom - 2), 3)
-            pygame.draw.line(self.screen, shadow,
-                            (rect.x + 2, rect.bottom - 2), (rect.right - 2, rect.bottom - 2), 3)
-            pygame.draw.line(self.screen, shadow,
-                            (rect.right - 2, rect.y + 2), (rect.right - 2, rect.bottom - 2), 3)
-
-    def draw_grid(self):
-        """绘制游戏网格 - 使用主题配色"""
-        # 计算缩放后的位置和大小
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-
-        grid_rect = pygame.Rect(
-            grid_x - 2, grid_y - 2,
-            GRID_WIDTH * block_size + 4, GRID_HEIGHT * block_size + 4
-        )
+            self._draw_board(offset_x, offset_y)
+
+    def _draw_board(self, offset_x=0, offset_y=0, layer=None):
+        """绘制网格边框、棋盘格和已落下的方块
+
+        Args:
+            offset_x, offset_y: 相对布局坐标的平移
+            layer: 绘制棋盘层时为 (泛光表面或 None, 边距)：泛光在格子和方块之间加法混合，
+                   方块改贴不带发光的预渲染小图
+        """
+        layout = self.layout
+        grid_rect = layout.rects['grid_frame'].move(offset_x, offset_y)
+        inner_rect = layout.rects['grid_inner'].move(offset_x, offset_y)
         pygame.draw.rect(self.screen, self.current_theme.grid_bg, grid_rect)
 
         # 霓虹边框增强 - 使用主题高亮色
@@ -2861,18 +5286,10 @@ class Tetris:
             # 外层发光边框（主题高亮色）
             pygame.draw.rect(self.screen, self.current_theme.text_highlight, grid_rect, 3)
             # 内层亮边框（主题文字色）
-            inner_rect = pygame.Rect(
-                grid_x - 1, grid_y - 1,
-                GRID_WIDTH * block_size + 2, GRID_HEIGHT * block_size + 2
-            )
             pygame.draw.rect(self.screen, self.current_theme.text_color, inner_rect, 1)
         else:
             # 普通双层边框 - 使用主题网格边框色
             pygame.draw.rect(self.screen, self.current_theme.grid_border, grid_rect, 3)
-            inner_rect = pygame.Rect(
-                grid_x - 1, grid_y - 1,
-                GRID_WIDTH * block_size + 2, GRID_HEIGHT * block_size + 2
-            )
             # 稍微提亮的边框
             bright_border = tuple(min(255, c + 40) for c in self.current_theme.grid_border)
             pygame.draw.rect(self.screen, bright_border, inner_rect, 1)
@@ -2881,16 +5298,15 @@ class Tetris:
         checker_color_1 = self.current_theme.grid_bg
         checker_color_2 = tuple(min(255, c + 10) for c in self.current_theme.grid_bg)
 
+        blocks = []
         for y in range(GRID_HEIGHT):
             for x in range(GRID_WIDTH):
-                rect = pygame.Rect(
-                    grid_x + x * block_size,
-                    grid_y + y * block_size,
-                    block_size, block_size
-                )
+                rect = layout.cell_rects[y][x]
+                if offset_x or offset_y:
+                    rect = rect.move(offset_x, offset_y)
 
                 if self.grid[y][x] != 0:
-                    self.draw_3d_block(rect, self.grid[y][x])
+                    blocks.append((rect, self.grid[y][x]))
                 else:
                     # 使用棋盘格效果绘制空格子
                     cell_color = checker_color_1 if (x + y) % 2 == 0 else checker_color_2
@@ -2898,10 +5314,84 @@ class Tetris:
                     # 绘制细线网格
                     pygame.draw.rect(self.screen, (40, 40, 50), rect, 1)
 
+        if layer is None:
+            for rect, cell in blocks:
+                self.render_backend.draw_block(rect, cell)
+            return
+
+        glow, pad = layer
+        if glow is not None:
+            self.screen.blit(glow, (grid_rect.x - pad, grid_rect.y - pad), special_flags=pygame.BLEND_RGB_ADD)
+        neon = self.neon_mode
+        self.neon_mode = False
+        try:
+            for rect, cell in blocks:
+                sprite, sprite_pad = self.get_block_sprite(cell, rect.width)
+                self.screen.blit(sprite, (rect.x - sprite_pad, rect.y - sprite_pad))
+        finally:
+            self.neon_mode = neon
+
+    def draw_board_layer(self, offset_x=0, offset_y=0):
+        """绘制棋盘层：网格和已落下的方块整体缓存，只有网格内容、主题、霓虹模式或布局变化时才重绘
+
+        霓虹模式的发光由一次泛光后处理生成（见 bloom），开销与棋盘堆多高无关。
+        """
+        signature = (self.layout.key, SURFACES.generation, self.neon_mode, tuple(map(tuple, self.grid)))
+        cached = self._board_layer
+        if cached is None or cached[0] != signature:
+            cached = self._board_layer = (signature,) + self._build_board_layer()
+        board, glow, pad = cached[1:]
+
+        frame = self.layout.rects['grid_frame']
+        x, y = frame.x + offset_x, frame.y + offset_y
+        if glow is not None:
+            # 框外一圈发光叠加到背景上（框内的已画进棋盘层）
+            width, height = glow.get_size()
+            for area in ((0, 0, width, pad), (0, height - pad, width, pad),
+                         (0, pad, pad, height - pad * 2), (width - pad, pad, pad, height - pad * 2)):
+                self.screen.blit(glow, (x - pad + area[0], y - pad + area[1]), area,
+                                 special_flags=pygame.BLEND_RGB_ADD)
+        self.screen.blit(board, (x, y))
+
+    def _build_board_layer(self):
+        """重绘棋盘层，返回 (棋盘层表面, 泛光表面或 None, 泛光边距)"""
+        layout = self.layout
+        frame = layout.rects['grid_frame']
+        glow, pad = None, 0
+        if self.neon_mode and self.theme_renderer.glow and any(any(row) for row in self.grid):
+            # 已落下方块的主色按 1/4 尺寸画进发光源，模糊放大后就是整块棋盘的发光
+            radius, strength = self.theme_renderer.glow
+            reach = radius * layout.block_size / BLOCK_SIZE
+            factor = 4
+            pad = int(math.ceil(reach)) + factor
+            source = SURFACES.create(((frame.width + pad * 2) // factor + 1,
+                                      (frame.height + pad * 2) // factor + 1), alpha=False)
+            source.fill((0, 0, 0))
+            colors = self.theme_renderer.block_colors
+            for y, row in enumerate(self.grid):
+                for x, cell in enumerate(row):
+                    if cell != 0:
+                        rect = layout.cell_rects[y][x]
+                        source.fill(colors[cell][0], ((rect.x - frame.x + pad) // factor,
+                                                      (rect.y - frame.y + pad) // factor,
+                                                      max(1, rect.width // factor), max(1, rect.height // factor)))
+            glow = bloom(source, (frame.width + pad * 2, frame.height + pad * 2),
+                         max(1, round(reach / factor / 2)), strength)
+
+        board = SURFACES.create(frame.size, alpha=False)
+        # 临时把绘制目标换成棋盘层，坐标平移到棋盘层左上角
+        screen = self.screen
+        self.screen = board
+        try:
+            self._draw_board(-frame.x, -frame.y, (glow, pad))
+        finally:
+            self.screen = screen
+        return board, glow, pad
+
     def draw_piece(self, piece, offset_x, offset_y, animated=False):
         """绘制方块 - 支持缩放和动画"""
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
+        grid_x, grid_y = self.layout.grid_x, self.layout.grid_y
+        block_size = self.layout.block_size
 
         # 如果启用了动画，获取动画插值位置
         if animated and self.piece_animation.animating:
@@ -2917,7 +5407,7 @@ class Tetris:
                         grid_y + (y + offset_y) * block_size,
                         block_size, block_size
                     )
-                    self.draw_3d_block(rect, cell)
+                    self.render_backend.draw_block(rect, cell)
 
     def get_ghost_piece_y(self, piece, start_y):
         """计算幽灵方块的Y坐标（最低有效位置）"""
@@ -2937,9 +5427,8 @@ class Tetris:
             return
 
         if grid_x is None or grid_y is None:
-            grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-        theme_name = self.current_theme.name
+            grid_x, grid_y = self.layout.grid_x, self.layout.grid_y
+        block_size = self.layout.block_size
 
         # 计算幽灵方块位置
         ghost_y = self.get_ghost_piece_y(self.current_piece, self.current_y)
@@ -2947,157 +5436,210 @@ class Tetris:
         for y, row in enumerate(self.current_piece):
             for x, cell in enumerate(row):
                 if cell != 0:
-                    rect = pygame.Rect(
-                        grid_x + (x + self.current_x) * block_size,
-                        grid_y + (y + ghost_y) * block_size,
-                        block_size, block_size
-                    )
+                    position = (grid_x + (x + self.current_x) * block_size,
+                                grid_y + (y + ghost_y) * block_size)
+                    self.render_backend.draw_sprite(self.get_ghost_sprite(cell), position)
+
+    def get_ghost_sprite(self, cell):
+        """获取幽灵方块单格图像（按格子大小和颜色缓存，霓虹城市的扫描线位置也计入缓存键）"""
+        block_size = self.layout.block_size
+        scan_y = 0
+        if self.theme_renderer.ghost_scanline:
+            scan_y = int((GameClock.get_ticks() * 0.1) % block_size)
+        key = ('ghost', self.current_theme.name, block_size, cell, scan_y)
+        cache = SIZE_CACHE.current
+        sprite = cache.get(key)
+        if sprite is None:
+            sprite = self._build_ghost_sprite(cell, block_size, scan_y)
+            cache[key] = sprite
+        return sprite
+
+    def _build_ghost_sprite(self, cell, block_size, scan_y):
+        """绘制一格主题化幽灵方块（按当前主题的幽灵方块风格）"""
+        renderer = self.theme_renderer
+        main_color, highlight, _ = renderer.block_colors[cell]
+        return renderer.build_ghost(self, block_size, main_color, highlight, scan_y)
+
+    def _build_ghost_neon_city(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：霓虹城市 - 全息投影风格"""
+        ghost_surface = SURFACES.create((block_size, block_size))
+        # 多层全息效果
+        for i in range(3):
+            holo_alpha = 15 - i * 4
+            offset = i * 2
+            pygame.draw.rect(ghost_surface, (*main_color, holo_alpha),
+                           (offset, offset, block_size - offset * 2, block_size - offset * 2))
 
-                    # 获取方块颜色
-                    main_color = self.current_theme.piece_colors[cell]
-                    highlight = self.current_theme.highlight_colors[cell]
-
-                    # ==================== 主题专属幽灵方块样式 ====================
+        # 扫描线效果
+        pygame.draw.rect(ghost_surface, (*highlight, 40),
+                       (0, scan_y, block_size, 2))
 
-                    if theme_name == "neon_city":
-                        # 🌆 霓虹城市 - 全息投影风格
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
-                        # 多层全息效果
-                        for i in range(3):
-                            holo_alpha = 15 - i * 4
-                            offset = i * 2
-                            pygame.draw.rect(ghost_surface, (*main_color, holo_alpha),
-                                           (offset, offset, block_size - offset * 2, block_size - offset * 2))
-
-                        # 扫描线效果
-                        scan_y = int((pygame.time.get_ticks() * 0.1) % block_size)
-                        pygame.draw.rect(ghost_surface, (*highlight, 40),
-                                       (0, scan_y, block_size, 2))
+        # 数字边框
+        pygame.draw.rect(ghost_surface, (*main_color, 80),
+                       (0, 0, block_size, block_size), 1)
 
-                        # 数字边框
-                        pygame.draw.rect(ghost_surface, (*main_color, 80),
-                                       (0, 0, block_size, block_size), 1)
+        # 虚线网格
+        for i in range(0, block_size, 4):
+            pygame.draw.line(ghost_surface, (*highlight, 30),
+                           (i, 0), (i, block_size), 1)
 
-                        # 虚线网格
-                        for i in range(0, block_size, 4):
-                            pygame.draw.line(ghost_surface, (*highlight, 30),
-                                           (i, 0), (i, block_size), 1)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_space_scifi(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：太空科幻 - 星云投影风格"""
+        ghost_surface = SURFACES.create((block_size, block_size))
+        # 柔和星云效果
+        pygame.draw.rect(ghost_surface, (*main_color, 35),
+                       (0, 0, block_size, block_size), border_radius=4)
 
-                    elif theme_name == "space_scifi":
-                        # 🚀 太空科幻 - 星云投影风格
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
-                        # 柔和星云效果
-                        pygame.draw.rect(ghost_surface, (*main_color, 35),
-                                       (0, 0, block_size, block_size), border_radius=4)
+        # 内层虚线
+        pygame.draw.rect(ghost_surface, (*highlight, 60),
+                       (3, 3, block_size - 6, block_size - 6), 1, border_radius=2)
 
-                        # 内层虚线
-                        pygame.draw.rect(ghost_surface, (*highlight, 60),
-                                       (3, 3, block_size - 6, block_size - 6), 1, border_radius=2)
+        # 星点装饰
+        if block_size > 15:
+            pygame.draw.circle(ghost_surface, (255, 255, 255, 100), (5, 5), 1)
+            pygame.draw.circle(ghost_surface, (255, 255, 255, 100),
+                             (block_size - 5, block_size - 5), 1)
 
-                        # 星点装饰
-                        if block_size > 15:
-                            pygame.draw.circle(ghost_surface, (255, 255, 255, 100), (5, 5), 1)
-                            pygame.draw.circle(ghost_surface, (255, 255, 255, 100),
-                                             (block_size - 5, block_size - 5), 1)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_retro_pixel(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：复古像素 - 通透风格"""
+        ghost_surface = SURFACES.create((block_size, block_size))
 
-                    elif theme_name == "retro_pixel":
-                        # 👾 复古像素 - 通透风格
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+        # 很淡的填充
+        ghost_surface.fill((*main_color, 50))
 
-                        # 很淡的填充
-                        ghost_surface.fill((*main_color, 50))
+        # 简单边框
+        pygame.draw.rect(ghost_surface, (*main_color, 100),
+                       (0, 0, block_size, block_size), 2)
 
-                        # 简单边框
-                        pygame.draw.rect(ghost_surface, (*main_color, 100),
-                                       (0, 0, block_size, block_size), 2)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_ocean_world(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：海洋世界 - 通透风格"""
+        ghost_surface = SURFACES.create((block_size, block_size))
 
-                    elif theme_name == "ocean_world":
-                        # 🌊 海洋世界 - 通透风格
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+        # 很淡的蓝色填充
+        ghost_surface.fill((*main_color, 50))
 
-                        # 很淡的蓝色填充
-                        ghost_surface.fill((*main_color, 50))
+        # 简单圆角边框
+        pygame.draw.rect(ghost_surface, (*main_color, 100),
+                       (0, 0, block_size, block_size), 2, border_radius=6)
 
-                        # 简单圆角边框
-                        pygame.draw.rect(ghost_surface, (*main_color, 100),
-                                       (0, 0, block_size, block_size), 2, border_radius=6)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_sunset_dusk(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：日落黄昏 - 完整版本"""
+        ghost_surface = SURFACES.create((block_size, block_size))
 
-                    elif theme_name == "sunset_dusk":
-                        # 🌅 日落黄昏 - 完整版本
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+        # 基础填充
+        ghost_surface.fill((*main_color, 80))
 
-                        # 基础填充
-                        ghost_surface.fill((*main_color, 80))
+        # 多层光晕效果
+        for i in range(3):
+            alpha = 20 - i * 5
+            offset = i * 2
+            pygame.draw.rect(ghost_surface, (*main_color, alpha),
+                           (offset, offset, block_size - offset * 2, block_size - offset * 2),
+                           border_radius=5)
 
-                        # 多层光晕效果
-                        for i in range(3):
-                            alpha = 20 - i * 5
-                            offset = i * 2
-                            pygame.draw.rect(ghost_surface, (*main_color, alpha),
-                                           (offset, offset, block_size - offset * 2, block_size - offset * 2),
-                                           border_radius=5)
+        # 边框
+        pygame.draw.rect(ghost_surface, (*main_color, 100),
+                       (0, 0, block_size, block_size), 2, border_radius=5)
 
-                        # 边框
-                        pygame.draw.rect(ghost_surface, (*main_color, 100),
-                                       (0, 0, block_size, block_size), 2, border_radius=5)
+        # 内部阴影渐变（使用不同的变量名避免冲突）
+        if block_size > 10:
+            for line_y in range(0, block_size - 8, 2):
+                ratio = line_y / (block_size - 8)
+                alpha = int(15 * (1 - ratio))
+                pygame.draw.line(ghost_surface, (*highlight, alpha),
+                               (4, line_y + 4), (block_size - 4, line_y + 4), 2)
 
-                        # 内部阴影渐变（使用不同的变量名避免冲突）
-                        if block_size > 10:
-                            for line_y in range(0, block_size - 8, 2):
-                                ratio = line_y / (block_size - 8)
-                                alpha = int(15 * (1 - ratio))
-                                pygame.draw.line(ghost_surface, (*highlight, alpha),
-                                               (4, line_y + 4), (block_size - 4, line_y + 4), 2)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_forest_mystic(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：森林秘境 - 通透风格"""
+        ghost_surface = SURFACES.create((block_size, block_size))
 
-                    elif theme_name == "forest_mystic":
-                        # 🌲 森林秘境 - 通透风格
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+        # 很淡的绿色填充
+        ghost_surface.fill((*main_color, 50))
 
-                        # 很淡的绿色填充
-                        ghost_surface.fill((*main_color, 50))
+        # 简单圆角边框
+        pygame.draw.rect(ghost_surface, (*main_color, 100),
+                       (0, 0, block_size, block_size), 2, border_radius=6)
 
-                        # 简单圆角边框
-                        pygame.draw.rect(ghost_surface, (*main_color, 100),
-                                       (0, 0, block_size, block_size), 2, border_radius=6)
+        return ghost_surface
 
-                        self.screen.blit(ghost_surface, rect.topleft)
+    def _build_ghost_default(self, block_size, main_color, highlight, scan_y):
+        """幽灵方块风格：默认幽灵方块样式"""
+        ghost_surface = SURFACES.create((block_size, block_size))
+        ghost_surface.fill((*main_color, 80))
+        # 白色边框
+        pygame.draw.rect(ghost_surface, (255, 255, 255, 150),
+                       (0, 0, block_size, block_size), 2)
 
-                    else:
-                        # 默认幽灵方块样式
-                        ghost_surface = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
-                        ghost_surface.fill((*main_color, 80))
-                        # 白色边框
-                        pygame.draw.rect(ghost_surface, (255, 255, 255, 150),
-                                       (0, 0, block_size, block_size), 2)
-                        self.screen.blit(ghost_surface, rect.topleft)
+        return ghost_surface
+
+    def draw_cached_panel(self, name):
+        """绘制弹出面板（遮罩+面板整体缓存，只有显示的数据或布局变化时才重绘）
+
+        Args:
+            name: 'statistics' / 'achievements' / 'settings' / 'keybind'
+        """
+        signature = (self.layout.key, SURFACES.generation, self._panel_signature(name))
+        cached = self._panel_cache.get(name)
+        if cached is None or cached[0] != signature:
+            surface = SURFACES.create((self.window_width, self.window_height))
+            # 临时把绘制目标换成缓存表面，复用原有的绘制代码
+            screen = self.screen
+            self.screen = surface
+            try:
+                getattr(self, f'draw_{name}_panel')()
+            finally:
+                self.screen = screen
+            cached = (signature, surface)
+            self._panel_cache[name] = cached
+        self.render_backend.draw_panel(cached[1])
+
+    def _panel_signature(self, name):
+        """面板显示内容的签名 - 签名不变则缓存的面板画面仍然有效"""
+        current_time = GameClock.get_ticks()
+        if name == 'statistics':
+            stats = self.statistics
+            return (stats.single_line_clears, stats.double_line_clears,
+                    stats.triple_line_clears, stats.tetris_clears,
+                    stats.highest_combo, stats.total_moves, stats.total_rotations,
+                    stats.highest_score, stats.total_score, stats.games_played)
+        if name == 'achievements':
+            return tuple(sorted(self.achievement.unlocked))
+        if name == 'settings':
+            sound = self.sound_manager
+            return (sound.enabled, sound.music_enabled, self.show_ghost, self.neon_mode,
+                    sound.music_volume, sound.sfx_volume,
+                    self.dragging_slider, self.theme_dropdown_opened, self.key_binding_mode,
+                    self.frame_pacer.describe(), self.next_count,
+                    current_time - self.reset_button_clicked < 200)
+        if name == 'keybind':
+            return (tuple(sorted(self.keybind_manager.bindings.items())), self.key_binding_mode,
+                    current_time - self.reset_keybind_button_clicked < 200)
+        return None
 
     def draw_statistics_panel(self):
         """绘制统计面板 - 方案A: 弹窗式"""
         scale = self.scale_factor
 
         # 半透明背景遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
+        overlay = SURFACES.create((self.window_width, self.window_height))
         overlay.fill((0, 0, 0, 180))
         self.screen.blit(overlay, (0, 0))
 
         # 面板尺寸
-        panel_width = int(420 * scale)
-        panel_height = int(520 * scale)
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
+        panel_rect = self.layout.rects['stats_panel']
+        panel_x, panel_y, panel_width, panel_height = panel_rect
 
         # 面板背景
-        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
         pygame.draw.rect(self.screen, (28, 28, 36), panel_rect, border_radius=int(12 * scale))
         pygame.draw.rect(self.screen, (0, 200, 255), panel_rect, 2, border_radius=int(12 * scale))
 
@@ -3106,14 +5648,9 @@ class Tetris:
         text_size = max(11, int(16 * scale))
         small_size = max(10, int(14 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            text_font = pygame.font.Font(self.font_path, text_size)
-            small_font = pygame.font.Font(self.font_path, small_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            text_font = pygame.font.Font(None, text_size)
-            small_font = pygame.font.Font(None, small_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        text_font = SIZE_CACHE.font(self.font_path, text_size)
+        small_font = SIZE_CACHE.font(self.font_path, small_size)
 
         # 标题
         title_text = title_font.render("📊 详细统计", True, (0, 200, 255))
@@ -3126,8 +5663,7 @@ class Tetris:
                         (panel_x + int(20 * scale), line_y),
                         (panel_x + panel_width - int(20 * scale), line_y), 2)
 
-        # 更新并格式化数据
-        total_time = self.statistics.get_total_game_time_with_session()
+        # 格式化数据（累计游戏时间每秒都在变，不画进缓存的面板，见 draw_statistics_time）
         total_lines = (self.statistics.single_line_clears +
                       self.statistics.double_line_clears * 2 +
                       self.statistics.triple_line_clears * 3 +
@@ -3135,7 +5671,7 @@ class Tetris:
         total_ops = self.statistics.total_moves + self.statistics.total_rotations
 
         stats_data = [
-            ("累计游戏时间", self.statistics.get_formatted_time(total_time), (100, 200, 255)),
+            ("累计游戏时间", None, (100, 200, 255)),
             ("总消除行数", str(total_lines), (150, 255, 150)),
             ("最高连击", f"{self.statistics.highest_combo}x", (255, 200, 100)),
             ("操作次数", str(total_ops), (200, 150, 255)),
@@ -3150,50 +5686,65 @@ class Tetris:
         ]
 
         # 绘制统计项
-        start_y = panel_y + int(70 * scale)
-        line_height = int(32 * scale)
-
         for i, (label, value, color) in enumerate(stats_data):
             if label == "":  # 分隔线
-                sep_y = start_y + i * line_height - int(5 * scale)
+                sep_y = self._statistics_row_y(i) - int(5 * scale)
                 pygame.draw.line(self.screen, (60, 60, 80),
                                 (panel_x + int(20 * scale), sep_y),
                                 (panel_x + panel_width - int(20 * scale), sep_y), 1)
                 continue
 
-            y = start_y + i * line_height
-
             # 标签
             label_text = text_font.render(label + ":", True, (200, 200, 220))
-            self.screen.blit(label_text, (panel_x + int(30 * scale), y))
+            self.screen.blit(label_text, (panel_x + int(30 * scale), self._statistics_row_y(i)))
 
             # 数值
-            value_text = text_font.render(value, True, color)
-            value_rect = value_text.get_rect(right=panel_x + panel_width - int(30 * scale), centery=y + int(6 * scale))
-            self.screen.blit(value_text, value_rect)
+            if value is not None:
+                self._draw_statistics_value(i, value, color)
 
         # 底部提示
         hint_text = small_font.render("按 Tab 关闭", True, (150, 150, 170))
         hint_rect = hint_text.get_rect(center=(self.window_width // 2, panel_y + panel_height - int(25 * scale)))
         self.screen.blit(hint_text, hint_rect)
 
+    def _statistics_row_y(self, row):
+        """统计面板第 row 行的纵坐标"""
+        scale = self.scale_factor
+        return self.layout.rects['stats_panel'].y + int(70 * scale) + row * int(32 * scale)
+
+    def _draw_statistics_value(self, row, value, color, opaque=False):
+        """在统计面板第 row 行右侧绘制数值（opaque=True 时先叠到面板底色上，画到透明的最上层也不发暗）"""
+        scale = self.scale_factor
+        font = SIZE_CACHE.font(self.font_path, max(11, int(16 * scale)))
+        value_text = font.render(value, True, color)
+        if opaque:
+            patch = SURFACES.create(value_text.get_size(), alpha=False)
+            patch.fill((28, 28, 36))
+            patch.blit(value_text, (0, 0))
+            value_text = patch
+        value_rect = value_text.get_rect(right=self.layout.rects['stats_panel'].right - int(30 * scale),
+                                         centery=self._statistics_row_y(row) + int(6 * scale))
+        self.screen.blit(value_text, value_rect)
+
+    def draw_statistics_time(self):
+        """统计面板的累计游戏时间（每帧画在最上层，面板本身的缓存不用每秒重建）"""
+        total_time = self.statistics.get_total_game_time_with_session()
+        self._draw_statistics_value(0, self.statistics.get_formatted_time(total_time), (100, 200, 255), opaque=True)
+
     def draw_achievements_panel(self):
         """绘制成就面板"""
         scale = self.scale_factor
 
         # 半透明背景遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
+        overlay = SURFACES.create((self.window_width, self.window_height))
         overlay.fill((0, 0, 0, 180))
         self.screen.blit(overlay, (0, 0))
 
         # 面板尺寸（更大以显示更多成就）
-        panel_width = int(500 * scale)
-        panel_height = int(580 * scale)
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
+        panel_rect = self.layout.rects['achievements_panel']
+        panel_x, panel_y, panel_width, panel_height = panel_rect
 
         # 面板背景
-        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
         pygame.draw.rect(self.screen, (28, 28, 36), panel_rect, border_radius=int(12 * scale))
         pygame.draw.rect(self.screen, (255, 215, 0), panel_rect, 2, border_radius=int(12 * scale))
 
@@ -3202,14 +5753,9 @@ class Tetris:
         text_size = max(11, int(15 * scale))
         small_size = max(10, int(13 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            text_font = pygame.font.Font(self.font_path, text_size)
-            small_font = pygame.font.Font(self.font_path, small_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            text_font = pygame.font.Font(None, text_size)
-            small_font = pygame.font.Font(None, small_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        text_font = SIZE_CACHE.font(self.font_path, text_size)
+        small_font = SIZE_CACHE.font(self.font_path, small_size)
 
         # 标题
         title_text = title_font.render("成就系统", True, (255, 215, 0))
@@ -3273,18 +5819,16 @@ class Tetris:
         scale = self.scale_factor
 
         # 半透明背景遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
+        overlay = SURFACES.create((self.window_width, self.window_height))
         overlay.fill((0, 0, 0, 200))
         self.screen.blit(overlay, (0, 0))
 
         # 面板尺寸（竖版，更紧凑）
-        panel_width = int(500 * scale)
-        panel_height = int(650 * scale)
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
+        layout = self.layout
+        panel_rect = layout.rects['settings_panel']
+        panel_x, panel_y, panel_width, panel_height = panel_rect
 
         # 面板背景
-        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
         pygame.draw.rect(self.screen, (28, 28, 36), panel_rect, border_radius=int(12 * scale))
         pygame.draw.rect(self.screen, (100, 100, 150), panel_rect, 3, border_radius=int(12 * scale))
 
@@ -3293,14 +5837,9 @@ class Tetris:
         text_size = max(11, int(16 * scale))
         small_size = max(10, int(14 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            text_font = pygame.font.Font(self.font_path, text_size)
-            small_font = pygame.font.Font(self.font_path, small_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            text_font = pygame.font.Font(None, text_size)
-            small_font = pygame.font.Font(None, small_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        text_font = SIZE_CACHE.font(self.font_path, text_size)
+        small_font = SIZE_CACHE.font(self.font_path, small_size)
 
         # 标题
         title_text = title_font.render("设置", True, (150, 150, 255))
@@ -3314,72 +5853,56 @@ class Tetris:
                         (panel_x + panel_width - int(20 * scale), line_y), 2)
 
         # 竖版布局：两列
-        col_width = (panel_width - int(60 * scale)) // 2
-        col1_x = panel_x + int(20 * scale)
-        col2_x = panel_x + int(20 * scale) + col_width + int(20 * scale)
-        start_y = panel_y + int(80 * scale)
-        item_height = int(70 * scale)
-
         # 左列：开关设置
         # 音效开关
-        self._draw_setting_item_vertical(col1_x, start_y, col_width, int(60 * scale),
+        self._draw_setting_item_vertical(*layout.rects['settings_sound'],
                                        "音效", "开启/关闭游戏音效",
                                        self.sound_manager.enabled, text_font, small_font, scale)
 
         # 背景音乐开关
-        music_y = start_y + item_height
-        self._draw_setting_item_vertical(col1_x, music_y, col_width, int(60 * scale),
+        self._draw_setting_item_vertical(*layout.rects['settings_music'],
                                        "背景音乐", "开启/关闭背景音乐",
                                        self.sound_manager.music_enabled, text_font, small_font, scale)
 
         # 幽灵方块开关
-        ghost_y = music_y + item_height
-        self._draw_setting_item_vertical(col1_x, ghost_y, col_width, int(60 * scale),
+        self._draw_setting_item_vertical(*layout.rects['settings_ghost'],
                                        "幽灵方块", "显示方块落地预览",
                                        self.show_ghost, text_font, small_font, scale)
 
         # 霓虹模式开关
-        neon_y = ghost_y + item_height
-        self._draw_setting_item_vertical(col1_x, neon_y, col_width, int(60 * scale),
+        self._draw_setting_item_vertical(*layout.rects['settings_neon'],
                                        "霓虹模式", "炫酷霓虹发光效果",
                                        self.neon_mode, text_font, small_font, scale)
 
-        # 右列：音量控制和主题选择
-        col2_start_y = start_y
-        item_spacing = int(10 * scale)  # 统一间距
+        # 帧率模式（点击切换）
+        self._draw_setting_value_vertical(*layout.rects['settings_pacing'],
+                                        "帧率", "点击切换限帧/垂直同步",
+                                        self.frame_pacer.describe(), text_font, small_font, scale)
+
+        # 预览方块数量（点击切换）
+        self._draw_setting_value_vertical(*layout.rects['settings_next'],
+                                        "预览", "点击切换预览方块数量",
+                                        f"{self.next_count} 个", text_font, small_font, scale)
 
+        # 右列：音量控制和主题选择
         # 音乐音量滑块
-        music_vol_y = col2_start_y
-        music_vol_height = int(80 * scale)
-        self._draw_volume_slider_vertical(col2_x, music_vol_y, col_width, music_vol_height,
+        self._draw_volume_slider_vertical(layout.rects['music_volume'], layout.rects['music_volume_track'],
                                          "音乐音量", "music", self.sound_manager.music_volume,
                                          text_font, small_font, scale)
 
         # 音效音量滑块
-        sfx_vol_y = music_vol_y + music_vol_height + item_spacing
-        sfx_vol_height = int(80 * scale)
-        self._draw_volume_slider_vertical(col2_x, sfx_vol_y, col_width, sfx_vol_height,
+        self._draw_volume_slider_vertical(layout.rects['sfx_volume'], layout.rects['sfx_volume_track'],
                                          "音效音量", "sfx", self.sound_manager.sfx_volume,
                                          text_font, small_font, scale)
 
         # 🎨 主题下拉框（与音量滑块对齐）
-        theme_dropdown_y = sfx_vol_y + sfx_vol_height + item_spacing
-        theme_dropdown_height = int(60 * scale)
-        self._draw_theme_dropdown(col2_x, theme_dropdown_y, col_width, theme_dropdown_height,
-                                   text_font, small_font, scale)
+        self._draw_theme_dropdown(*layout.rects['theme_dropdown'], text_font, small_font, scale)
 
         # 恢复所有数据按钮（在底部提示文字上方1cm处）
-        # 1cm ≈ 37-38像素，使用int(38 * scale)
-        hint_y = panel_y + panel_height - int(35 * scale)
-        reset_button_y = hint_y - int(45 * scale) - int(38 * scale)  # 按钮高度45 + 间距38
-        reset_button_width = panel_width - int(40 * scale)
-        reset_button_height = int(45 * scale)
-        reset_button_x = panel_x + int(20 * scale)
-
-        reset_button_rect = pygame.Rect(reset_button_x, reset_button_y, reset_button_width, reset_button_height)
+        reset_button_rect = layout.rects['settings_reset']
 
         # 点击反馈效果
-        current_time = pygame.time.get_ticks()
+        current_time = GameClock.get_ticks()
         is_clicked = current_time - self.reset_button_clicked < 200  # 200ms动画
         if is_clicked:
             # 点击时的颜色（更亮）
@@ -3391,11 +5914,10 @@ class Tetris:
 
         # 按钮文字
         reset_button_text = text_font.render("恢复所有数据到出厂设置", True, (255, 255, 255))
-        reset_button_text_rect = reset_button_text.get_rect(center=(reset_button_x + reset_button_width // 2, reset_button_y + reset_button_height // 2))
+        reset_button_text_rect = reset_button_text.get_rect(center=reset_button_rect.center)
         self.screen.blit(reset_button_text, reset_button_text_rect)
 
         # 底部提示
-        hint_y = panel_y + panel_height - int(35 * scale)
 
         if self.key_binding_mode:
             hint_text = small_font.render("按下要绑定的按键... (按 Esc 取消)", True, (255, 255, 100))
@@ -3404,7 +5926,7 @@ class Tetris:
         else:
             hint_text = small_font.render("点击设置切换 | 拖动滑块 | 点击主题切换 | 按 K 键位 | Esc 关闭", True, (150, 150, 170))
 
-        hint_rect = hint_text.get_rect(center=(self.window_width // 2, hint_y))
+        hint_rect = hint_text.get_rect(center=layout.points['settings_hint'])
         self.screen.blit(hint_text, hint_rect)
 
     def _draw_setting_item_vertical(self, x, y, width, height, title, desc, enabled, font, small_font, scale):
@@ -3440,10 +5962,28 @@ class Tetris:
         circle_y = switch_y + switch_height // 2
         pygame.draw.circle(self.screen, (255, 255, 255), (circle_x, circle_y), int(switch_height * 0.35))
 
-    def _draw_volume_slider_vertical(self, x, y, width, height, title, slider_type, volume, font, small_font, scale):
-        """绘制音量滑块（竖版，可拖动）"""
+    def _draw_setting_value_vertical(self, x, y, width, height, title, desc, value, font, small_font, scale):
+        """绘制单个设置项（竖版取值类型）- 文字左对齐，当前值右对齐"""
         # 背景卡片
         item_rect = pygame.Rect(x, y, width, height)
+        pygame.draw.rect(self.screen, (50, 60, 80), item_rect, border_radius=int(8 * scale))
+        pygame.draw.rect(self.screen, (80, 80, 100), item_rect, 2, border_radius=int(8 * scale))
+
+        # 标题和描述（左对齐）
+        title_surf = font.render(title, True, (255, 255, 255))
+        self.screen.blit(title_surf, (x + int(12 * scale), y + int(12 * scale)))
+        desc_surf = small_font.render(desc, True, (180, 180, 200))
+        self.screen.blit(desc_surf, (x + int(12 * scale), y + int(35 * scale)))
+
+        # 当前值（右上角，与标题同一水平线）
+        value_surf = small_font.render(value, True, (150, 200, 255))
+        value_rect = value_surf.get_rect(right=x + width - int(12 * scale), top=y + int(14 * scale))
+        self.screen.blit(value_surf, value_rect)
+
+    def _draw_volume_slider_vertical(self, item_rect, track_rect, title, slider_type, volume, font, small_font, scale):
+        """绘制音量滑块（竖版，可拖动）- 轨道位置由布局给出，与拖动检测一致"""
+        # 背景卡片
+        x, y, width, height = item_rect
         bg_color = (40, 40, 50)
         pygame.draw.rect(self.screen, bg_color, item_rect, border_radius=int(8 * scale))
         pygame.draw.rect(self.screen, (80, 80, 100), item_rect, 2, border_radius=int(8 * scale))
@@ -3458,12 +5998,7 @@ class Tetris:
         self.screen.blit(percent_text, percent_rect)
 
         # 滑块轨道（竖版，在底部）
-        slider_width = width - int(30 * scale)
-        slider_x = x + int(15 * scale)
-        slider_y_start = y + int(48 * scale)
-        slider_height = int(12 * scale)
-
-        track_rect = pygame.Rect(slider_x, slider_y_start, slider_width, slider_height)
+        slider_x, slider_y_start, slider_width, slider_height = track_rect
         pygame.draw.rect(self.screen, (60, 60, 70), track_rect, border_radius=int(slider_height // 2))
 
         # 已填充部分
@@ -3553,21 +6088,18 @@ class Tetris:
 
         # 如果下拉框展开，绘制下拉列表
         if self.theme_dropdown_opened:
-            dropdown_list_height = int(180 * scale)
-            dropdown_list_y = y + height
-
             # 下拉列表背景
-            list_rect = pygame.Rect(x, dropdown_list_y, width, dropdown_list_height)
+            list_rect = self.layout.rects['theme_list']
+            dropdown_list_y, dropdown_list_height = list_rect.y, list_rect.height
             # 半透明背景
-            s = pygame.Surface((width, dropdown_list_height), pygame.SRCALPHA)
+            s = SURFACES.create((width, dropdown_list_height))
             s.fill((30, 30, 40, 245))  # 带alpha的背景
             self.screen.blit(s, (x, dropdown_list_y))
             pygame.draw.rect(self.screen, (100, 100, 150), list_rect, 2, border_radius=int(8 * scale))
 
             # 绘制主题列表
-            item_height = int(28 * scale)
-            for i, theme in enumerate(THEMES):
-                item_y = dropdown_list_y + int(5 * scale) + i * item_height
+            for theme, row_rect in zip(THEMES, self.layout.theme_rows):
+                item_y, item_height = row_rect.y, row_rect.height
 
                 # 检查是否是当前主题
                 is_current = (theme == self.current_theme)
@@ -3627,18 +6159,16 @@ class Tetris:
         scale = self.scale_factor
 
         # 半透明背景遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
+        overlay = SURFACES.create((self.window_width, self.window_height))
         overlay.fill((0, 0, 0, 200))
         self.screen.blit(overlay, (0, 0))
 
         # 面板尺寸（增加高度以容纳按钮）
-        panel_width = int(550 * scale)
-        panel_height = int(650 * scale)  # 从580增加到650
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
+        layout = self.layout
+        panel_rect = layout.rects['keybind_panel']
+        panel_x, panel_y, panel_width, panel_height = panel_rect
 
         # 面板背景
-        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
         pygame.draw.rect(self.screen, (28, 28, 36), panel_rect, border_radius=int(12 * scale))
         pygame.draw.rect(self.screen, (255, 215, 0), panel_rect, 2, border_radius=int(12 * scale))
 
@@ -3647,14 +6177,9 @@ class Tetris:
         text_size = max(11, int(15 * scale))
         small_size = max(10, int(13 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            text_font = pygame.font.Font(self.font_path, text_size)
-            small_font = pygame.font.Font(self.font_path, small_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            text_font = pygame.font.Font(None, text_size)
-            small_font = pygame.font.Font(None, small_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        text_font = SIZE_CACHE.font(self.font_path, text_size)
+        small_font = SIZE_CACHE.font(self.font_path, small_size)
 
         # 标题
         title_text = title_font.render("键位绑定", True, (255, 215, 0))
@@ -3668,21 +6193,8 @@ class Tetris:
                         (panel_x + panel_width - int(20 * scale), line_y), 2)
 
         # 键位列表（分两列）
-        start_y = panel_y + int(80 * scale)
-        item_height = int(42 * scale)
-        col_width = (panel_width - int(60 * scale)) // 2
-        col1_x = panel_x + int(20 * scale)
-        col2_x = panel_x + int(20 * scale) + col_width + int(20 * scale)
-
-        actions = ['left', 'right', 'rotate', 'soft_drop', 'hard_drop',
-                  'pause', 'neon', 'mute', 'restart', 'stats', 'achievements']
-
-        for i, action in enumerate(actions):
-            col = i % 2
-            row = i // 2
-
-            x = col1_x if col == 0 else col2_x
-            y = start_y + row * item_height
+        for action, item_rect in layout.keybind_items:
+            x, y, col_width = item_rect.x, item_rect.y, item_rect.width
 
             # 获取动作名称和当前键位
             action_name = self.keybind_manager.ACTION_NAMES.get(action, action)
@@ -3694,7 +6206,6 @@ class Tetris:
             border_color = (255, 215, 0) if is_binding else (80, 80, 100)
 
             # 背景卡片
-            item_rect = pygame.Rect(x, y, col_width, int(38 * scale))
             pygame.draw.rect(self.screen, bg_color, item_rect, border_radius=int(6 * scale))
             pygame.draw.rect(self.screen, border_color, item_rect, 2 if is_binding else 1, border_radius=int(6 * scale))
 
@@ -3710,15 +6221,10 @@ class Tetris:
             self.screen.blit(key_text, key_rect)
 
         # 恢复默认键位按钮（往下移动防止重叠）
-        button_y = start_y + len(actions) // 2 * item_height + int(80 * scale)  # 从20增加到80
-        button_width = panel_width - int(40 * scale)
-        button_height = int(45 * scale)
-        button_x = panel_x + int(20 * scale)
-
-        button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
+        button_rect = layout.rects['keybind_reset']
 
         # 点击反馈效果
-        current_time = pygame.time.get_ticks()
+        current_time = GameClock.get_ticks()
         is_clicked = current_time - self.reset_keybind_button_clicked < 200  # 200ms动画
         if is_clicked:
             # 点击时的颜色（更亮）
@@ -3730,45 +6236,37 @@ class Tetris:
 
         # 按钮文字
         button_text = text_font.render("恢复默认键位", True, (255, 255, 255))
-        button_text_rect = button_text.get_rect(center=(button_x + button_width // 2, button_y + button_height // 2))
+        button_text_rect = button_text.get_rect(center=button_rect.center)
         self.screen.blit(button_text, button_text_rect)
 
         # 底部提示
-        hint_y = panel_y + panel_height - int(30 * scale)
 
         if self.key_binding_mode:
             hint_text = small_font.render("按下要绑定的按键... (按 Esc 取消)", True, (255, 255, 100))
         else:
             hint_text = small_font.render("点击键位进行修改 | 点击按钮恢复默认 | 按 Esc 返回设置", True, (150, 150, 170))
 
-        hint_rect = hint_text.get_rect(center=(self.window_width // 2, hint_y))
+        hint_rect = hint_text.get_rect(center=layout.points['keybind_hint'])
         self.screen.blit(hint_text, hint_rect)
 
     def handle_settings_click(self, pos):
-        """处理设置菜单的点击事件（竖版布局）"""
-        scale = self.scale_factor
-        panel_width = int(500 * scale)
-        panel_height = int(650 * scale)
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
-
-        # 竖版布局：两列
-        col_width = (panel_width - int(60 * scale)) // 2
-        col1_x = panel_x + int(20 * scale)
-        col2_x = panel_x + int(20 * scale) + col_width + int(20 * scale)
-        start_y = panel_y + int(80 * scale)
-        item_height = int(70 * scale)
+        """处理设置菜单的点击事件（竖版布局）- 区域来自共享布局"""
+        layout = self.layout
+        # 下拉列表展开时优先检测列表项
+        if self.theme_dropdown_opened:
+            hit = layout.hit_test(pos, 'theme_list', 'settings')
+        else:
+            hit = layout.hit_test(pos, 'settings')
 
         # 左列：开关设置
         # 音效开关
-        if self._is_in_rect(pos, col1_x, start_y, col_width, int(60 * scale)):
+        if hit == 'settings_sound':
             self.sound_manager.enabled = not self.sound_manager.enabled
             self.settings_manager.set('sound_enabled', self.sound_manager.enabled)
             return
 
         # 背景音乐开关
-        music_y = start_y + item_height
-        if self._is_in_rect(pos, col1_x, music_y, col_width, int(60 * scale)):
+        if hit == 'settings_music':
             if self.sound_manager.toggle_music():
                 self.settings_manager.set('music_enabled', True)
             else:
@@ -3776,97 +6274,57 @@ class Tetris:
             return
 
         # 幽灵方块开关
-        ghost_y = music_y + item_height
-        if self._is_in_rect(pos, col1_x, ghost_y, col_width, int(60 * scale)):
+        if hit == 'settings_ghost':
             self.show_ghost = not self.show_ghost
             self.settings_manager.set('show_ghost', self.show_ghost)
             return
 
         # 霓虹模式开关
-        neon_y = ghost_y + item_height
-        if self._is_in_rect(pos, col1_x, neon_y, col_width, int(60 * scale)):
+        if hit == 'settings_neon':
             self.neon_mode = not self.neon_mode
             self.settings_manager.set('neon_mode', self.neon_mode)
             return
 
-        # 右列：音量控制和主题选择
-        col2_start_y = start_y
-        item_spacing = int(10 * scale)  # 统一间距
+        # 帧率模式：切换到下一个预设
+        if hit == 'settings_pacing':
+            self.apply_frame_pacing(*self.frame_pacer.next_preset())
+            self.sound_manager.play('rotate')
+            return
 
-        # 音乐音量滑块
-        music_vol_y = col2_start_y
-        music_vol_height = int(80 * scale)
-        music_slider_x = col2_x + int(15 * scale)
-        music_slider_track_x = music_slider_x
-        music_slider_track_width = col_width - int(30 * scale)
-        music_slider_track_y = music_vol_y + int(48 * scale)
-        music_slider_track_height = int(12 * scale)
-
-        # 检测是否点击音乐音量滑块区域（扩大点击范围）
-        if self._is_in_rect(pos, col2_x, music_vol_y, col_width, music_vol_height):
-            self.dragging_slider = 'music'
-            # 更新音量到点击位置
-            self._update_slider_volume(pos, music_slider_track_x, music_slider_track_y,
-                                      music_slider_track_width, 'music')
+        # 预览数量：1 -> 2 -> ... -> MAX_NEXT_COUNT -> 1
+        if hit == 'settings_next':
+            self.set_next_count(self.next_count % self.MAX_NEXT_COUNT + 1)
+            self.sound_manager.play('rotate')
             return
 
-        # 音效音量滑块
-        sfx_vol_y = music_vol_y + music_vol_height + item_spacing
-        sfx_vol_height = int(80 * scale)
-        sfx_slider_track_x = col2_x + int(15 * scale)
-        sfx_slider_track_width = col_width - int(30 * scale)
-        sfx_slider_track_y = sfx_vol_y + int(48 * scale)
-
-        # 检测是否点击音效音量滑块区域
-        if self._is_in_rect(pos, col2_x, sfx_vol_y, col_width, sfx_vol_height):
-            self.dragging_slider = 'sfx'
+        # 右列：音量滑块（点击卡片任意位置即可，音量跟随鼠标横坐标）
+        if hit in ('music_volume', 'sfx_volume'):
+            slider_type = hit.split('_')[0]
+            track = layout.rects[hit + '_track']
+            self.dragging_slider = slider_type
             # 更新音量到点击位置
-            self._update_slider_volume(pos, sfx_slider_track_x, sfx_slider_track_y,
-                                      sfx_slider_track_width, 'sfx')
+            self._update_slider_volume(pos, track.x, track.y, track.width, slider_type)
             return
 
-        # 🎨 主题下拉框点击检测
-        theme_dropdown_y = sfx_vol_y + sfx_vol_height + item_spacing
-        theme_dropdown_height = int(60 * scale)
-
-        # 检查是否点击了下拉框按钮或展开的列表
-        dropdown_list_height = int(180 * scale) if self.theme_dropdown_opened else 0
-
-        # 检查是否点击了下拉框区域
-        if self._is_in_rect(pos, col2_x, theme_dropdown_y, col_width, theme_dropdown_height + dropdown_list_height):
-            # 如果下拉列表是展开的
-            if self.theme_dropdown_opened:
-                # 计算点击了哪个主题
-                item_height = int(28 * scale)
-                list_start_y = theme_dropdown_y + theme_dropdown_height + int(5 * scale)
-
-                relative_y = pos[1] - list_start_y
-
-                for i, theme in enumerate(THEMES):
-                    theme_y = i * item_height
-                    if theme_y <= relative_y < theme_y + item_height:
-                        # 点击了这个主题，切换到它
-                        if theme != self.current_theme:  # 只切换到不同的主题
-                            self.current_theme = theme
-                            # 重新生成背景音乐
-                            self.sound_manager.generate_background_music(self.current_theme)
-                            # 如果音乐已启用，重新播放音乐
-                            if self.sound_manager.music_enabled:
-                                self.sound_manager.play_music()
-                            # 更新AnimationManager的主题
-                            self.animation_manager.theme = self.current_theme
-                            # 播放确认音效
-                            self.sound_manager.play('rotate')
-
-                        # 选择后关闭下拉框
-                        self.theme_dropdown_opened = False
-                        return
+        # 🎨 主题下拉框：点击了某个主题
+        if isinstance(hit, tuple) and hit[0] == 'theme_row':
+            theme = THEMES[hit[1]]
+            if theme != self.current_theme:  # 只切换到不同的主题
+                # 切换主题（音乐在后台合成，不卡住界面）
+                self.switch_theme(theme)
+                # 如果音乐已启用，重新播放音乐（还在合成时，合成好后自动开始）
+                if self.sound_manager.music_enabled:
+                    self.sound_manager.play_music()
+                # 播放确认音效
+                self.sound_manager.play('rotate')
+
+            # 选择后关闭下拉框
+            self.theme_dropdown_opened = False
+            return
 
-                # 如果点击了下拉列表但没有点到任何主题，关闭下拉框
-                self.theme_dropdown_opened = False
-            else:
-                # 下拉框未展开，点击展开
-                self.theme_dropdown_opened = True
+        # 点击下拉框按钮或列表空白处：切换展开状态
+        if hit in ('theme_dropdown', 'theme_list'):
+            self.theme_dropdown_opened = not self.theme_dropdown_opened
             return
 
         # 点击设置面板的其他地方时，关闭下拉框
@@ -3874,19 +6332,23 @@ class Tetris:
             self.theme_dropdown_opened = False
 
         # 检测是否点击恢复所有数据按钮
-        # 恢复按钮在底部提示文字上方1cm处
-        hint_y = panel_y + panel_height - int(35 * scale)
-        reset_button_y = hint_y - int(45 * scale) - int(38 * scale)
-        reset_button_width = panel_width - int(40 * scale)
-        reset_button_height = int(45 * scale)
-        reset_button_x = panel_x + int(20 * scale)
-
-        if self._is_in_rect(pos, reset_button_x, reset_button_y, reset_button_width, reset_button_height):
+        if hit == 'settings_reset':
             self.reset_all_data()
-            self.reset_button_clicked = pygame.time.get_ticks()  # 触发点击动画
+            self.reset_button_clicked = GameClock.get_ticks()  # 触发点击动画
             self.sound_manager.play('drop')  # 播放音效
             return
 
+    def apply_frame_pacing(self, mode, target_fps, save=True):
+        """切换帧节奏模式（垂直同步开关变化时重新创建窗口表面）"""
+        if self.frame_pacer.configure(mode, target_fps):
+            with self.render_lock:
+                self.screen = self.render_backend.create_display(self.display_size,
+                                                                 (self.window_width, self.window_height))
+        HITCHES.set_budget(self.frame_pacer.target_fps)
+        if save:
+            self.settings_manager.set('frame_pacing', self.frame_pacer.mode)
+            self.settings_manager.set('target_fps', self.frame_pacer.target_fps)
+
     def _update_slider_volume(self, mouse_pos, slider_x, slider_y, slider_width, slider_type):
         """根据鼠标位置更新音量"""
         # 计算鼠标在滑块上的相对位置
@@ -3905,48 +6367,19 @@ class Tetris:
 
     def handle_keybind_click(self, pos):
         """处理键位绑定面板的点击事件"""
-        scale = self.scale_factor
-        panel_width = int(550 * scale)
-        panel_height = int(650 * scale)
-        panel_x = (self.window_width - panel_width) // 2
-        panel_y = (self.window_height - panel_height) // 2
-
-        start_y = panel_y + int(80 * scale)
-        item_height = int(42 * scale)
-        col_width = (panel_width - int(60 * scale)) // 2
-        col1_x = panel_x + int(20 * scale)
-        col2_x = panel_x + int(20 * scale) + col_width + int(20 * scale)
-
-        actions = ['left', 'right', 'rotate', 'soft_drop', 'hard_drop',
-                  'pause', 'neon', 'mute', 'restart', 'stats', 'achievements']
+        hit = self.layout.hit_test(pos, 'keybind')
 
-        for i, action in enumerate(actions):
-            col = i % 2
-            row = i // 2
-
-            x = col1_x if col == 0 else col2_x
-            y = start_y + row * item_height
-
-            if self._is_in_rect(pos, x, y, col_width, int(38 * scale)):
-                self.key_binding_mode = action
-                return
+        if isinstance(hit, tuple) and hit[0] == 'keybind':
+            self.key_binding_mode = hit[1]
+            return
 
         # 检测是否点击恢复默认按钮
-        button_y = start_y + len(actions) // 2 * item_height + int(80 * scale)  # 与绘制位置一致
-        button_width = panel_width - int(40 * scale)
-        button_height = int(45 * scale)
-        button_x = panel_x + int(20 * scale)
-
-        if self._is_in_rect(pos, button_x, button_y, button_width, button_height):
+        if hit == 'keybind_reset':
             self.keybind_manager.reset_to_defaults()
-            self.reset_keybind_button_clicked = pygame.time.get_ticks()  # 触发点击动画
+            self.reset_keybind_button_clicked = GameClock.get_ticks()  # 触发点击动画
             self.sound_manager.play('drop')  # 播放音效
             return
 
-    def _is_in_rect(self, pos, x, y, width, height):
-        """检查位置是否在矩形内"""
-        return x <= pos[0] <= x + width and y <= pos[1] <= y + height
-
     def reset_all_data(self):
         """恢复所有游戏数据到出厂设置"""
         import os
@@ -3981,6 +6414,8 @@ class Tetris:
         self.sound_manager.music_enabled = self.settings_manager.get('music_enabled', True)
         self.show_ghost = self.settings_manager.get('show_ghost', True)
         self.neon_mode = True  # 恢复出厂设置时开启霓虹模式
+        self.apply_frame_pacing(self.settings_manager.get('frame_pacing', 'capped'),
+                                self.settings_manager.get('target_fps', 60), save=False)
 
         # 重置当前游戏状态
         self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
@@ -3993,11 +6428,7 @@ class Tetris:
         self.countdown = 3
         self.countdown_timer = 0
         self.countdown_active = False
-        self.piece_bag = []
-        self.current_piece = self.create_piece()
-        self.next_piece = self.create_piece()
-        self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
-        self.current_y = 0
+        self.reset_piece_queue()
         self.fall_time = 0
         self.fall_speed = 500
         self.combo_count = 0
@@ -4008,38 +6439,40 @@ class Tetris:
         self.first_piece_placed = False
 
     def draw_next_piece(self):
-        """绘制下一个方块预览 - 支持缩放"""
+        """绘制预览卡片 - 整张卡片预渲染缓存，只有队列前进、主题或缩放变化时才重绘"""
+        signature = (self.layout.key, SURFACES.generation, self.neon_mode,
+                     self._queue_version, self.next_count)
+        cached = self._next_preview
+        if cached is None or cached[0] != signature:
+            if cached is not None:
+                self.render_backend.release_sprite(cached[1])
+            # 四周留出方块发光的边距
+            pad = GLOW_PAD
+            card_rect = self.layout.rects['next_card']
+            origin = (card_rect.x - pad, card_rect.y - pad)
+
+            def draw():
+                # 临时平移布局坐标，复用按屏幕坐标绘制的代码
+                self._draw_next_card(-origin[0], -origin[1])
+
+            surface = self.prerender((card_rect.width + pad * 2, card_rect.height + pad * 2), draw)
+            cached = self._next_preview = (signature, surface, origin)
+        self.render_backend.draw_sprite(cached[1], cached[2])
+
+    def _draw_next_card(self, offset_x=0, offset_y=0):
+        """绘制预览卡片：下一个方块正常大小，其余按小格排在右侧"""
         scale = self.scale_factor
 
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-
-        preview_x = int(grid_x + GRID_WIDTH * block_size + 25 * scale)
-        preview_y = int(grid_y + 35 * scale)  # 调整为35，使卡片顶端与网格对齐
-
         # 动态调整字体大小
         font_size = max(12, int(20 * scale))
-        if self.font_path:
-            dynamic_font = pygame.font.Font(self.font_path, font_size)
-        else:
-            dynamic_font = pygame.font.Font(None, font_size)
+        dynamic_font = SIZE_CACHE.font(self.font_path, font_size)
 
         # 预览方块（增大）
-        preview_block_size = int(block_size * 0.9)
-
-        # 绘制预览方框（包含"下一个:"文字）
-        box_size = preview_block_size * 4
-        # 与下面的卡片对齐：使用相同的x位置和宽度
-        info_x = int(grid_x + GRID_WIDTH * block_size + 20 * scale)
-        card_width = int(190 * scale)
-        card_x = info_x - 6
-        card_y = preview_y - int(35 * scale)
-        card_height = box_size + int(25 * scale)  # 缩小高度到25
-
-        # 计算下一个卡片底部位置，用于对齐
-        next_card_bottom = card_y + card_height
+        preview_block_size = self.layout.preview_block_size
 
-        card_rect = pygame.Rect(card_x, card_y, card_width, card_height)
+        # 绘制预览方框（包含"下一个:"文字），与下面的卡片对齐
+        card_rect = self.layout.rects['next_card'].move(offset_x, offset_y)
+        card_x, card_y, card_width, card_height = card_rect
         pygame.draw.rect(self.screen, (28, 28, 36), card_rect, border_radius=int(6 * scale))
         pygame.draw.rect(self.screen, (80, 80, 100), card_rect, 2, border_radius=int(6 * scale))
 
@@ -4070,21 +6503,29 @@ class Tetris:
                     )
                     self.draw_3d_block(rect, cell)
 
+        # 后续方块：每个居中画在一个小格里
+        for piece, cell_rect in zip(self.next_queue[1:self.next_count], self.layout.next_queue_cells):
+            cell_rect = cell_rect.move(offset_x, offset_y)
+            mini = max(3, min(cell_rect.width // 4, cell_rect.height // 2))
+            piece_x = cell_rect.centerx - len(piece[0]) * mini // 2
+            piece_y = cell_rect.centery - len(piece) * mini // 2
+            for y, row in enumerate(piece):
+                for x, cell in enumerate(row):
+                    if cell != 0:
+                        self.draw_3d_block(pygame.Rect(piece_x + x * mini, piece_y + y * mini, mini, mini), cell)
+
     def draw_info(self):
+        """绘制游戏信息卡片"""
+        self.draw_hud_card('info')
+
+    def _draw_info_card(self, offset_x=0, offset_y=0):
         """绘制游戏信息 - 支持缩放"""
         scale = self.scale_factor
 
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-
-        info_x = int(grid_x + GRID_WIDTH * block_size + 20 * scale)
-        info_y = int(grid_y + 121 * scale)  # 向上移动7像素，从128改为121
-
-        # 缩放卡片大小
-        card_width = int(190 * scale)
-        card_height = int(140 * scale)
-
-        card_rect = pygame.Rect(info_x - 6, info_y - 6, card_width, card_height)
+        info_x, info_y = self.layout.points['info']
+        info_x, info_y = info_x + offset_x, info_y + offset_y
+        card_rect = self.layout.rects['info_card'].move(offset_x, offset_y)
+        card_width = card_rect.width
         pygame.draw.rect(self.screen, (28, 28, 36), card_rect, border_radius=int(6 * scale))
         pygame.draw.rect(self.screen, (60, 60, 80), card_rect, 2, border_radius=int(6 * scale))
 
@@ -4092,11 +6533,8 @@ class Tetris:
         base_font_size = max(11, int(18 * scale))
         large_font_size = max(14, int(24 * scale))
 
-        if self.font_path:
-            font = pygame.font.Font(self.font_path, base_font_size)
-        else:
-            font = pygame.font.Font(None, base_font_size)
-        large_font = pygame.font.Font(None, large_font_size)
+        font = SIZE_CACHE.font(self.font_path, base_font_size)
+        large_font = SIZE_CACHE.font(None, large_font_size)
 
         # 标题
         title_text = font.render("游戏状态", True, (200, 200, 220))
@@ -4148,29 +6586,23 @@ class Tetris:
         self.screen.blit(sound_text, (info_x + int(90 * scale), status_y))
 
     def draw_leaderboard(self):
+        """绘制排行榜卡片"""
+        self.draw_hud_card('leaderboard')
+
+    def _draw_leaderboard_card(self, offset_x=0, offset_y=0):
         """绘制排行榜 - 支持缩放"""
         scale = self.scale_factor
 
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-
-        leaderboard_x = int(grid_x + GRID_WIDTH * block_size + 20 * scale)
-        leaderboard_y = int(grid_y + 269 * scale)  # 向上移动7像素，从276改为269
-
-        # 缩放卡片大小
-        card_width = int(190 * scale)
-        card_height = int(130 * scale)
-
-        card_rect = pygame.Rect(leaderboard_x - 6, leaderboard_y - 6, card_width, card_height)
+        leaderboard_x, leaderboard_y = self.layout.points['leaderboard']
+        leaderboard_x, leaderboard_y = leaderboard_x + offset_x, leaderboard_y + offset_y
+        card_rect = self.layout.rects['leaderboard_card'].move(offset_x, offset_y)
+        card_width = card_rect.width
         pygame.draw.rect(self.screen, (28, 28, 36), card_rect, border_radius=int(6 * scale))
         pygame.draw.rect(self.screen, (255, 215, 0), card_rect, 2, border_radius=int(6 * scale))
 
         # 动态字体
         font_size = max(11, int(16 * scale))
-        if self.font_path:
-            font = pygame.font.Font(self.font_path, font_size)
-        else:
-            font = pygame.font.Font(None, font_size)
+        font = SIZE_CACHE.font(self.font_path, font_size)
 
         # 标题（金色）
         title_text = font.render("排行榜 TOP5", True, (255, 215, 0))
@@ -4216,32 +6648,86 @@ class Tetris:
             no_record = font.render("暂无记录", True, TEXT_GRAY)
             self.screen.blit(no_record, (leaderboard_x + int(70 * scale), leaderboard_y + int(55 * scale)))
 
+    def draw_hud_card(self, name):
+        """绘制右侧信息卡片（整张卡片缓存，只有显示的数值、缩放或主题变化时才重绘）
+
+        Args:
+            name: 'info' / 'leaderboard' / 'controls'
+        """
+        signature = (self.layout.key, SURFACES.generation, self._hud_signature(name))
+        cached = self._hud_cache.get(name)
+        if cached is None or cached[0] != signature:
+            if cached is not None:
+                self.render_backend.release_sprite(cached[1])
+            card_rect = self.layout.rects[f'{name}_card']
+            # 圆角外是透明的，卡片叠在背景上
+            surface = SURFACES.create(card_rect.size)
+            screen = self.screen
+            self.screen = surface
+            try:
+                getattr(self, f'_draw_{name}_card')(-card_rect.x, -card_rect.y)
+            finally:
+                self.screen = screen
+            cached = (signature, surface, card_rect.topleft)
+            self._hud_cache[name] = cached
+        self.render_backend.draw_sprite(cached[1], cached[2])
+
+    def _hud_signature(self, name):
+        """信息卡片显示内容的签名 - 签名不变则缓存的卡片仍然有效"""
+        if name == 'info':
+            return (self.score, self.level, self.lines_cleared, self.combo_count,
+                    self.neon_mode, self.sound_manager.enabled)
+        if name == 'leaderboard':
+            return tuple((entry['level'], entry['score']) for entry in self.leaderboard.get_top_scores(5))
+        if name == 'controls':
+            return tuple(sorted(self.keybind_manager.bindings.items()))
+
+    def draw_cached_overlay(self, name, *state):
+        """绘制整窗提示画面（遮罩+文字整体缓存，按状态/缩放/主题签名，只有签名变化时才重绘）
+
+        Args:
+            name: 'game_over' / 'waiting' / 'countdown' / 'pause'
+            state: 影响画面内容的状态值（倒计时数字、最终分数等）
+        """
+        signature = (self.layout.key, SURFACES.generation, state)
+        cached = self._overlay_cache.get(name)
+        if cached is None or cached[0] != signature:
+            surface = SURFACES.create((self.window_width, self.window_height))
+            # 与弹出面板相同：临时把绘制目标换成缓存表面
+            screen = self.screen
+            self.screen = surface
+            try:
+                getattr(self, f'draw_{name}_overlay')(*state)
+            finally:
+                self.screen = screen
+            cached = (signature, surface)
+            self._overlay_cache[name] = cached
+        # 提示画面在最上层（纹理后端为透明表面），两种后端都直接合成一次
+        self.screen.blit(cached[1], (0, 0))
+
     def draw_game_over(self):
         """绘制游戏结束画面"""
+        is_high_score = self.leaderboard.is_high_score(self.score) and self.score > 0
+        self.draw_cached_overlay('game_over', self.score, is_high_score)
+
+    def draw_game_over_overlay(self, score, is_high_score):
+        """游戏结束画面（绘制到缓存表面）"""
         scale = self.scale_factor
 
-        # 创建半透明遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        # 半透明遮罩（缓存表面带逐像素透明）
+        self.screen.fill((0, 0, 0, 180))
 
         # 动态字体
         title_size = max(30, int(50 * scale))
         text_size = max(14, int(22 * scale))
         hint_size = max(12, int(18 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            text_font = pygame.font.Font(self.font_path, text_size)
-            hint_font = pygame.font.Font(self.font_path, hint_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            text_font = pygame.font.Font(None, text_size)
-            hint_font = pygame.font.Font(None, hint_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        text_font = SIZE_CACHE.font(self.font_path, text_size)
+        hint_font = SIZE_CACHE.font(self.font_path, hint_size)
 
         game_over_text = title_font.render("游戏结束!", True, WHITE)
-        score_text = text_font.render(f"最终分数: {self.score}", True, WHITE)
+        score_text = text_font.render(f"最终分数: {score}", True, WHITE)
 
         # 居中显示
         game_over_rect = game_over_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 60))
@@ -4250,9 +6736,8 @@ class Tetris:
         self.screen.blit(game_over_text, game_over_rect)
         self.screen.blit(score_text, score_rect)
 
-        # 检查是否是新纪录
-        is_high_score = self.leaderboard.is_high_score(self.score)
-        if is_high_score and self.score > 0:
+        # 新纪录
+        if is_high_score:
             record_text = text_font.render("新纪录!", True, (255, 215, 0))
             record_rect = record_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 100))
             self.screen.blit(record_text, record_rect)
@@ -4267,69 +6752,59 @@ class Tetris:
         if self.show_settings or self.show_statistics or self.show_achievements:
             return
 
-        # 创建半透明遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.draw_cached_overlay('waiting')
 
-        scale = self.scale_factor
+        # 提示文字（带闪烁效果）：文字表面按字号缓存，每帧只改整体透明度
+        hint_size = max(16, int(24 * self.scale_factor))
+        hint_text = SIZE_CACHE.get(('waiting_hint', hint_size), lambda: SIZE_CACHE.font(
+            self.font_path, hint_size).render("按 空格 或 回车 开始", True, (255, 255, 255)))
+        hint_text.set_alpha(int(155 + 100 * math.sin(GameClock.get_ticks() / 300)))
+        hint_rect = hint_text.get_rect(center=(self.window_width // 2, self.window_height // 2 + 30))
+        self.screen.blit(hint_text, hint_rect)
 
-        # 动态字体
-        title_size = max(40, int(60 * scale))
-        hint_size = max(16, int(24 * scale))
+    def draw_waiting_overlay(self):
+        """等待开始画面的静态部分（绘制到缓存表面）"""
+        # 半透明遮罩
+        self.screen.fill((0, 0, 0, 180))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            hint_font = pygame.font.Font(self.font_path, hint_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            hint_font = pygame.font.Font(None, hint_size)
+        # 动态字体
+        title_size = max(40, int(60 * self.scale_factor))
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
 
         # 标题
         title_text = title_font.render("俄罗斯方块", True, (0, 255, 255))
         title_rect = title_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 60))
         self.screen.blit(title_text, title_rect)
 
-        # 提示文字（带闪烁效果）
-        import math
-        alpha = int(155 + 100 * math.sin(pygame.time.get_ticks() / 300))
-        hint_text = hint_font.render("按 空格 或 回车 开始", True, (255, 255, 255))
-        hint_text.set_alpha(alpha)
-        hint_rect = hint_text.get_rect(center=(self.window_width // 2, self.window_height // 2 + 30))
-        self.screen.blit(hint_text, hint_rect)
-
     def draw_countdown(self):
         """绘制倒计时画面"""
-        # 创建半透明遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height))
-        overlay.set_alpha(150)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.draw_cached_overlay('countdown', self.countdown)
+
+    def draw_countdown_overlay(self, countdown):
+        """倒计时画面（绘制到缓存表面，每个数字一张）"""
+        # 半透明遮罩
+        self.screen.fill((0, 0, 0, 150))
 
         scale = self.scale_factor
 
         # 动态字体（倒计时数字）
         number_size = max(80, int(150 * scale))
 
-        if self.font_path:
-            number_font = pygame.font.Font(self.font_path, number_size)
-        else:
-            number_font = pygame.font.Font(None, number_size)
+        number_font = SIZE_CACHE.font(self.font_path, number_size)
 
         # 根据倒计时数字显示不同颜色
-        if self.countdown == 3:
+        if countdown == 3:
             color = (255, 100, 100)  # 红色
-        elif self.countdown == 2:
+        elif countdown == 2:
             color = (255, 200, 100)  # 橙色
-        elif self.countdown == 1:
+        elif countdown == 1:
             color = (100, 255, 100)  # 绿色
         else:
             color = (100, 200, 255)  # 蓝色
 
         # 绘制倒计时数字
-        if self.countdown > 0:
-            countdown_text = number_font.render(str(self.countdown), True, color)
+        if countdown > 0:
+            countdown_text = number_font.render(str(countdown), True, color)
             text_rect = countdown_text.get_rect(center=(self.window_width // 2, self.window_height // 2))
             self.screen.blit(countdown_text, text_rect)
         else:
@@ -4344,24 +6819,21 @@ class Tetris:
         if self.show_settings or self.show_statistics or self.show_achievements:
             return
 
+        self.draw_cached_overlay('pause')
+
+    def draw_pause_overlay(self):
+        """暂停画面（绘制到缓存表面）"""
         scale = self.scale_factor
 
-        # 创建半透明遮罩
-        overlay = pygame.Surface((self.window_width, self.window_height))
-        overlay.set_alpha(150)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        # 半透明遮罩
+        self.screen.fill((0, 0, 0, 150))
 
         # 动态字体
         title_size = max(30, int(50 * scale))
         hint_size = max(14, int(22 * scale))
 
-        if self.font_path:
-            title_font = pygame.font.Font(self.font_path, title_size)
-            hint_font = pygame.font.Font(self.font_path, hint_size)
-        else:
-            title_font = pygame.font.Font(None, title_size)
-            hint_font = pygame.font.Font(None, hint_size)
+        title_font = SIZE_CACHE.font(self.font_path, title_size)
+        hint_font = SIZE_CACHE.font(self.font_path, hint_size)
 
         pause_text = title_font.render("暂停", True, WHITE)
         continue_text = hint_font.render("按 P 继续", True, WHITE)
@@ -4373,29 +6845,23 @@ class Tetris:
         self.screen.blit(continue_text, continue_rect)
 
     def draw_controls(self):
+        """绘制控制说明卡片"""
+        self.draw_hud_card('controls')
+
+    def _draw_controls_card(self, offset_x=0, offset_y=0):
         """绘制控制说明 - 支持缩放"""
         scale = self.scale_factor
 
-        grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-        block_size = self.get_scaled_size(BLOCK_SIZE)
-
-        controls_x = int(grid_x + GRID_WIDTH * block_size + 20 * scale)
-        controls_y = int(grid_y + 407 * scale)  # 向上移动7像素，从414改为407
-
-        # 缩放卡片大小
-        card_width = int(190 * scale)
-        card_height = int(130 * scale)  # 增加高度到130以容纳11个按键
-
-        card_rect = pygame.Rect(controls_x - 6, controls_y - 6, card_width, card_height)
+        controls_x, controls_y = self.layout.points['controls']
+        controls_x, controls_y = controls_x + offset_x, controls_y + offset_y
+        card_rect = self.layout.rects['controls_card'].move(offset_x, offset_y)
+        card_width = card_rect.width
         pygame.draw.rect(self.screen, (28, 28, 36), card_rect, border_radius=int(6 * scale))
         pygame.draw.rect(self.screen, (80, 80, 100), card_rect, 2, border_radius=int(6 * scale))
 
         # 动态字体
         font_size = max(9, int(12 * scale))
-        if self.font_path:
-            font = pygame.font.Font(self.font_path, font_size)
-        else:
-            font = pygame.font.Font(None, font_size)
+        font = SIZE_CACHE.font(self.font_path, font_size)
 
         # 标题
         title_text = font.render("操作", True, (200, 200, 220))
@@ -4455,485 +6921,552 @@ class Tetris:
 
     def run(self):
         """运行游戏主循环"""
+        if self.render_thread is not None:
+            self._run_with_render_thread()
+            return
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                # 处理窗口大小调整
-                if event.type == pygame.VIDEORESIZE:
-                    self.window_width = event.w
-                    self.window_height = event.h
-
-                    # 计算缩放因子（使用宽度和高度的较小值，更保守）
-                    width_scale = self.window_width / WINDOW_WIDTH
-                    height_scale = self.window_height / WINDOW_HEIGHT
-                    self.scale_factor = min(width_scale, height_scale)
-
-                    # 限制缩放范围，避免过度缩放
-                    self.scale_factor = max(0.6, min(1.5, self.scale_factor))
-
-                    # 重新创建屏幕表面
-                    self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
-
-                # 处理鼠标点击事件
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # 左键点击
-                        mouse_pos = pygame.mouse.get_pos()
-
-                        # 设置菜单点击处理
-                        if self.show_settings and self.key_binding_mode != 'panel':
-                            self.handle_settings_click(mouse_pos)
-
-                        # 键位绑定面板点击处理
-                        elif self.show_settings and self.key_binding_mode == 'panel':
-                            if not self.key_binding_mode or self.key_binding_mode == 'panel':
-                                self.handle_keybind_click(mouse_pos)
-
-                # 处理鼠标移动事件（滑块拖动）
-                if event.type == pygame.MOUSEMOTION:
-                    if self.dragging_slider and self.show_settings:
-                        scale = self.scale_factor
-                        panel_width = int(500 * scale)
-                        panel_height = int(650 * scale)
-                        panel_x = (self.window_width - panel_width) // 2
-                        panel_y = (self.window_height - panel_height) // 2
-
-                        col_width = (panel_width - int(60 * scale)) // 2
-                        col2_x = panel_x + int(20 * scale) + col_width + int(20 * scale)
-                        start_y = panel_y + int(80 * scale)
-                        item_height = int(70 * scale)
-
-                        vol_start_y = start_y
-                        slider_x = col2_x + int(15 * scale)
-                        slider_width = col_width - int(30 * scale)
-
-                        if self.dragging_slider == 'music':
-                            slider_track_y = vol_start_y + int(48 * scale)
-                            self._update_slider_volume(event.pos, slider_x, slider_track_y,
-                                                     slider_width, 'music')
-                        elif self.dragging_slider == 'sfx':
-                            sfx_vol_y = vol_start_y + item_height
-                            slider_track_y = sfx_vol_y + int(48 * scale)
-                            self._update_slider_volume(event.pos, slider_x, slider_track_y,
-                                                     slider_width, 'sfx')
-
-                # 处理鼠标释放事件（停止拖动滑块）
-                if event.type == pygame.MOUSEBUTTONUP:
-                    if event.button == 1:  # 左键释放
-                        if self.dragging_slider:
-                            self.dragging_slider = None
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
-
-                    # Tab键切换统计面板（任何时候都有效）
-                    if event.key == pygame.K_TAB and not self.waiting_to_start:
-                        if not self.show_statistics:
-                            # 打开统计面板 - 记录并暂停
-                            if not (self.show_achievements or self.show_settings):
-                                # 如果没有其他面板打开，记录当前暂停状态
-                                self.was_paused_before_panel = self.paused
-                            self.paused = True
-                        else:
-                            # 关闭统计面板 - 如果没有其他面板，恢复之前的暂停状态
-                            if not (self.show_achievements or self.show_settings):
-                                self.paused = self.was_paused_before_panel
+            self.profiler.begin_frame()
 
-                        self.show_statistics = not self.show_statistics
-                        # 关闭成就面板和设置
-                        self.show_achievements = False
-                        self.show_settings = False
-                        self.theme_dropdown_opened = False  # 关闭下拉框
-                        continue
-
-                    # H键切换成就面板（任何时候都有效）
-                    if event.key == pygame.K_h and not self.waiting_to_start:
-                        if not self.show_achievements:
-                            # 打开成就面板 - 记录并暂停
-                            if not (self.show_statistics or self.show_settings):
-                                # 如果没有其他面板打开，记录当前暂停状态
-                                self.was_paused_before_panel = self.paused
-                            self.paused = True
-                        else:
-                            # 关闭成就面板 - 如果没有其他面板，恢复之前的暂停状态
-                            if not (self.show_statistics or self.show_settings):
-                                self.paused = self.was_paused_before_panel
+            self.handle_events()
+            self.apply_pending_resize()
+            self.profiler.mark('events')
 
-                        self.show_achievements = not self.show_achievements
-                        # 关闭统计面板和设置菜单
-                        self.show_statistics = False
-                        self.show_settings = False
-                        self.theme_dropdown_opened = False  # 关闭下拉框
-                        continue
+            self.update_game()
 
-                    # ESC键切换设置菜单（任何时候都有效）
-                    if event.key == pygame.K_ESCAPE:
-                        if self.show_settings:
-                            # 如果在键位绑定模式，先退出键位绑定
-                            if self.key_binding_mode:
-                                self.key_binding_mode = None
-                            else:
-                                # 关闭设置菜单 - 恢复之前的暂停状态
-                                self.paused = self.was_paused_before_panel
-                                self.show_settings = False
-                                self.theme_dropdown_opened = False  # 关闭下拉框
-                        else:
-                            # 打开设置菜单 - 记录并暂停
-                            if not (self.show_statistics or self.show_achievements):
-                                # 如果没有其他面板打开，记录当前暂停状态
-                                self.was_paused_before_panel = self.paused
-                            self.paused = True
-                            self.show_settings = True
-                            self.show_statistics = False
-                            self.show_achievements = False
-                        continue
-
-                    # K键打开键位绑定（仅在设置菜单打开时）
-                    if event.key == pygame.K_k and self.show_settings and not self.key_binding_mode:
-                        # 切换到键位绑定面板
-                        self.key_binding_mode = 'panel'  # 特殊标记表示进入键位面板
-                        continue
-
-                    # 键位绑定模式：按任意键绑定
-                    if self.key_binding_mode and self.key_binding_mode != 'panel':
-                        # 退出绑定
-                        if event.key == pygame.K_ESCAPE:
+            self.render_frame()
+
+            self.render_backend.present()
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+
+            if self.background_worker is not None and self.background_worker.error is not None:
+                raise self.background_worker.error
+
+            # 帧间等待期间才让后台线程合成音乐
+            self.sound_manager.music_gate.set()
+            self.frame_pacer.tick()
+            self.sound_manager.music_gate.clear()
+
+    def _run_with_render_thread(self):
+        """渲染线程模式的主循环：主线程只处理输入和逻辑，按目标帧率发布快照"""
+        while True:
+            self.handle_events()
+            self.apply_pending_resize()
+            self.update_game()
+            self.render_thread.publish(self.take_snapshot())
+            if self.render_thread.error is not None:
+                raise self.render_thread.error
+            if self.background_worker is not None and self.background_worker.error is not None:
+                raise self.background_worker.error
+
+            self.sound_manager.music_gate.set()
+            self.frame_pacer.tick(presents=False)
+            self.sound_manager.music_gate.clear()
+
+    def resize_window(self, width, height):
+        """调整窗口大小：重新计算画布尺寸、缩放因子、屏幕表面和布局
+
+        window_width / window_height 是绘制用的画布尺寸，native 模式下与窗口相同。
+        """
+        self.display_size = (width, height)
+
+        if self.resolution_mode == 'native':
+            self.window_width = width
+            self.window_height = height
+
+            # 计算缩放因子（使用宽度和高度的较小值，更保守）
+            width_scale = self.window_width / WINDOW_WIDTH
+            height_scale = self.window_height / WINDOW_HEIGHT
+            self.scale_factor = self.quantize_scale(min(width_scale, height_scale))
+        else:
+            # 画布固定为基准分辨率（或其整数倍），窗口再大也只多一次缩放
+            multiple = 1
+            if self.resolution_mode == 'integer':
+                multiple = max(1, min(width // WINDOW_WIDTH, height // WINDOW_HEIGHT))
+            self.window_width = WINDOW_WIDTH * multiple
+            self.window_height = WINDOW_HEIGHT * multiple
+            self.scale_factor = float(multiple)
+
+        # 重新创建屏幕表面（渲染线程画完当前这一帧之后）
+        with self.render_lock:
+            self.screen = self.render_backend.create_display(self.display_size,
+                                                             (self.window_width, self.window_height))
+
+        # 重建布局
+        self.update_layout()
+
+    def request_resize(self, width, height):
+        """窗口大小变化：先把当前画面缩放显示，等大小稳定 RESIZE_SETTLE 秒后再 resize_window
+
+        拖动窗口边缘时每秒会收到几十次大小变化，每次都重建窗口表面和布局会让尺寸相关的缓存反复失效。
+        """
+        size = (width, height)
+        if self._pending_resize is None and size == tuple(self.display_size):
+            return
+        self._pending_resize = (size, time.perf_counter())
+        # 画布和布局保持原尺寸，present 时整体缩放到新窗口
+        with self.render_lock:
+            self.screen = self.render_backend.preview_display(size)
+
+    def apply_pending_resize(self):
+        """窗口大小已稳定时执行等待中的调整"""
+        if self._pending_resize is None:
+            return
+        size, last_event = self._pending_resize
+        if time.perf_counter() - last_event >= self.RESIZE_SETTLE:
+            self._pending_resize = None
+            self.resize_window(*size)
+
+    def quantize_scale(self, scale):
+        """把缩放因子限制在 MIN_SCALE-MAX_SCALE 之间，并向下取整到 SCALE_STEP 的整数倍"""
+        scale = max(self.MIN_SCALE, min(self.MAX_SCALE, scale))
+        return round(math.floor(scale / self.SCALE_STEP + 1e-6) * self.SCALE_STEP, 4)
+
+    def set_resolution_mode(self, mode, scale_filter=None, save=True):
+        """切换画布分辨率模式和缩放过滤方式（立即按当前窗口大小重建）"""
+        if mode in self.RESOLUTION_MODES:
+            self.resolution_mode = mode
+        if scale_filter in ('smooth', 'nearest'):
+            self.scale_filter = scale_filter
+        self.resize_window(*self.display_size)
+        if save:
+            self.settings_manager.set('resolution_mode', self.resolution_mode)
+            self.settings_manager.set('scale_filter', self.scale_filter)
+
+    def handle_events(self):
+        """处理本帧的所有输入事件"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit_game()
+
+            # 处理窗口大小调整
+            if event.type == pygame.VIDEORESIZE:
+                self.request_resize(event.w, event.h)
+            elif event.type == pygame.WINDOWSIZECHANGED and self.render_backend.name == 'texture':
+                # 纹理后端的窗口不是 pygame 显示窗口，不会收到 VIDEORESIZE
+                self.request_resize(event.x, event.y)
+
+            # 处理鼠标点击事件
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # 左键点击
+                    mouse_pos = self.render_backend.map_mouse(event.pos)
+
+                    # 设置菜单点击处理
+                    if self.show_settings and self.key_binding_mode != 'panel':
+                        self.handle_settings_click(mouse_pos)
+
+                    # 键位绑定面板点击处理
+                    elif self.show_settings and self.key_binding_mode == 'panel':
+                        if not self.key_binding_mode or self.key_binding_mode == 'panel':
+                            self.handle_keybind_click(mouse_pos)
+
+            # 处理鼠标移动事件（滑块拖动）
+            if event.type == pygame.MOUSEMOTION:
+                if self.dragging_slider and self.show_settings:
+                    track = self.layout.rects[f'{self.dragging_slider}_volume_track']
+                    self._update_slider_volume(self.render_backend.map_mouse(event.pos),
+                                             track.x, track.y, track.width,
+                                             self.dragging_slider)
+
+            # 处理鼠标释放事件（停止拖动滑块）
+            if event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:  # 左键释放
+                    if self.dragging_slider:
+                        self.dragging_slider = None
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    self.quit_game()
+
+                # F3 切换性能分析浮层（任何时候都有效）
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    continue
+
+                # F4 导出卡顿记录
+                if event.key == pygame.K_F4:
+                    path = HITCHES.dump()
+                    if path:
+                        self.achievement.notify("卡顿记录已导出",
+                                                f"{os.path.basename(path)}（{len(HITCHES.records)} 条）")
+                    else:
+                        self.achievement.notify("卡顿记录导出失败", "无法写入文件")
+                    continue
+
+                # Tab键切换统计面板（任何时候都有效）
+                if event.key == pygame.K_TAB and not self.waiting_to_start:
+                    if not self.show_statistics:
+                        # 打开统计面板 - 记录并暂停
+                        if not (self.show_achievements or self.show_settings):
+                            # 如果没有其他面板打开，记录当前暂停状态
+                            self.was_paused_before_panel = self.paused
+                        self.paused = True
+                    else:
+                        # 关闭统计面板 - 如果没有其他面板，恢复之前的暂停状态
+                        if not (self.show_achievements or self.show_settings):
+                            self.paused = self.was_paused_before_panel
+
+                    self.show_statistics = not self.show_statistics
+                    # 关闭成就面板和设置
+                    self.show_achievements = False
+                    self.show_settings = False
+                    self.theme_dropdown_opened = False  # 关闭下拉框
+                    continue
+
+                # H键切换成就面板（任何时候都有效）
+                if event.key == pygame.K_h and not self.waiting_to_start:
+                    if not self.show_achievements:
+                        # 打开成就面板 - 记录并暂停
+                        if not (self.show_statistics or self.show_settings):
+                            # 如果没有其他面板打开，记录当前暂停状态
+                            self.was_paused_before_panel = self.paused
+                        self.paused = True
+                    else:
+                        # 关闭成就面板 - 如果没有其他面板，恢复之前的暂停状态
+                        if not (self.show_statistics or self.show_settings):
+                            self.paused = self.was_paused_before_panel
+
+                    self.show_achievements = not self.show_achievements
+                    # 关闭统计面板和设置菜单
+                    self.show_statistics = False
+                    self.show_settings = False
+                    self.theme_dropdown_opened = False  # 关闭下拉框
+                    continue
+
+                # ESC键切换设置菜单（任何时候都有效）
+                if event.key == pygame.K_ESCAPE:
+                    if self.show_settings:
+                        # 如果在键位绑定模式，先退出键位绑定
+                        if self.key_binding_mode:
                             self.key_binding_mode = None
                         else:
-                            # 绑定新按键
-                            self.keybind_manager.set_key(self.key_binding_mode, event.key)
-                            self.key_binding_mode = None
-                        continue
-
-                    # R键重新开始（任何状态下都有效，除了等待开始）
-                    if event.key == pygame.K_r and not self.waiting_to_start:
-                        # 保存当前统计数据
-                        self.statistics.record_score(self.score)
-                        self.statistics.save_statistics()
-
-                        # 停止旧的保存线程
-                        self.statistics._stop_thread = True
-                        if self.statistics._save_thread and self.statistics._save_thread.is_alive():
-                            self.statistics._save_thread.join(timeout=0.5)
-
-                        # 🎨 切换到新主题（排除当前主题）
-                        available_themes = [t for t in THEMES if t != self.current_theme]
-                        self.current_theme = random.choice(available_themes)
-
-                        # 重新生成背景音乐（使用新主题）
-                        self.sound_manager.generate_background_music(self.current_theme)
-
-                        # 如果音乐已启用，重新播放音乐
-                        if self.sound_manager.music_enabled:
-                            self.sound_manager.play_music()
-
-                        # 更新AnimationManager的主题
-                        self.animation_manager.theme = self.current_theme
-
-                        # 保存一些设置
-                        neon = self.neon_mode
-                        sound_enabled = self.sound_manager.enabled
-
-                        # 重置游戏状态（不重新初始化Statistics对象）
-                        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-                        self.score = 0
-                        self.level = 1
-                        self.lines_cleared = 0
-                        self.game_over = False
-                        self.paused = False
-                        self.waiting_to_start = True
-                        self.countdown = 3
-                        self.countdown_timer = 0
-                        self.countdown_active = False
-                        self.piece_bag = []  # 重置方块袋子
-                        self.current_piece = self.create_piece()
-                        self.next_piece = self.create_piece()
-                        self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
-                        self.current_y = 0
-                        self.fall_time = 0
-                        self.fall_speed = 500
-                        self.combo_count = 0
-                        self.last_clear_time = 0
+                            # 关闭设置菜单 - 恢复之前的暂停状态
+                            self.paused = self.was_paused_before_panel
+                            self.show_settings = False
+                            self.theme_dropdown_opened = False  # 关闭下拉框
+                    else:
+                        # 打开设置菜单 - 记录并暂停
+                        if not (self.show_statistics or self.show_achievements):
+                            # 如果没有其他面板打开，记录当前暂停状态
+                            self.was_paused_before_panel = self.paused
+                        self.paused = True
+                        self.show_settings = True
                         self.show_statistics = False
                         self.show_achievements = False
-                        self.first_piece_placed = False
-
-                        # 重新创建动画管理器（使用新主题）
-                        self.animation_manager = AnimationManager(theme=self.current_theme)
-                        self.piece_animation = PieceAnimation()
-
-                        # 恢复设置
-                        self.neon_mode = neon
-                        self.sound_manager.enabled = sound_enabled
-
-                        # 重置统计数据的当前会话
-                        self.statistics.reset_current_session()
-
-                        # 重新启动保存线程
-                        self.statistics._stop_thread = False
-                        self.statistics._start_save_thread()
-                        continue
-
-                    # 等待开始状态，按空格或回车开始
-                    if self.waiting_to_start:
-                        if event.key in [pygame.K_SPACE, pygame.K_RETURN]:
-                            self.waiting_to_start = False
-                            self.countdown_active = True
-                            self.countdown = 3
-                            self.countdown_timer = pygame.time.get_ticks()
-                            self.sound_manager.play('rotate')  # 播放音效提示
-                        continue
-
-                    # 游戏结束状态下的其他按键
-                    if self.game_over:
-                        continue
-
-                    if event.key == pygame.K_p:
-                        self.paused = not self.paused
-
-                    if event.key == pygame.K_n:
-                        self.neon_mode = not self.neon_mode
-                        self.achievement.unlock('neon_master')  # 解锁霓虹成就
-
-                    if event.key == pygame.K_m:
-                        self.sound_manager.toggle()
-
-                    if not self.paused and not self.countdown_active and not self.show_statistics:
-                        # 使用键位绑定管理器获取键位
-                        if event.key == self.keybind_manager.get_key('left'):
-                            if self.valid_move(self.current_piece, self.current_x - 1, self.current_y):
-                                # 启动移动动画
-                                self.piece_animation.start_move_animation(
-                                    self.current_x, self.current_y,
-                                    self.current_x - 1, self.current_y
-                                )
-                                self.current_x -= 1
-                                self.sound_manager.play('move')
-                                self.statistics.total_moves += 1
-
-                        elif event.key == self.keybind_manager.get_key('right'):
-                            if self.valid_move(self.current_piece, self.current_x + 1, self.current_y):
-                                # 启动移动动画
-                                self.piece_animation.start_move_animation(
-                                    self.current_x, self.current_y,
-                                    self.current_x + 1, self.current_y
-                                )
-                                self.current_x += 1
-                                self.sound_manager.play('move')
-                                self.statistics.total_moves += 1
-
-                        elif event.key == self.keybind_manager.get_key('rotate'):
-                            rotated = self.rotate_piece(self.current_piece)
-                            if self.valid_move(rotated, self.current_x, self.current_y):
-                                self.current_piece = rotated
-                                # 可以在这里添加旋转动画（未来实现）
-                                self.sound_manager.play('rotate')
-                                self.statistics.total_rotations += 1
-
-                        elif event.key == self.keybind_manager.get_key('soft_drop'):
-                            if self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
-                                self.current_y += 1
-
-                        elif event.key == self.keybind_manager.get_key('hard_drop'):
-                            # 记录开始位置用于动画
-                            start_y = self.current_y
-                            while self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
-                                self.current_y += 1
-                            # 启动下落动画
-                            self.piece_animation.start_drop_animation(start_y, self.current_y)
-                            self.sound_manager.play('drop')
-
-            # 游戏逻辑更新（只有游戏开始后才更新）
-            if not self.game_over and not self.paused and not self.waiting_to_start and not self.countdown_active:
-                current_time = pygame.time.get_ticks()
-                if current_time - self.fall_time > self.fall_speed:
-                    if self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
-                        self.current_y += 1
-                    else:
-                        self.merge_piece()
-                        self.clear_lines()
-                        self.new_piece()
-                    self.fall_time = current_time
-
-            # 倒计时逻辑
-            if self.countdown_active:
-                current_time = pygame.time.get_ticks()
-                if current_time - self.countdown_timer > 1000:  # 每秒更新
-                    self.countdown -= 1
-                    self.countdown_timer = current_time
-                    if self.countdown > 0:
-                        self.sound_manager.play('move')  # 倒计时音效
-                    if self.countdown <= 0:
-                        self.countdown_active = False
-                        # 确保第一个方块从顶部开始
-                        self.current_y = 0
-                        self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
-                        self.fall_time = current_time  # 重置下落计时器
-                        self.sound_manager.play('drop')  # 开始游戏音效
-                        self.sound_manager.play_music(loops=-1)  # 开始播放背景音乐
-                        # 重置当前会话统计数据
-                        self.statistics.reset_current_session()
-
-            # 更新动画
-            self.animation_manager.update()
-            self.piece_animation.update()  # 更新方块动画
-
-            # 更新成就通知
-            current_time = pygame.time.get_ticks()
-            self.achievement.update(current_time)
-
-            # 定期检查时间相关成就
-            self.statistics.update_game_time()
-            if self.statistics.total_game_time >= 5 * 60 * 1000:  # 5分钟
-                self.achievement.unlock('survive_5min')
-            if self.statistics.total_game_time >= 60 * 60 * 1000:  # 1小时
-                self.achievement.unlock('legend')
-
-            # 操作次数成就
-            total_ops = self.statistics.total_moves + self.statistics.total_rotations
-            if total_ops >= 100:
-                self.achievement.unlock('moves_100')
-            if total_ops >= 1000:
-                self.achievement.unlock('moves_1000')
-
-            # 定期保存统计数据（每1秒）
-            if current_time - self.last_save_time > 1000:  # 1秒
-                self.statistics.save_statistics()
-                self.last_save_time = current_time
-
-            # 获取震动偏移
-            shake_x, shake_y = self.animation_manager.get_shake_offset()
-
-            # 绘制
-            # 🎨 使用主题背景系统
-            self.draw_theme_background()
-
-            # 如果没有面板打开，正常绘制游戏（带震动效果）
-            if not self.show_settings and not self.show_statistics and not self.show_achievements:
-                # 如果有震动，对网格应用偏移
-                if shake_x != 0 or shake_y != 0:
-                    # 先绘制UI（不震动）
-                    self.draw_next_piece()
-                    self.draw_info()
-                    self.draw_leaderboard()
-                    self.draw_controls()
-
-                    # 手动绘制网格和方块（带偏移）
-                    grid_x, grid_y = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-                    block_size = self.get_scaled_size(BLOCK_SIZE)
-
-                    # 应用震动偏移
-                    grid_x += shake_x
-                    grid_y += shake_y
-
-                    # 绘制网格背景
-                    grid_rect = pygame.Rect(
-                        grid_x - 2, grid_y - 2,
-                        GRID_WIDTH * block_size + 4, GRID_HEIGHT * block_size + 4
-                    )
+                    continue
+
+                # K键打开键位绑定（仅在设置菜单打开时）
+                if event.key == pygame.K_k and self.show_settings and not self.key_binding_mode:
+                    # 切换到键位绑定面板
+                    self.key_binding_mode = 'panel'  # 特殊标记表示进入键位面板
+                    continue
 
-                    # 霓虹边框增强（与主网格一致）
-                    if self.neon_mode:
-                        # 外层发光边框（青色）
-                        pygame.draw.rect(self.screen, (0, 200, 255), grid_rect, 3)
-                        # 内层亮边框（白色）
-                        inner_rect = pygame.Rect(
-                            grid_x - 1, grid_y - 1,
-                            GRID_WIDTH * block_size + 2, GRID_HEIGHT * block_size + 2
-                        )
-                        pygame.draw.rect(self.screen, (200, 255, 255), inner_rect, 1)
+                # 键位绑定模式：按任意键绑定
+                if self.key_binding_mode and self.key_binding_mode != 'panel':
+                    # 退出绑定
+                    if event.key == pygame.K_ESCAPE:
+                        self.key_binding_mode = None
                     else:
-                        # 普通双层边框
-                        pygame.draw.rect(self.screen, (60, 60, 80), grid_rect, 3)
-                        # 内层边框（较亮）
-                        inner_rect = pygame.Rect(
-                            grid_x - 1, grid_y - 1,
-                            GRID_WIDTH * block_size + 2, GRID_HEIGHT * block_size + 2
-                        )
-                        pygame.draw.rect(self.screen, (100, 100, 120), inner_rect, 1)
-
-                    # 棋盘格效果
-                    checker_color_1 = (24, 24, 32)
-                    checker_color_2 = (30, 30, 40)
-
-                    # 绘制网格内容
-                    for y in range(GRID_HEIGHT):
-                        for x in range(GRID_WIDTH):
-                            rect = pygame.Rect(
-                                grid_x + x * block_size,
-                                grid_y + y * block_size,
-                                block_size, block_size
+                        # 绑定新按键
+                        self.keybind_manager.set_key(self.key_binding_mode, event.key)
+                        self.key_binding_mode = None
+                    continue
+
+                # R键重新开始（任何状态下都有效，除了等待开始）
+                if event.key == pygame.K_r and not self.waiting_to_start:
+                    # 保存当前统计数据
+                    self.statistics.record_score(self.score)
+                    self.statistics.save_statistics()
+
+                    # 🎨 切换到预取好的下一个主题（排除当前主题，音乐通常已在后台合成好）
+                    self.switch_theme(self.next_theme)
+
+                    # 如果音乐已启用，重新播放音乐（还在合成时，合成好后自动开始）
+                    if self.sound_manager.music_enabled:
+                        self.sound_manager.play_music()
+
+                    # 保存一些设置
+                    neon = self.neon_mode
+                    sound_enabled = self.sound_manager.enabled
+
+                    # 重置游戏状态（不重新初始化Statistics对象）
+                    self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+                    self.score = 0
+                    self.level = 1
+                    self.lines_cleared = 0
+                    self.game_over = False
+                    self.paused = False
+                    self.waiting_to_start = True
+                    self.countdown = 3
+                    self.countdown_timer = 0
+                    self.countdown_active = False
+                    self.reset_piece_queue()  # 重置方块袋子和预览队列
+                    self.fall_time = 0
+                    self.fall_speed = 500
+                    self.combo_count = 0
+                    self.last_clear_time = 0
+                    self.show_statistics = False
+                    self.show_achievements = False
+                    self.first_piece_placed = False
+
+                    # 重新创建动画管理器（使用新主题）
+                    self.animation_manager = self.create_animation_manager()
+                    self.piece_animation = PieceAnimation()
+
+                    # 恢复设置
+                    self.neon_mode = neon
+                    self.sound_manager.enabled = sound_enabled
+
+                    # 重置统计数据的当前会话（保存线程继续运行，不等待它退出）
+                    self.statistics.reset_current_session()
+                    continue
+
+                # 等待开始状态，按空格或回车开始
+                if self.waiting_to_start:
+                    if event.key in [pygame.K_SPACE, pygame.K_RETURN]:
+                        self.waiting_to_start = False
+                        self.countdown_active = True
+                        self.countdown = 3
+                        self.countdown_timer = GameClock.get_ticks()
+                        self.sound_manager.play('rotate')  # 播放音效提示
+                    continue
+
+                # 游戏结束状态下的其他按键
+                if self.game_over:
+                    continue
+
+                if event.key == pygame.K_p:
+                    self.paused = not self.paused
+
+                if event.key == pygame.K_n:
+                    self.neon_mode = not self.neon_mode
+                    self.achievement.unlock('neon_master')  # 解锁霓虹成就
+
+                if event.key == pygame.K_m:
+                    self.sound_manager.toggle()
+
+                if not self.paused and not self.countdown_active and not self.show_statistics:
+                    # 使用键位绑定管理器获取键位
+                    if event.key == self.keybind_manager.get_key('left'):
+                        if self.valid_move(self.current_piece, self.current_x - 1, self.current_y):
+                            # 启动移动动画
+                            self.piece_animation.start_move_animation(
+                                self.current_x, self.current_y,
+                                self.current_x - 1, self.current_y
+                            )
+                            self.current_x -= 1
+                            self.sound_manager.play('move')
+                            self.statistics.total_moves += 1
+
+                    elif event.key == self.keybind_manager.get_key('right'):
+                        if self.valid_move(self.current_piece, self.current_x + 1, self.current_y):
+                            # 启动移动动画
+                            self.piece_animation.start_move_animation(
+                                self.current_x, self.current_y,
+                                self.current_x + 1, self.current_y
                             )
-                            if self.grid[y][x] != 0:
-                                self.draw_3d_block(rect, self.grid[y][x])
-                            else:
-                                # 使用棋盘格效果
-                                cell_color = checker_color_1 if (x + y) % 2 == 0 else checker_color_2
-                                pygame.draw.rect(self.screen, cell_color, rect)
-                                pygame.draw.rect(self.screen, (40, 40, 50), rect, 1)
-
-                    # 绘制幽灵方块（不震动）
-                    if not self.game_over and not self.waiting_to_start and not self.countdown_active:
-                        # 恢复无震动偏移的坐标
-                        grid_x_unshook, grid_y_unshook = self.get_scaled_offset(GRID_X_OFFSET, GRID_Y_OFFSET)
-                        self.draw_ghost_piece(grid_x_unshook, grid_y_unshook)
-
-                    # 绘制当前方块
-                    if not self.game_over and not self.waiting_to_start and not self.countdown_active:
-                        for y, row in enumerate(self.current_piece):
-                            for x, cell in enumerate(row):
-                                if cell != 0:
-                                    rect = pygame.Rect(
-                                        grid_x + (x + self.current_x) * block_size,
-                                        grid_y + (y + self.current_y) * block_size,
-                                        block_size, block_size
-                                    )
-                                    self.draw_3d_block(rect, cell)
+                            self.current_x += 1
+                            self.sound_manager.play('move')
+                            self.statistics.total_moves += 1
+
+                    elif event.key == self.keybind_manager.get_key('rotate'):
+                        rotated = self.rotate_piece(self.current_piece)
+                        if self.valid_move(rotated, self.current_x, self.current_y):
+                            self.current_piece = rotated
+                            # 可以在这里添加旋转动画（未来实现）
+                            self.sound_manager.play('rotate')
+                            self.statistics.total_rotations += 1
+
+                    elif event.key == self.keybind_manager.get_key('soft_drop'):
+                        if self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
+                            self.current_y += 1
+
+                    elif event.key == self.keybind_manager.get_key('hard_drop'):
+                        # 记录开始位置用于动画
+                        start_y = self.current_y
+                        while self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
+                            self.current_y += 1
+                        # 启动下落动画
+                        self.piece_animation.start_drop_animation(start_y, self.current_y)
+                        self.sound_manager.play('drop')
+
+    def update_game(self):
+        """更新游戏逻辑、动画和成就（每帧调用一次）"""
+        # 游戏逻辑更新（只有游戏开始后才更新）
+        if not self.game_over and not self.paused and not self.waiting_to_start and not self.countdown_active:
+            current_time = GameClock.get_ticks()
+            if current_time - self.fall_time > self.fall_speed:
+                if self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
+                    self.current_y += 1
                 else:
-                    # 正常绘制
-                    self.draw_grid()
-
-                    # 绘制幽灵方块
-                    if not self.game_over and not self.waiting_to_start and not self.countdown_active:
-                        self.draw_ghost_piece()
-
-                    if not self.game_over and not self.waiting_to_start and not self.countdown_active:
-                        # 启用动画绘制
-                        self.draw_piece(self.current_piece, self.current_x, self.current_y, animated=True)
-                    self.draw_next_piece()
-                    self.draw_info()
-                    self.draw_leaderboard()
-                    self.draw_controls()
+                    self.merge_piece()
+                    self.clear_lines()
+                    self.new_piece()
+                self.fall_time = current_time
+
+        # 倒计时逻辑
+        if self.countdown_active:
+            current_time = GameClock.get_ticks()
+            if current_time - self.countdown_timer > 1000:  # 每秒更新
+                self.countdown -= 1
+                self.countdown_timer = current_time
+                if self.countdown > 0:
+                    self.sound_manager.play('move')  # 倒计时音效
+                if self.countdown <= 0:
+                    self.countdown_active = False
+                    # 确保第一个方块从顶部开始
+                    self.current_y = 0
+                    self.current_x = GRID_WIDTH // 2 - len(self.current_piece[0]) // 2
+                    self.fall_time = current_time  # 重置下落计时器
+                    self.sound_manager.play('drop')  # 开始游戏音效
+                    self.sound_manager.play_music(loops=-1)  # 开始播放背景音乐
+                    # 重置当前会话统计数据
+                    self.statistics.reset_current_session()
+        self.profiler.mark('logic')
+
+        # 更新动画
+        self.animation_manager.update()
+        self.piece_animation.update()  # 更新方块动画
+        self.profiler.mark('animation')
+
+        # 接上后台合成好的背景音乐，判断主题切换过渡是否结束
+        self.sound_manager.update()
+        self.update_theme_transition()
+
+        # 更新成就通知
+        current_time = GameClock.get_ticks()
+        self.achievement.update(current_time)
+
+        # 定期检查时间相关成就
+        self.statistics.update_game_time()
+        if self.statistics.total_game_time >= 5 * 60 * 1000:  # 5分钟
+            self.achievement.unlock('survive_5min')
+        if self.statistics.total_game_time >= 60 * 60 * 1000:  # 1小时
+            self.achievement.unlock('legend')
+
+        # 操作次数成就
+        total_ops = self.statistics.total_moves + self.statistics.total_rotations
+        if total_ops >= 100:
+            self.achievement.unlock('moves_100')
+        if total_ops >= 1000:
+            self.achievement.unlock('moves_1000')
+
+        # 定期保存统计数据（每1秒）
+        if current_time - self.last_save_time > 1000:  # 1秒
+            self.statistics.save_statistics()
+            self.last_save_time = current_time
+        self.profiler.mark('logic')
+
+    def render_frame(self):
+        """绘制一帧完整画面（不包含 flip）"""
+        # 获取震动偏移
+        shake_x, shake_y = self.animation_manager.get_shake_offset()
+
+        # 绘制
+        # 🎨 使用主题背景系统
+        self.draw_theme_background()
+        self.profiler.mark('background')
+
+        # 如果没有面板打开，正常绘制游戏（带震动效果）
+        if not self.show_settings and not self.show_statistics and not self.show_achievements:
+            # 如果有震动，对网格应用偏移
+            if shake_x != 0 or shake_y != 0:
+                # 先绘制UI（不震动）
+                self.draw_next_piece()
+                self.draw_info()
+                self.draw_leaderboard()
+                self.draw_controls()
+                self.profiler.mark('hud')
+
+                # 网格和已落下的方块带偏移
+                layout = self.layout
+                block_size = layout.block_size
+                grid_x = layout.grid_x + shake_x
+                grid_y = layout.grid_y + shake_y
+                self.draw_grid(shake_x, shake_y)
+                self.profiler.mark('grid')
+
+                # 绘制幽灵方块（不震动）
+                if not self.game_over and not self.waiting_to_start and not self.countdown_active:
+                    # 恢复无震动偏移的坐标
+                    self.draw_ghost_piece(layout.grid_x, layout.grid_y)
+                self.profiler.mark('ghost')
+
+                # 绘制当前方块
+                if not self.game_over and not self.waiting_to_start and not self.countdown_active:
+                    for y, row in enumerate(self.current_piece):
+                        for x, cell in enumerate(row):
+                            if cell != 0:
+                                rect = pygame.Rect(
+                                    grid_x + (x + self.current_x) * block_size,
+                                    grid_y + (y + self.current_y) * block_size,
+                                    block_size, block_size
+                                )
+                                self.render_backend.draw_block(rect, cell)
+                self.profiler.mark('grid')
             else:
-                # 有面板打开时，绘制游戏界面作为背景
+                # 正常绘制
                 self.draw_grid()
+                self.profiler.mark('grid')
+
+                # 绘制幽灵方块
+                if not self.game_over and not self.waiting_to_start and not self.countdown_active:
+                    self.draw_ghost_piece()
+                self.profiler.mark('ghost')
+
+                if not self.game_over and not self.waiting_to_start and not self.countdown_active:
+                    # 启用动画绘制
+                    self.draw_piece(self.current_piece, self.current_x, self.current_y, animated=True)
+                self.profiler.mark('grid')
                 self.draw_next_piece()
                 self.draw_info()
                 self.draw_leaderboard()
                 self.draw_controls()
-
-            # 在游戏界面之上绘制面板（覆盖层）
-            # 如果显示设置菜单（优先级最高）
-            if self.show_settings:
-                if self.key_binding_mode == 'panel':
-                    # 显示键位绑定面板
-                    self.draw_keybind_panel()
-                else:
-                    # 显示设置菜单
-                    self.draw_settings_panel()
-            # 如果显示统计面板
-            elif self.show_statistics:
-                self.draw_statistics_panel()
-            # 如果显示成就面板
-            elif self.show_achievements:
-                self.draw_achievements_panel()
-
-            # 绘制动画（传入scale参数）
-            self.animation_manager.draw(self.screen, self.scale_factor)
+                self.profiler.mark('hud')
+        else:
+            # 有面板打开时，绘制游戏界面作为背景
+            self.draw_grid()
+            self.profiler.mark('grid')
+            self.draw_next_piece()
+            self.draw_info()
+            self.draw_leaderboard()
+            self.draw_controls()
+            self.profiler.mark('hud')
+
+        # 在游戏界面之上绘制面板（覆盖层）
+        # 如果显示设置菜单（优先级最高）
+        if self.show_settings:
+            if self.key_binding_mode == 'panel':
+                # 显示键位绑定面板
+                self.draw_cached_panel('keybind')
+            else:
+                # 显示设置菜单
+                self.draw_cached_panel('settings')
+        # 如果显示统计面板
+        elif self.show_statistics:
+            self.draw_cached_panel('statistics')
+        # 如果显示成就面板
+        elif self.show_achievements:
+            self.draw_cached_panel('achievements')
+        self.profiler.mark('panels')
+
+        # 绘制动画
+        self.render_backend.draw_effects()
+        self.profiler.mark('effects')
+
+        # 最上层：统计面板的游戏时间、成就通知、开始/倒计时/结束/暂停画面、性能分析浮层
+        if (self.achievement.current_notification or self.waiting_to_start or self.countdown_active
+                or self.game_over or self.paused or self.profiler.enabled
+                or self._theme_transition is not None or self.show_statistics):
+            self.render_backend.begin_overlay()
+
+            # 统计面板打开时（设置面板优先显示）
+            if self.show_statistics and not self.show_settings:
+                self.draw_statistics_time()
+
+            # 主题切换过渡（在通知和提示画面之下）
+            if self._theme_transition is not None:
+                self.draw_theme_transition()
 
             # 绘制成就通知（在最上层）
             self.achievement.draw_notification(self.screen, self.window_width, self.scale_factor)
@@ -4947,14 +7480,31 @@ class Tetris:
             elif self.paused:
                 self.draw_pause()
 
-            pygame.display.flip()
-            self.clock.tick(60)
+            # 性能分析浮层（F3）
+            self.profiler.draw(self.screen, self.animation_manager.get_effect_counts(), self.frame_pacer,
+                               self.animation_manager)
+
+            self.render_backend.end_overlay()
+        self.profiler.mark('overlays')
 
 
 if __name__ == "__main__":
     try:
         import array
-        game = Tetris()
+        # 可选参数：
+        #   --renderer=surface|texture|software  渲染后端
+        #   --resolution=native|base|integer     画布分辨率模式
+        #   --filter=smooth|nearest              画布缩放过滤方式
+        #   --render-thread                      在单独的渲染线程中绘制
+        options = {}
+        for arg in sys.argv[1:]:
+            for name in ('renderer', 'resolution', 'filter'):
+                if arg.startswith(f'--{name}='):
+                    options[name] = arg.split('=', 1)[1]
+            if arg == '--render-thread':
+                options['render_thread'] = True
+        game = Tetris(renderer=options.get('renderer'), resolution=options.get('resolution'),
+                      scale_filter=options.get('filter'), render_thread=options.get('render_thread'))
         game.run()
     except ImportError:
         print("错误: 未安装 Pygame 库")